@@ -0,0 +1,117 @@
+# -*- coding: utf-8 -*-
+#
+# codimension - graphics python two-way code editor and analyzer
+# Copyright (C) 2019  Sergey Satskiy <sergey.satskiy@gmail.com>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+"""Compares the pylint text and the warm worker JSON lines parsers.
+
+   Both outputs are generated for the same messages and fed to the parsers
+   in chunks like the ones read from a process pipe, e.g.:
+   python3 benchmarks/bench_parsers.py --messages 100000
+"""
+
+import os
+import sys
+import json
+import argparse
+import importlib.util
+from timeit import default_timer
+
+
+def loadParserModule():
+    """Loads the parsers without the plugin package, i.e. without Qt"""
+    path = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                        os.path.pardir, 'cdmplugins', 'pylint',
+                        'pylintparser.py')
+    spec = importlib.util.spec_from_file_location('pylintparser', path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def generateOutputs(count, parserModule):
+    """Provides the text and the JSON lines outputs of the count messages"""
+    textLines = []
+    jsonLines = []
+    fileName = '/home/user/project/package/module.py'
+    module = None
+    for index in range(count):
+        moduleName = 'package.module%d' % (index // 200)
+        line = index % 1000 + 1
+        column = index % 40
+        msgId = 'CRWE'[index % 4] + '%04d' % (index % 100)
+        obj = 'Class.method%d' % (index % 7) if index % 3 else ''
+        msg = 'Message number %d: with a colon, "quotes" and ü' % index
+        if moduleName != module:
+            module = moduleName
+            textLines.append(parserModule.MODULE_PATTERN + moduleName)
+        textLines.append(parserModule.TEXT_MSG_TEMPLATE.format(
+            msg_id=msgId, line=line, column=column, obj=obj, msg=msg))
+        jsonLines.append(json.dumps(
+            [moduleName, line, obj + ': ' + msg if obj else msg, msgId,
+             fileName, column, line, 'symbol-name', 'HIGH']))
+    rate = '\nYour code has been rated at 5.00/10 (previous run: 4.00/10)\n'
+    textLines.append(rate)
+    jsonLines.append(json.dumps(rate))
+    return '\n'.join(textLines) + '\n', '\n'.join(jsonLines) + '\n'
+
+
+def measure(parserClass, output, chunkSize, repeat):
+    """Provides the best parsing time and the number of parsed messages"""
+    best = None
+    count = 0
+    for _ in range(repeat):
+        parser = parserClass('module.py')
+        start = default_timer()
+        for pos in range(0, len(output), chunkSize):
+            parser.feed(output[pos:pos + chunkSize])
+        parser.finish()
+        elapsed = default_timer() - start
+        if best is None or elapsed < best:
+            best = elapsed
+        count = sum(len(items) for items in parser.messages.values())
+        if parser.rate != '5.00':
+            raise RuntimeError(parserClass.__name__ + ' missed the rate')
+    return best, count
+
+
+def main():
+    """Runs the benchmark"""
+    argParser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    argParser.add_argument('--messages', type=int, default=100000)
+    argParser.add_argument('--chunk', type=int, default=65536,
+                           help='bytes per fed chunk')
+    argParser.add_argument('--repeat', type=int, default=3)
+    args = argParser.parse_args()
+
+    parserModule = loadParserModule()
+    textOutput, jsonOutput = generateOutputs(args.messages, parserModule)
+    for parserClass, output in ((parserModule.PylintTextParser, textOutput),
+                                (parserModule.PylintJSONLinesParser,
+                                 jsonOutput)):
+        elapsed, count = measure(parserClass, output, args.chunk,
+                                 args.repeat)
+        print('%-22s %8d bytes %7d messages %.3fs' %
+              (parserClass.__name__, len(output), count, elapsed))
+        if count != args.messages:
+            print('  expected %d messages' % args.messages)
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
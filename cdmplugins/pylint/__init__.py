@@ -22,19 +22,39 @@
 
 import logging
 import os.path
+import time
+from collections import deque
 from distutils.version import StrictVersion
 from plugins.categories.wizardiface import WizardInterface
-from ui.qt import (QWidget, QIcon, QTabBar, QApplication, QCursor, Qt,
-                   QShortcut, QKeySequence, QAction, QMenu)
+from ui.qt import (QWidget, QIcon, QTabBar, QShortcut, QKeySequence,
+                   QAction, QMenu, QTimer, QInputDialog)
 from ui.mainwindowtabwidgetbase import MainWindowTabWidgetBase
 from utils.fileutils import isPythonMime
-from .pylintdriver import PylintDriver
-from .pylintconfigdialog import PylintPluginConfigDialog
-from .pylintresultviewer import PylintResultViewer
+from .pylintprofiles import (TRIGGER_RUN, TRIGGER_LIVE, TRIGGER_SAVE,
+                             TRIGGER_PROJECT, TRIGGER_CHANGES, TRIGGER_COSTS,
+                             getTriggerProfile)
+from .pylintsettings import PylintPluginSettings, METRICS_LOG
+from .pylintconfig import getConfigResolver, releaseConfigResolver
+from .pylintlazyviewer import PylintLazyResultViewer
+from .pylintactions import PylintActionRegistry, RUN_TOOLTIP
+from .pylintlatency import LATENCY_PROBE, measureStall
+from .pylintmetrics import (appendMetrics, appendStartupMetrics,
+                            STARTUP_TIMINGS)
+
+# The analysis modules, the results viewer and the config dialog are
+# imported when they are needed first so that they do not slow down the IDE
+# start up; see STARTUP_TIMINGS
 
 
 PLUGIN_HOME_DIR = os.path.dirname(os.path.abspath(__file__)) + os.path.sep
 
+# The GUI thread work per an as-you-type analysis should fit into a frame
+FRAME_BUDGET_MS = 16
+
+# The as you type messages are added to the view in batches of this size
+# till a frame budget is spent
+LIVE_FEED_BATCH = 50
+
 
 class PylintPlugin(WizardInterface):
 
@@ -43,15 +63,53 @@ class PylintPlugin(WizardInterface):
     def __init__(self):
         WizardInterface.__init__(self)
         self.__pylintDriver = None
+        self.__scheduler = None
+        self.__batchDriver = None
+        self.__resultCache = None
+        self.__settings = None
         self.__resultViewer = None
         self.__bufferRunAction = None
+        self.__bufferCostsRunAction = None
+        self.__fileRunAction = None
+        self.__dirRunAction = None
+        self.__dirCostsRunAction = None
         self.__bufferGenerateAction = None
         self.__globalShortcut = None
+        self.__actions = PylintActionRegistry()
 
         self.__mainMenu = None
         self.__mainMenuSeparator = None
         self.__mainRunAction = None
+        self.__mainCostsRunAction = None
+        self.__mainProjectRunAction = None
+        self.__mainProjectCostsRunAction = None
         self.__mainGenerateAction = None
+        self.__mainLiveAction = None
+        self.__mainSaveAction = None
+        self.__mainChangesAction = None
+        self.__mainChangesSinceAction = None
+        self.__mainChangedLinesAction = None
+        self.__mainStallsAction = None
+        self.__mainMetricsAction = None
+        self.__mainDaemonAction = None
+
+        # Lint the changes since a commit support
+        self.__gitChanges = None
+        self.__changesBase = None
+
+        # Lint on save support
+        self.__importIndex = None
+        self.__savedFiles = []          # waiting for the batch to finish
+        # (root path, files, profile) of a full run
+        self.__lastBatch = None
+
+        # Lint as you type support
+        self.__liveTimer = None
+        self.__liveGeneration = 0
+        self.__liveRun = None           # (editor widget, generation) if any
+        self.__liveMessages = None
+        self.__liveFeedTimer = None
+        self.__liveFeed = None          # (results, message batches) if any
 
     @staticmethod
     def isIDEVersionCompatible(ideVersion):
@@ -79,21 +137,34 @@ class PylintPlugin(WizardInterface):
               base class activate()
         """
         WizardInterface.activate(self, ideSettings, ideGlobalData)
+        started = time.perf_counter()
 
-        self.__resultViewer = PylintResultViewer(self.ide, PLUGIN_HOME_DIR)
+        # The results viewer itself is created when the tab is shown first
+        # or there are results to show
+        self.__resultViewer = PylintLazyResultViewer(self.ide,
+                                                     PLUGIN_HOME_DIR)
         self.ide.sideBars['bottom'].addTab(
             self.__resultViewer, QIcon(PLUGIN_HOME_DIR + 'pylint.png'),
             'Pylint', 'pylint', 2)
         self.ide.sideBars['bottom'].tabButton(
             'pylint', QTabBar.RightSide).resize(0, 0)
+        self.ide.sideBars['bottom'].setTabToolTip('pylint',
+                                                  'No results available')
 
-        # The clear call must be here, not in the results viewer __init__()
-        # This is because the viewer has not been inserted into the side bar at
-        # the time of __init__() so the tooltip setting does not work
-        self.__resultViewer.clear()
+        # The drivers, the import index and the git changes collector are
+        # created on the first use
+        self.__settings = PylintPluginSettings()
+        self.ide.project.sigProjectChanged.connect(self.__projectChanged)
 
-        self.__pylintDriver = PylintDriver(self.ide)
-        self.__pylintDriver.sigFinished.connect(self.__pylintFinished)
+        self.__liveTimer = QTimer(self.ide.mainWindow)
+        self.__liveTimer.setSingleShot(True)
+        self.__liveTimer.setInterval(self.__settings['lintAsYouTypeDelay'])
+        self.__liveTimer.timeout.connect(self.__startLiveRun)
+
+        self.__liveFeedTimer = QTimer(self.ide.mainWindow)
+        self.__liveFeedTimer.setSingleShot(True)
+        self.__liveFeedTimer.setInterval(0)
+        self.__liveFeedTimer.timeout.connect(self.__feedLiveSlice)
 
         if self.__globalShortcut is None:
             self.__globalShortcut = QShortcut(QKeySequence('Ctrl+L'),
@@ -101,15 +172,17 @@ class PylintPlugin(WizardInterface):
         else:
             self.__globalShortcut.setKey('Ctrl+L')
 
-        # Add buttons
-        for _, _, tabWidget in self.ide.editorsManager.getTextEditors():
-            self.__addButton(tabWidget)
+        # The buttons are added to the open editors when the IDE is up
+        QTimer.singleShot(0, self.__addButtons)
 
         # File type changed & new tab
         self.ide.editorsManager.sigTextEditorTabAdded.connect(
             self.__textEditorTabAdded)
         self.ide.editorsManager.sigFileTypeChanged.connect(
             self.__fileTypeChanged)
+        self.ide.editorsManager.sigFileUpdated.connect(self.__fileUpdated)
+        self.ide.editorsManager.currentChanged.connect(
+            self.__currentTabChanged)
 
         # Add main menu
         self.__mainMenu = QMenu('Pylint', self.ide.mainWindow)
@@ -117,14 +190,64 @@ class PylintPlugin(WizardInterface):
         self.__mainRunAction = self.__mainMenu.addAction(
             QIcon(PLUGIN_HOME_DIR + 'pylint.png'),
             'Run pylint\t(Ctrl+L)', self.__run)
+        self.__mainCostsRunAction = self.__mainMenu.addAction(
+            QIcon(PLUGIN_HOME_DIR + 'pylint.png'),
+            'Run pylint with profiling', self.__runWithCosts)
+        self.__mainProjectRunAction = self.__mainMenu.addAction(
+            QIcon(PLUGIN_HOME_DIR + 'pylint.png'),
+            'Run pylint for the project', self.__runForProject)
+        self.__mainProjectCostsRunAction = self.__mainMenu.addAction(
+            QIcon(PLUGIN_HOME_DIR + 'pylint.png'),
+            'Run pylint for the project with profiling',
+            self.__runForProjectWithCosts)
+        self.__mainChangesAction = self.__mainMenu.addAction(
+            QIcon(PLUGIN_HOME_DIR + 'pylint.png'),
+            'Run pylint for the changes since HEAD', self.__runForChanges)
+        self.__mainChangesSinceAction = self.__mainMenu.addAction(
+            QIcon(PLUGIN_HOME_DIR + 'pylint.png'),
+            'Run pylint for the changes since...',
+            self.__runForChangesSince)
         self.__mainGenerateAction = self.__mainMenu.addAction(
             QIcon(PLUGIN_HOME_DIR + 'generate.png'),
             'Generate/open pylintrc file', self.__generate)
+        self.__mainMenu.addSeparator()
+        self.__mainLiveAction = self.__mainMenu.addAction(
+            'Run pylint as you type')
+        self.__mainLiveAction.setCheckable(True)
+        self.__mainLiveAction.setChecked(self.__settings['lintAsYouType'])
+        self.__mainLiveAction.toggled.connect(self.__liveModeToggled)
+        self.__mainSaveAction = self.__mainMenu.addAction(
+            'Run pylint on save for the file and its dependents')
+        self.__mainSaveAction.setCheckable(True)
+        self.__mainSaveAction.setChecked(self.__settings['lintOnSave'])
+        self.__mainSaveAction.toggled.connect(self.__saveModeToggled)
+        self.__mainChangedLinesAction = self.__mainMenu.addAction(
+            'Show the changes messages on the changed lines only')
+        self.__mainChangedLinesAction.setCheckable(True)
+        self.__mainChangedLinesAction.setChecked(
+            self.__settings['diffChangedLinesOnly'])
+        self.__mainChangedLinesAction.toggled.connect(
+            self.__changedLinesToggled)
+        self.__mainDaemonAction = self.__mainMenu.addAction(
+            'Use the lint daemon shared by the IDE instances')
+        self.__mainDaemonAction.setCheckable(True)
+        self.__mainDaemonAction.setChecked(self.__settings['lintDaemon'])
+        self.__mainDaemonAction.toggled.connect(self.__daemonModeToggled)
+        self.__mainMenu.addSeparator()
+        self.__mainStallsAction = self.__mainMenu.addAction(
+            'Show GUI thread stalls', self.__showStalls)
+        self.__mainMetricsAction = self.__mainMenu.addAction(
+            'Log the analysis timings')
+        self.__mainMetricsAction.setCheckable(True)
+        self.__mainMetricsAction.setChecked(self.__settings['metricsLog'])
+        self.__mainMetricsAction.toggled.connect(self.__metricsLogToggled)
         toolsMenu = self.ide.mainWindow.menuBar().findChild(QMenu, 'tools')
         self.__mainMenuSeparator = toolsMenu.addSeparator()
         toolsMenu.addMenu(self.__mainMenu)
         self.__mainMenu.aboutToShow.connect(self.__mainMenuAboutToShow)
 
+        STARTUP_TIMINGS.record('activation', time.perf_counter() - started)
+
     def deactivate(self):
         """Deactivates the plugin.
 
@@ -135,13 +258,43 @@ class PylintPlugin(WizardInterface):
         """
         self.__globalShortcut.setKey(0)
 
+        self.__liveTimer.stop()
+        self.__liveTimer.deleteLater()
+        self.__liveTimer = None
+        self.__liveRun = None
+        self.__liveMessages = None
+        self.__stopLiveFeed()
+        self.__liveFeedTimer.deleteLater()
+        self.__liveFeedTimer = None
+
         self.__resultViewer = None
         self.ide.sideBars['bottom'].removeTab('pylint')
-        self.__pylintDriver = None
+        if self.__scheduler is not None:
+            self.__scheduler.cancel()
+            self.__scheduler.deleteLater()
+            self.__scheduler = None
+            self.__pylintDriver.shutdown()
+            self.__pylintDriver = None
+        if self.__batchDriver is not None:
+            self.__batchDriver.shutdown()
+            self.__batchDriver = None
+        self.ide.project.sigProjectChanged.disconnect(self.__projectChanged)
+        if self.__importIndex is not None:
+            self.__importIndex.clear()
+            self.__importIndex.deleteLater()
+            self.__importIndex = None
+        self.__savedFiles = []
+        self.__lastBatch = None
+        if self.__gitChanges is not None:
+            self.__gitChanges.stop()
+            self.__gitChanges.deleteLater()
+            self.__gitChanges = None
+        self.__resultCache = None
+        releaseConfigResolver()
+        self.__settings = None
 
         # Remove buttons
-        for _, _, tabWidget in self.ide.editorsManager.getTextEditors():
-            pylintAction = tabWidget.toolbar.findChild(QAction, 'pylint')
+        for tabWidget, pylintAction in self.__actions.takeAll():
             tabWidget.toolbar.removeAction(pylintAction)
 
             # deleteLater() is essential. Otherwise the button is not removed
@@ -150,17 +303,43 @@ class PylintPlugin(WizardInterface):
 
             tabWidget.getEditor().modificationChanged.disconnect(
                 self.__modificationChanged)
+            tabWidget.getEditor().textChanged.disconnect(self.__textChanged)
 
         self.ide.editorsManager.sigTextEditorTabAdded.disconnect(
             self.__textEditorTabAdded)
         self.ide.editorsManager.sigFileTypeChanged.disconnect(
             self.__fileTypeChanged)
+        self.ide.editorsManager.sigFileUpdated.disconnect(self.__fileUpdated)
+        self.ide.editorsManager.currentChanged.disconnect(
+            self.__currentTabChanged)
 
         # Remove main menu items
         self.__mainRunAction.deleteLater()
         self.__mainRunAction = None
+        self.__mainCostsRunAction.deleteLater()
+        self.__mainCostsRunAction = None
+        self.__mainProjectRunAction.deleteLater()
+        self.__mainProjectRunAction = None
+        self.__mainProjectCostsRunAction.deleteLater()
+        self.__mainProjectCostsRunAction = None
         self.__mainGenerateAction.deleteLater()
         self.__mainGenerateAction = None
+        self.__mainLiveAction.deleteLater()
+        self.__mainLiveAction = None
+        self.__mainSaveAction.deleteLater()
+        self.__mainSaveAction = None
+        self.__mainChangesAction.deleteLater()
+        self.__mainChangesAction = None
+        self.__mainChangesSinceAction.deleteLater()
+        self.__mainChangesSinceAction = None
+        self.__mainChangedLinesAction.deleteLater()
+        self.__mainChangedLinesAction = None
+        self.__mainDaemonAction.deleteLater()
+        self.__mainDaemonAction = None
+        self.__mainStallsAction.deleteLater()
+        self.__mainStallsAction = None
+        self.__mainMetricsAction.deleteLater()
+        self.__mainMetricsAction = None
         self.__mainMenu.deleteLater()
         self.__mainMenu = None
         self.__mainMenuSeparator.deleteLater()
@@ -205,7 +384,11 @@ class PylintPlugin(WizardInterface):
         When a callback is called the corresponding menu item will have
         attached data with an absolute path to the item.
         """
-        del parentMenu      # unused argument
+        parentMenu.setIcon(QIcon(PLUGIN_HOME_DIR + 'pylint.png'))
+        self.__fileRunAction = parentMenu.addAction(
+            QIcon(PLUGIN_HOME_DIR + 'pylint.png'),
+            'Run pylint', self.__runForContextPath)
+        parentMenu.aboutToShow.connect(self.__contextMenuAboutToShow)
 
     def populateDirectoryContextMenu(self, parentMenu):
         """Populates the directory context menu.
@@ -218,7 +401,15 @@ class PylintPlugin(WizardInterface):
         When a callback is called the corresponding menu item will have
         attached data with an absolute path to the directory.
         """
-        del parentMenu      # unused argument
+        parentMenu.setIcon(QIcon(PLUGIN_HOME_DIR + 'pylint.png'))
+        self.__dirRunAction = parentMenu.addAction(
+            QIcon(PLUGIN_HOME_DIR + 'pylint.png'),
+            'Run pylint for the directory', self.__runForContextPath)
+        self.__dirCostsRunAction = parentMenu.addAction(
+            QIcon(PLUGIN_HOME_DIR + 'pylint.png'),
+            'Run pylint for the directory with profiling',
+            self.__runForContextPathWithCosts)
+        parentMenu.aboutToShow.connect(self.__contextMenuAboutToShow)
 
     def populateBufferContextMenu(self, parentMenu):
         """Populates the editing buffer context menu.
@@ -244,6 +435,9 @@ class PylintPlugin(WizardInterface):
         self.__bufferRunAction = parentMenu.addAction(
             QIcon(PLUGIN_HOME_DIR + 'pylint.png'),
             'Run pylint\t(Ctrl+L)', self.__run)
+        self.__bufferCostsRunAction = parentMenu.addAction(
+            QIcon(PLUGIN_HOME_DIR + 'pylint.png'),
+            'Run pylint with profiling', self.__runWithCosts)
         self.__bufferGenerateAction = parentMenu.addAction(
             QIcon(PLUGIN_HOME_DIR + 'generate.png'),
             'Generate/open pylintrc file', self.__generate)
@@ -251,18 +445,102 @@ class PylintPlugin(WizardInterface):
 
     def configure(self):
         """Configure dialog"""
+        from .pylintconfigdialog import PylintPluginConfigDialog
         PylintPluginConfigDialog(PLUGIN_HOME_DIR, self.ide.mainWindow).exec_()
 
+    def __addButtons(self):
+        """Adds the buttons to the editors open at the start up"""
+        if self.__settings is None:
+            return      # deactivated before the IDE was up
+        started = time.perf_counter()
+        for _, _, tabWidget in self.ide.editorsManager.getTextEditors():
+            self.__addButton(tabWidget)
+        STARTUP_TIMINGS.record('editor buttons',
+                               time.perf_counter() - started)
+        if self.__settings['metricsLog']:
+            appendStartupMetrics(METRICS_LOG)
+
+    def __getScheduler(self):
+        """Provides the single file analysis scheduler; creates it if needed"""
+        if self.__scheduler is None:
+            started = time.perf_counter()
+            from .pylintdriver import PylintDriver
+            from .pylintscheduler import PylintScheduler
+            self.__pylintDriver = PylintDriver(self.ide,
+                                               self.__getResultCache(),
+                                               self.__settings['lintDaemon'])
+            self.__pylintDriver.sigRCFileGenerated.connect(
+                self.__rcFileGenerated)
+            self.__scheduler = PylintScheduler(self.ide, self.__pylintDriver)
+            self.__scheduler.setTriggerProfiles(
+                self.__settings['triggerProfiles'])
+            self.__scheduler.sigFinished.connect(self.__pylintFinished)
+            self.__scheduler.sigMessages.connect(self.__pylintMessages)
+            STARTUP_TIMINGS.record('single file driver creation',
+                                   time.perf_counter() - started)
+        return self.__scheduler
+
+    def __getDriver(self):
+        """Provides the single file analysis driver; creates it if needed"""
+        self.__getScheduler()
+        return self.__pylintDriver
+
+    def __getBatchDriver(self):
+        """Provides the many files analysis driver; creates it if needed"""
+        if self.__batchDriver is None:
+            started = time.perf_counter()
+            from .pylintbatch import PylintBatchDriver
+            self.__batchDriver = PylintBatchDriver(
+                self.ide, self.__getResultCache(),
+                useDaemon=self.__settings['lintDaemon'],
+                poolSize=self.__settings['batchPoolSize'])
+            self.__batchDriver.sigFinished.connect(self.__batchFinished)
+            self.__batchDriver.sigProgress.connect(self.__batchProgress)
+            STARTUP_TIMINGS.record('batch driver creation',
+                                   time.perf_counter() - started)
+        return self.__batchDriver
+
+    def __getResultCache(self):
+        """Provides the results cache shared by the drivers"""
+        if self.__resultCache is None:
+            from .pylintdriver import getResultCacheDir
+            from .pylintcache import PylintResultCache
+            cacheDir = self.__settings['resultCacheDir']
+            # A configured, e.g. shared, directory is limited by size only
+            self.__resultCache = PylintResultCache(
+                getResultCacheDir(cacheDir),
+                maxEntries=None if cacheDir else 512,
+                maxBytes=self.__settings['resultCacheSizeMB'] * 1024 * 1024,
+                verifyRate=self.__settings['resultCacheVerifyRate'])
+        return self.__resultCache
+
+    def __getImportIndex(self):
+        """Provides the project import index; creates it if needed"""
+        if self.__importIndex is None:
+            from .pylintimports import PylintImportIndex
+            self.__importIndex = PylintImportIndex(self.ide)
+            self.__importIndex.sigDependents.connect(self.__dependentsFound)
+        return self.__importIndex
+
+    def __getGitChanges(self):
+        """Provides the git changes collector; creates it if needed"""
+        if self.__gitChanges is None:
+            from .pylintgitdiff import PylintGitChanges
+            self.__gitChanges = PylintGitChanges()
+            self.__gitChanges.sigFinished.connect(self.__changesFound)
+        return self.__gitChanges
+
+    def __isBatchInProcess(self):
+        """True if a many files analysis is running"""
+        return self.__batchDriver is not None and \
+               self.__batchDriver.isInProcess()
+
     def __canRun(self, editorWidget):
         """Tells if pylint can be run for the given editor widget"""
-        if self.__pylintDriver.isInProcess():
-            return False, None
         if editorWidget.getType() != MainWindowTabWidgetBase.PlainTextEditor:
             return False, None
         if not isPythonMime(editorWidget.getMime()):
             return False, None
-        if editorWidget.isModified():
-            return False, 'Save changes before running pylint'
         if not os.path.isabs(editorWidget.getFileName()):
             return False, 'The new file has never been saved yet. ' \
                           'Save it before running pylint'
@@ -270,6 +548,14 @@ class PylintPlugin(WizardInterface):
 
     def __run(self):
         """Runs the pylint analysis"""
+        self.__runCurrent(TRIGGER_RUN)
+
+    def __runWithCosts(self):
+        """Runs the pylint analysis measuring the checkers cost"""
+        self.__runCurrent(TRIGGER_COSTS)
+
+    def __runCurrent(self, trigger):
+        """Runs the pylint analysis of the current buffer"""
         editorWidget = self.ide.currentEditorWidget
         canRun, message = self.__canRun(editorWidget)
         if not canRun:
@@ -277,12 +563,352 @@ class PylintPlugin(WizardInterface):
                 self.ide.showStatusBarMessage(message)
             return
 
-        enc = editorWidget.getEncoding()
-        message = self.__pylintDriver.start(editorWidget.getFileName(), enc)
+        # A queued or stale analysis of the same file is superseded
+        fileName = editorWidget.getFileName()
+        self.__getScheduler().submit(fileName, editorWidget.getEncoding(),
+                                     self.__getBufferContent(editorWidget),
+                                     trigger)
+        self.__updateBusyState()
+        self.ide.showStatusBarMessage('pylint: analyzing ' + fileName)
+
+    @staticmethod
+    def __getBufferContent(editorWidget):
+        """Provides the buffer content if it differs from the disk file"""
+        if editorWidget.isModified():
+            return editorWidget.getEditor().text
+        return None
+
+    def __liveModeToggled(self, checked):
+        """The as you type mode has been switched on or off"""
+        self.__settings['lintAsYouType'] = checked
+        if not checked:
+            self.__liveTimer.stop()
+
+    def __daemonModeToggled(self, checked):
+        """The shared lint daemon has been switched on or off"""
+        self.__settings['lintDaemon'] = checked
+        if self.__pylintDriver is not None:
+            self.__pylintDriver.setDaemonMode(checked)
+        if self.__batchDriver is not None:
+            self.__batchDriver.setDaemonMode(checked)
+
+    def __metricsLogToggled(self, checked):
+        """The timings log has been switched on or off"""
+        self.__settings['metricsLog'] = checked
+        if checked:
+            logging.info('pylint analysis timings go to ' + METRICS_LOG)
+
+    def __logMetrics(self, results):
+        """Appends the results timings to the metrics log if enabled"""
+        if self.__settings['metricsLog']:
+            appendMetrics(METRICS_LOG, results)
+
+    def __saveModeToggled(self, checked):
+        """The on save mode has been switched on or off"""
+        self.__settings['lintOnSave'] = checked
+        if not checked:
+            self.__savedFiles = []
+
+    @measureStall('buffer change')
+    def __textChanged(self):
+        """Triggered when an editor content is changed"""
+        if not self.__settings['lintAsYouType']:
+            return
+        editorWidget = self.ide.currentEditorWidget
+        if editorWidget.getType() != MainWindowTabWidgetBase.PlainTextEditor:
+            return
+        if self.sender() is not editorWidget.getEditor():
+            return
+        self.__liveGeneration += 1
+        self.__liveTimer.start()        # restarts if already active
+
+    def __startLiveRun(self):
+        """The editing has paused: analyze the current buffer"""
+        if not self.__settings['lintAsYouType']:
+            return
+
+        editorWidget = self.ide.currentEditorWidget
+        canRun, _ = self.__canRun(editorWidget)
+        if not canRun:
+            return
+
+        # An analysis of the previous buffer content is cancelled
+        started = time.monotonic()
+        self.__getScheduler().submit(editorWidget.getFileName(),
+                                     editorWidget.getEncoding(),
+                                     self.__getBufferContent(editorWidget),
+                                     TRIGGER_LIVE)
+        self.__updateBusyState()
+        self.__liveRun = (editorWidget, self.__liveGeneration)
+        self.__checkFrameBudget(started, 'start')
+
+    def __liveRunFinished(self, results):
+        """Handles the results of an as you type analysis"""
+        if self.__liveRun is None:
+            return
+        editorWidget, generation = self.__liveRun
+        if results['FileName'] != editorWidget.getFileName():
+            # An earlier analysis of another buffer
+            return
+        self.__liveRun = None
+
+        if editorWidget is not self.ide.currentEditorWidget or \
+           generation != self.__liveGeneration:
+            # Stale: the buffer has been changed since the analysis started
+            if not self.__liveTimer.isActive():
+                self.__startLiveRun()
+            return
+
+        if results.get('ProcessError', None):
+            # Incomplete code is often not parsable at all
+            return
+
+        started = time.monotonic()
+        messages = tuple(tuple(map(tuple, results[category]))
+                         for category in 'CRWE')
+        if messages != self.__liveMessages:
+            self.__liveMessages = messages
+            self.__startLiveFeed(results, messages)
+        self.__checkFrameBudget(started, 'results update')
+
+    def __startLiveFeed(self, results, messages):
+        """Starts showing the as you type results a slice at a time.
+
+        The view is populated the way a running analysis adds its messages,
+        so showResults() at the end only does the final touches.
+        """
+        self.__stopLiveFeed()
+        batches = deque()
+        for categoryMessages in messages:
+            for pos in range(0, len(categoryMessages), LIVE_FEED_BATCH):
+                batches.append(categoryMessages[pos:pos + LIVE_FEED_BATCH])
+        self.__liveFeed = (results, batches)
+        # The first slice goes at once so that the old results do not blink
+        self.__resultViewer.getViewer().clear()
+        self.__feedLiveSlice()
+
+    def __stopLiveFeed(self):
+        """Abandons showing the as you type results"""
+        self.__liveFeedTimer.stop()
+        self.__liveFeed = None
+
+    @measureStall('as you type results slice')
+    def __feedLiveSlice(self):
+        """Adds the as you type messages to the view for a frame budget"""
+        if self.__liveFeed is None:
+            return
+        results, batches = self.__liveFeed
+        viewer = self.__resultViewer.getViewer()
+        deadline = time.monotonic() + FRAME_BUDGET_MS / 1000.0
+        while batches and time.monotonic() < deadline:
+            viewer.appendMessages(results['FileName'], batches.popleft())
+        if batches:
+            self.__liveFeedTimer.start()
+            return
+        self.__liveFeed = None
+        viewer.showResults(results)
+
+    @staticmethod
+    def __checkFrameBudget(started, what):
+        """Logs the as you type GUI thread work exceeding the frame budget"""
+        spent = (time.monotonic() - started) * 1000.0
+        if spent > FRAME_BUDGET_MS:
+            logging.debug('pylint as you type ' + what + ' took %.1f ms' %
+                          spent)
+
+    def __runForContextPath(self):
+        """Runs the pylint analysis for a project viewer file or directory"""
+        path = self.sender().data()
+        if path:
+            self.__runBatch(path)
+
+    def __runForContextPathWithCosts(self):
+        """Runs the pylint analysis for a directory measuring the costs"""
+        path = self.sender().data()
+        if path:
+            self.__runBatch(path, costs=True)
+
+    def __runForProject(self):
+        """Runs the pylint analysis for the whole project"""
+        if self.ide.project.isLoaded():
+            self.__runBatch(self.ide.project.getProjectDir())
+
+    def __runForProjectWithCosts(self):
+        """Runs the pylint analysis for the project measuring the costs"""
+        if self.ide.project.isLoaded():
+            self.__runBatch(self.ide.project.getProjectDir(), costs=True)
+
+    def __runBatch(self, path, costs=False):
+        """Runs the pylint analysis for all the python files in the path"""
+        from .pylintbatch import collectPythonFiles
+        path = os.path.abspath(str(path))
+        fileNames = collectPythonFiles(path)
+        rootPath = path if os.path.isdir(path) else os.path.dirname(path)
+        profile = self.__getProfile(TRIGGER_COSTS if costs
+                                    else TRIGGER_PROJECT)
+        message = self.__getBatchDriver().start(rootPath, fileNames,
+                                                profile=profile, costs=costs)
+        self.__updateBusyState()
+        if message is None:
+            self.__lastBatch = (rootPath, fileNames, profile)
+            self.ide.showStatusBarMessage('pylint: analyzing ' +
+                                          str(len(fileNames)) + ' file(s)')
+        else:
+            self.ide.showStatusBarMessage(message)
+
+    def __getProfile(self, trigger):
+        """Provides the checker profile for the trigger"""
+        return getTriggerProfile(self.__settings['triggerProfiles'], trigger)
+
+    def __getWorkDir(self):
+        """Provides the project or the current file directory"""
+        if self.ide.project.isLoaded():
+            return self.ide.project.getProjectDir()
+        fileName = self.ide.currentEditorWidget.getFileName()
+        if os.path.isabs(fileName):
+            return os.path.dirname(fileName)
+        return None
+
+    def __runForChanges(self):
+        """Runs the pylint analysis for the files changed since HEAD"""
+        self.__startChanges('HEAD')
+
+    def __runForChangesSince(self):
+        """Runs the pylint analysis for the files changed since a commit"""
+        base, accepted = QInputDialog.getText(
+            self.ide.mainWindow, 'Run pylint for the changes',
+            'Compare the working tree with (a branch, a tag or a commit):',
+            text=self.__settings['diffBase'])
+        base = base.strip()
+        if accepted and base:
+            self.__settings['diffBase'] = base
+            self.__startChanges(base)
+
+    def __startChanges(self, base):
+        """Starts collecting the changes since the base"""
+        workDir = self.__getWorkDir()
+        if workDir is None:
+            self.ide.showStatusBarMessage(
+                'pylint: no project and the current file is not saved')
+            return
+        self.__changesBase = base
+        message = self.__getGitChanges().start(workDir, base)
+        if message is None:
+            self.ide.showStatusBarMessage('pylint: collecting the changes '
+                                          'since ' + base)
+        else:
+            self.ide.showStatusBarMessage(message)
+
+    def __changesFound(self, topDir, changes, error):
+        """The changed files and lines are collected"""
+        if error:
+            logging.error(error)
+            return
+        from .pylintbatch import PYTHON_SUFFIXES
+        fileNames = sorted(name for name in changes
+                           if name.endswith(PYTHON_SUFFIXES) and
+                           os.path.isfile(name))
+        if not fileNames:
+            self.ide.showStatusBarMessage('pylint: no python files changed '
+                                          'since ' + self.__changesBase)
+            return
+
+        lineFilter = None
+        if self.__settings['diffChangedLinesOnly']:
+            lineFilter = changes
+        message = self.__getBatchDriver().start(
+            topDir, fileNames, lineFilter=lineFilter,
+            details={'DiffBase': self.__changesBase},
+            profile=self.__getProfile(TRIGGER_CHANGES))
+        self.__updateBusyState()
+        if message is None:
+            self.ide.showStatusBarMessage(
+                'pylint: analyzing ' + str(len(fileNames)) +
+                ' file(s) changed since ' + self.__changesBase)
+        else:
+            self.ide.showStatusBarMessage(message)
+
+    def __changedLinesToggled(self, checked):
+        """The changes analysis lines filter has been switched on or off"""
+        self.__settings['diffChangedLinesOnly'] = checked
+
+    @measureStall('batch progress')
+    def __batchProgress(self, done, total):
+        """Batch analysis progress"""
+        self.ide.showStatusBarMessage('pylint: ' + str(done) + ' of ' +
+                                      str(total) + ' file(s) analyzed')
+
+    @measureStall('batch results shown')
+    def __batchFinished(self, results):
+        """Batch analysis has finished"""
+        self.__updateBusyState()
+        self.ide.showStatusBarMessage(
+            'pylint: ' + str(len(results['Files'])) + ' file(s) analyzed, ' +
+            str(results['CachedFiles']) + ' taken from cache')
+        self.__liveMessages = None
+        self.__stopLiveFeed()
+        self.__resultViewer.getViewer().showResults(results)
+        self.ide.mainWindow.activateBottomTab('pylint')
+        self.__logMetrics(results)
+        if self.__savedFiles:
+            self.__runSaved()
+
+    def __projectChanged(self, what):
+        """The project has been changed or its properties updated"""
+        del what            # unused argument
+
+        # The import directories may differ
+        if self.__importIndex is not None:
+            self.__importIndex.clear()
+        self.__lastBatch = None
+
+    @measureStall('dependents found')
+    def __dependentsFound(self, fileName, dependents):
+        """The files which import the saved file are known"""
+        if not self.__settings['lintOnSave']:
+            return
+        for name in [fileName] + dependents:
+            if name not in self.__savedFiles:
+                self.__savedFiles.append(name)
+        if not self.__isBatchInProcess():
+            self.__runSaved()
+
+    def __runSaved(self):
+        """Analyzes the saved files and their dependents.
+
+        If the last full run covered the files then it is repeated with its
+        profile so the view has all of its files; the files not affected by
+        the saves come from the cache: the profile is a part of the key.
+        """
+        refresh = self.__savedFiles
+        self.__savedFiles = []
+        if self.__lastBatch is not None and \
+           set(refresh).issubset(self.__lastBatch[1]):
+            rootPath, fileNames, profile = self.__lastBatch
+        else:
+            rootPath = os.path.dirname(refresh[0])
+            fileNames = sorted(refresh)
+            profile = self.__getProfile(TRIGGER_SAVE)
+
+        message = self.__getBatchDriver().start(rootPath, fileNames, refresh,
+                                                profile=profile)
+        self.__updateBusyState()
         if message is None:
-            self.__switchToRunning()
+            self.ide.showStatusBarMessage(
+                'pylint: analyzing ' + str(len(refresh)) +
+                ' saved and dependent file(s)')
         else:
-            logging.error(message)
+            self.ide.showStatusBarMessage(message)
+
+    def __contextMenuAboutToShow(self):
+        """The project viewer context menu is about to show"""
+        busy = self.__isBatchInProcess()
+        if self.__fileRunAction is not None:
+            self.__fileRunAction.setEnabled(not busy)
+        if self.__dirRunAction is not None:
+            self.__dirRunAction.setEnabled(not busy)
+        if self.__dirCostsRunAction is not None:
+            self.__dirCostsRunAction.setEnabled(not busy)
 
     def __generate(self):
         """[Generates and] opens the pylintrc file"""
@@ -290,7 +916,7 @@ class PylintPlugin(WizardInterface):
         fileName = editorWidget.getFileName()
         if not os.path.isabs(fileName):
             fileName = None
-        rcfile = self.__pylintDriver.getPylintrc(self.ide, fileName)
+        rcfile = getConfigResolver(self.ide).getPylintrc(fileName)
         if not rcfile:
             if fileName is None and not self.ide.project.isLoaded():
                 logging.error('Cannot generate pylintrc. '
@@ -298,69 +924,121 @@ class PylintPlugin(WizardInterface):
                               'and there is no project')
                 return
 
-            QApplication.setOverrideCursor(QCursor(Qt.WaitCursor))
-            rcfile = self.__pylintDriver.generateRCFile(self.ide, fileName)
-            QApplication.restoreOverrideCursor()
+            # The file is opened when it is generated
+            rcfile = self.__getDriver().generateRCFile(self.ide, fileName)
+            if rcfile:
+                self.ide.showStatusBarMessage('pylint: generating ' + rcfile)
+            return
 
-        if rcfile:
-            if os.path.exists(rcfile):
-                self.ide.mainWindow.openFile(rcfile, 0)
-                return
+        self.ide.mainWindow.openFile(rcfile, 0)
 
-        # It really could be only the rc generating error
-        logging.error('Error generating pylintrc file ' + str(rcfile))
+    @measureStall('pylintrc generated')
+    def __rcFileGenerated(self, rcfile, error):
+        """The pylintrc file generation has finished"""
+        if not error and os.path.exists(rcfile):
+            self.ide.mainWindow.openFile(rcfile, 0)
+            return
+        message = 'Error generating pylintrc file ' + rcfile
+        if error:
+            message += ': ' + error
+        logging.error(message)
+
+    def __showStalls(self):
+        """Logs the longest GUI thread stalls caused by the plugin"""
+        spent, place = LATENCY_PROBE.getLongest()
+        if place is not None:
+            self.ide.showStatusBarMessage(
+                'pylint: the longest GUI thread stall is %.1f ms in %s' %
+                (spent, place))
+        logging.info(LATENCY_PROBE.getReport())
+        logging.info(STARTUP_TIMINGS.getReport())
+
+    @measureStall('messages shown')
+    def __pylintMessages(self, fileName, trigger, messages):
+        """A batch of messages is available while pylint is running"""
+        if trigger == TRIGGER_LIVE:
+            # The as you type results are shown only when complete
+            return
+        self.__stopLiveFeed()
+        self.__resultViewer.getViewer().appendMessages(fileName, messages)
+        self.ide.mainWindow.activateBottomTab('pylint')
 
+    @measureStall('results shown')
     def __pylintFinished(self, results):
         """Pylint has finished"""
-        self.__switchToIdle()
+        self.__updateBusyState()
+        if results.get('Trigger', None) == TRIGGER_LIVE:
+            self.__liveRunFinished(results)
+            self.__logMetrics(results)
+            return
+
+        self.__liveMessages = None
+        self.__stopLiveFeed()
         error = results.get('ProcessError', None)
         if error:
             logging.error(error)
         else:
-            self.__resultViewer.showResults(results)
+            self.__resultViewer.getViewer().showResults(results)
             self.ide.mainWindow.activateBottomTab('pylint')
-
-    def __switchToRunning(self):
-        """Switching to the running mode"""
-        QApplication.setOverrideCursor(QCursor(Qt.WaitCursor))
-        # disable buttons
-        for _, _, tabWidget in self.ide.editorsManager.getTextEditors():
-            pylintAction = tabWidget.toolbar.findChild(QAction, 'pylint')
-            if pylintAction is not None:
-                pylintAction.setEnabled(False)
-        # disable menu
-
-    def __switchToIdle(self):
-        """Switching to the idle mode"""
-        QApplication.restoreOverrideCursor()
-        # enable buttons
-        for _, _, tabWidget in self.ide.editorsManager.getTextEditors():
-            pylintAction = tabWidget.toolbar.findChild(QAction, 'pylint')
-            if pylintAction is not None:
-                pylintAction.setEnabled(self.__canRun(tabWidget)[0])
-        # enable menu
+        self.__logMetrics(results)
 
     def __addButton(self, tabWidget):
         """Adds a button to the editor toolbar"""
+        if self.__actions.get(tabWidget) is not None:
+            return      # added when the tab was opened
         pylintButton = QAction(QIcon(PLUGIN_HOME_DIR + 'pylint.png'),
-                               'Run pylint (Ctrl+L)', tabWidget.toolbar)
-        pylintButton.setEnabled(self.__canRun(tabWidget)[0])
+                               RUN_TOOLTIP, tabWidget.toolbar)
         pylintButton.triggered.connect(self.__run)
         pylintButton.setObjectName('pylint')
+        self.__actions.add(tabWidget, pylintButton)
+        self.__actions.apply(tabWidget, self.__canRun(tabWidget)[0])
 
         beforeWidget = tabWidget.toolbar.findChild(QAction,
                                                    'deadCodeScriptButton')
         tabWidget.toolbar.insertAction(beforeWidget, pylintButton)
         tabWidget.getEditor().modificationChanged.connect(
             self.__modificationChanged)
+        tabWidget.getEditor().textChanged.connect(self.__textChanged)
 
     def __modificationChanged(self):
         """Triggered when one of the text editors changed their mod state"""
-        pylintAction = self.ide.currentEditorWidget.toolbar.findChild(QAction,
-                                                                      'pylint')
-        if pylintAction is not None:
-            pylintAction.setEnabled(
-                self.__canRun(self.ide.currentEditorWidget)[0])
+        self.__updateCurrentButton(True)
+
+    def __currentTabChanged(self, index):
+        """The current editor tab has changed"""
+        del index           # unused argument
+        self.__updateCurrentButton(False)
+
+    def __updateCurrentButton(self, checkRun):
+        """Brings the current editor button up to date.
+
+        The run ability is checked again only if asked; it changes with the
+        editor events rather than with the tab switches.
+        """
+        editorWidget = self.ide.currentEditorWidget
+        if self.__actions.get(editorWidget) is None:
+            return
+        canRun = self.__canRun(editorWidget)[0] if checkRun else None
+        self.__actions.apply(editorWidget, canRun)
+
+    def __updateBusyState(self):
+        """Updates the shared busy state of the editor buttons"""
+        busy = self.__isBatchInProcess() or \
+               (self.__scheduler is not None and self.__scheduler.isBusy())
+        if self.__actions.setBusy(busy):
+            self.__updateCurrentButton(False)
+
+    def __fileUpdated(self, fileName, uuid):
+        """Triggered when a file is saved"""
+        del uuid            # unused argument
+
+        # The analysis of the content before saving is stale
+        if self.__scheduler is not None:
+            self.__scheduler.fileSaved(fileName)
+        if self.__settings['lintOnSave']:
+            from .pylintbatch import PYTHON_SUFFIXES
+            if fileName.endswith(PYTHON_SUFFIXES):
+                self.__getImportIndex().fileSaved(fileName)
 
     def __textEditorTabAdded(self, tabIndex):
         """Triggered when a new tab is added"""
@@ -375,16 +1053,13 @@ class PylintPlugin(WizardInterface):
         del mime            # unused argument
 
         # Supposedly it can happened only on the current tab
-        pylintAction = self.ide.currentEditorWidget.toolbar.findChild(QAction,
-                                                                      'pylint')
-        if pylintAction is not None:
-            pylintAction.setEnabled(
-                self.__canRun(self.ide.currentEditorWidget)[0])
+        self.__updateCurrentButton(True)
 
     def __bufferMenuAboutToShow(self):
         """The buffer context menu is about to show"""
         runEnable, generateState = self.__calcRunGenerateState()
         self.__bufferRunAction.setEnabled(runEnable)
+        self.__bufferCostsRunAction.setEnabled(runEnable)
         self.__bufferGenerateAction.setEnabled(generateState[0])
         self.__bufferGenerateAction.setText(generateState[1])
 
@@ -392,6 +1067,17 @@ class PylintPlugin(WizardInterface):
         """The main menu is about to show"""
         runEnable, generateState = self.__calcRunGenerateState()
         self.__mainRunAction.setEnabled(runEnable)
+        self.__mainCostsRunAction.setEnabled(runEnable)
+        self.__mainProjectRunAction.setEnabled(
+            self.ide.project.isLoaded() and not self.__isBatchInProcess())
+        self.__mainProjectCostsRunAction.setEnabled(
+            self.__mainProjectRunAction.isEnabled())
+        changesEnable = not self.__isBatchInProcess() and \
+                        (self.__gitChanges is None or
+                         not self.__gitChanges.isInProcess()) and \
+                        self.__getWorkDir() is not None
+        self.__mainChangesAction.setEnabled(changesEnable)
+        self.__mainChangesSinceAction.setEnabled(changesEnable)
         self.__mainGenerateAction.setEnabled(generateState[0])
         self.__mainGenerateAction.setText(generateState[1])
 
@@ -403,20 +1089,16 @@ class PylintPlugin(WizardInterface):
             return False, (False, defaultGenerateText)
         if not isPythonMime(editorWidget.getMime()):
             return False, (False, defaultGenerateText)
-        if self.__pylintDriver.isInProcess():
-            return False, (False, defaultGenerateText)
+        if self.__pylintDriver is not None and \
+           self.__pylintDriver.isGeneratingRCFile():
+            return True, (False, defaultGenerateText)
 
         fileName = editorWidget.getFileName()
         if not os.path.isabs(fileName):
             fileName = None
-        rcfile = self.__pylintDriver.getPylintrc(self.ide, fileName)
-
-        if editorWidget.isModified():
-            if rcfile:
-                return False, (True, defaultGenerateText)
-            return False, (True, 'Generate and open pylintrc file')
+        rcfile = getConfigResolver(self.ide).getPylintrc(fileName)
 
-        # Saved python file and no pylint running
+        # Python file and no pylint running
         if rcfile:
             return fileName is not None, (True, defaultGenerateText)
         return fileName is not None, (True, 'Generate and open pylintrc file')
@@ -0,0 +1,90 @@
+# -*- coding: utf-8 -*-
+#
+# codimension - graphics python two-way code editor and analyzer
+# Copyright (C) 2019  Sergey Satskiy <sergey.satskiy@gmail.com>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+
+"""Codimension pylint editor toolbar buttons registry"""
+
+
+RUN_TOOLTIP = 'Run pylint (Ctrl+L)'
+BUSY_TOOLTIP = 'Run pylint (Ctrl+L); another analysis is in progress ' \
+               'so the run will be queued'
+
+
+class PylintActionRegistry:
+
+    """The pylint buttons of the editor toolbars.
+
+    The buttons are found by the editor widget rather than by searching the
+    toolbar children. The busy state is shared by all the buttons: it is
+    applied to a button when its editor becomes current, so a change costs
+    the same regardless of the number of the open editors.
+    """
+
+    def __init__(self):
+        self.__entries = {}         # editor widget -> [action, state]
+        self.__busy = False
+
+    def __len__(self):
+        return len(self.__entries)
+
+    def add(self, tabWidget, action):
+        """Registers the button of the editor"""
+        self.__entries[tabWidget] = [action, None]
+        # The button goes with its editor toolbar when the tab is closed
+        action.destroyed.connect(lambda: self.__entries.pop(tabWidget, None))
+
+    def get(self, tabWidget):
+        """Provides the button of the editor or None"""
+        entry = self.__entries.get(tabWidget, None)
+        return None if entry is None else entry[0]
+
+    def takeAll(self):
+        """Unregisters all the buttons; provides the (editor, button) pairs"""
+        entries = self.__entries
+        self.__entries = {}
+        return [(tabWidget, entry[0]) for tabWidget, entry in entries.items()]
+
+    def isBusy(self):
+        """True if an analysis is in progress"""
+        return self.__busy
+
+    def setBusy(self, busy):
+        """Sets the shared busy state; True if it has changed"""
+        if busy == self.__busy:
+            return False
+        self.__busy = busy
+        return True
+
+    def apply(self, tabWidget, canRun=None):
+        """Brings the editor button up to date if it is not.
+
+        If canRun is None then the run ability is the one applied last time.
+        """
+        entry = self.__entries.get(tabWidget, None)
+        if entry is None:
+            return
+        if canRun is None:
+            canRun = entry[1] is not None and entry[1][0]
+        state = (canRun, self.__busy)
+        if entry[1] == state:
+            return
+        entry[1] = state
+        action = entry[0]
+        action.setEnabled(canRun)
+        action.setToolTip(BUSY_TOOLTIP if self.__busy else RUN_TOOLTIP)
@@ -0,0 +1,298 @@
+# -*- coding: utf-8 -*-
+#
+# codimension - graphics python two-way code editor and analyzer
+# Copyright (C) 2019  Sergey Satskiy <sergey.satskiy@gmail.com>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+"""Codimension pylint batch driver: analysis of many files in parallel"""
+
+
+import os
+import os.path
+import time
+from collections import deque
+from ui.qt import QObject, pyqtSignal, QTimer
+from utils.misc import getLocaleDateTime
+from .pylintdriver import PylintDriver
+from .pylintresultstore import PylintResultStore, CATEGORIES
+from .pylintrawoutput import RawOutputWriter
+from .pylintprofiles import PROFILE_FULL
+from .pylintmetrics import addTiming, mergeTimings
+
+
+PYTHON_SUFFIXES = ('.py', '.py3', '.pyw')
+SKIP_DIRS = ('__pycache__', '.git', '.hg', '.svn', '.tox', '.nox', 'venv',
+             '.venv', 'node_modules')
+
+
+def collectPythonFiles(path):
+    """Provides a sorted list of python files for a file or a directory"""
+    if os.path.isfile(path):
+        if path.endswith(PYTHON_SUFFIXES):
+            return [os.path.abspath(path)]
+        return []
+
+    files = []
+    for dirPath, dirNames, fileNames in os.walk(path):
+        dirNames[:] = [name for name in dirNames
+                       if name not in SKIP_DIRS and not name.startswith('.')]
+        for fileName in fileNames:
+            if fileName.endswith(PYTHON_SUFFIXES):
+                files.append(os.path.abspath(os.path.join(dirPath,
+                                                          fileName)))
+    files.sort()
+    return files
+
+
+class PylintBatchDriver(QObject):
+
+    """Runs pylint for many files using a pool of drivers.
+
+    Each driver analyzes one file at a time with its own warm worker or its
+    own lint daemon connection, so the number of drivers is the number of
+    files analyzed in parallel. A worker is a resident pylint interpreter
+    so the pool size is configurable and the idle pool is shut down.
+    The per file results are merged into a single results dictionary;
+    the messages are merged into a compact store under the 'Messages' key.
+
+    pylint sees one file per run, so the checks which need many modules at
+    once, e.g. duplicate-code and cyclic-import, report nothing here.
+    """
+
+    sigFinished = pyqtSignal(dict)
+    sigProgress = pyqtSignal(int, int)      # files done, files total
+
+    # The idle pool is shut down after this period
+    IDLE_SHUTDOWN_MS = 5 * 60 * 1000
+
+    def __init__(self, ide, resultCache, parent=None, useDaemon=False,
+                 poolSize=0):
+        QObject.__init__(self, parent)
+
+        self.__ide = ide
+        self.__resultCache = resultCache
+        self.__useDaemon = useDaemon
+        self.__poolSize = poolSize
+        self.__drivers = []
+        self.__busy = {}            # driver -> file name
+        self.__queue = deque()
+        self.__refresh = set()
+        self.__lineFilter = None
+        self.__profile = PROFILE_FULL
+        self.__costs = None         # None or {'checkers': {}, 'modules': {}}
+        self.__results = None
+        self.__total = 0
+        self.__done = 0
+        self.__startedAt = None
+        self.__stdout = None
+        self.__stderr = None
+
+        self.__idleTimer = QTimer(self)
+        self.__idleTimer.setSingleShot(True)
+        self.__idleTimer.setInterval(self.IDLE_SHUTDOWN_MS)
+        self.__idleTimer.timeout.connect(self.__shutdownPool)
+
+    def setDaemonMode(self, enabled):
+        """Switches on or off serving the files by the lint daemon"""
+        self.__useDaemon = enabled
+        for driver in self.__drivers:
+            driver.setDaemonMode(enabled)
+
+    def isInProcess(self):
+        """True if the batch analysis is running"""
+        return self.__results is not None
+
+    def start(self, rootPath, fileNames, refresh=(), lineFilter=None,
+              details=None, profile=PROFILE_FULL, costs=False):
+        """Starts the analysis of the given files.
+
+        The files in refresh are analyzed even if they have cached results.
+        The line filter, if given, maps a file name to the LineIntervals
+        the messages are kept for; None or a missing file keeps them all.
+        The details are added to the results dictionary as they are.
+        The profile is the checker profile all the files are analyzed with.
+        If costs is True then the checkers cost is measured for each file
+        and summed up in the 'CheckerCosts' and 'ModuleCosts' of the results.
+        """
+        if self.__results is not None:
+            return 'Another pylint batch analysis is in progress'
+        if not fileNames:
+            return 'No python files found in ' + rootPath
+
+        self.__idleTimer.stop()
+        self.__queue = deque(fileNames)
+        self.__refresh = set(refresh)
+        self.__lineFilter = lineFilter
+        self.__profile = profile
+        self.__costs = {'checkers': {}, 'modules': {}} if costs else None
+        self.__total = len(fileNames)
+        self.__done = 0
+        self.__startedAt = time.monotonic()
+        self.__results = {'FileName': rootPath,
+                          'Files': list(fileNames),
+                          'Timestamp': getLocaleDateTime(),
+                          'Messages': PylintResultStore(),
+                          'CachedFiles': 0,
+                          'AstroidCacheHits': 0,
+                          'AstroidCacheMisses': 0,
+                          'Timings': {},
+                          'Profile': profile}
+        if lineFilter is not None:
+            self.__results['FilteredMessages'] = 0
+        if details:
+            self.__results.update(details)
+        # The raw output goes to a temporary file when it is big
+        self.__stdout = RawOutputWriter()
+        self.__stderr = RawOutputWriter()
+
+        poolSize = min(self.__poolSize or os.cpu_count() or 1,
+                       len(fileNames))
+        while len(self.__drivers) < poolSize:
+            driver = PylintDriver(self.__ide, self.__resultCache,
+                                  self.__useDaemon)
+            driver.sigFinished.connect(self.__fileFinished)
+            self.__drivers.append(driver)
+
+        for driver in self.__drivers[:poolSize]:
+            self.__feed(driver)
+        if not self.__busy:
+            # Nothing could be started; report asynchronously anyway
+            QTimer.singleShot(0, self.__checkFinished)
+        return None
+
+    def stop(self):
+        """Interrupts the analysis"""
+        self.__queue.clear()
+        for driver in self.__busy:
+            driver.stop()
+        self.__busy = {}
+        self.__results = None
+        for writer in (self.__stdout, self.__stderr):
+            if writer is not None:
+                writer.discard()
+        self.__stdout = None
+        self.__stderr = None
+        self.__idleTimer.start()
+
+    def shutdown(self):
+        """Interrupts the analysis and stops the pool"""
+        self.stop()
+        self.__shutdownPool()
+
+    def __shutdownPool(self):
+        """Stops the pool workers"""
+        self.__idleTimer.stop()
+        for driver in self.__drivers:
+            driver.shutdown()
+            driver.deleteLater()
+        self.__drivers = []
+
+    def __feed(self, driver):
+        """Gives the next file to the driver"""
+        while self.__queue:
+            fileName = self.__queue.popleft()
+            message = driver.start(fileName, None,
+                                   refresh=fileName in self.__refresh,
+                                   profile=self.__profile,
+                                   costs=self.__costs is not None)
+            if message is None:
+                self.__busy[driver] = fileName
+                return
+            self.__addError(fileName, message)
+            self.__done += 1
+
+    def __fileFinished(self, results):
+        """One file analysis has finished"""
+        driver = self.sender()
+        fileName = self.__busy.pop(driver, None)
+        if fileName is None or self.__results is None:
+            return
+
+        self.__done += 1
+        error = results.get('ProcessError', None)
+        if error:
+            self.__addError(fileName, error)
+        else:
+            store = self.__results['Messages']
+            lines = None
+            if self.__lineFilter is not None:
+                lines = self.__lineFilter.get(fileName, None)
+            for category in CATEGORIES:
+                messages = results[category]
+                if lines is not None:
+                    kept = [message for message in messages
+                            if lines.overlaps(message[1],
+                                              message[6] or message[1])]
+                    self.__results['FilteredMessages'] += \
+                        len(messages) - len(kept)
+                    messages = kept
+                store.append(messages)
+            self.__stdout.writeOutput(results.get('StdOut', None))
+            self.__stderr.writeOutput(results.get('StdErr', None))
+            if results.get('Cached', False):
+                self.__results['CachedFiles'] += 1
+            for key in ('AstroidCacheHits', 'AstroidCacheMisses'):
+                self.__results[key] += results.get(key, 0)
+            # The phases are summed over the files; the total is wall time
+            timings = dict(results.get('Timings', {}))
+            timings.pop('Total', None)
+            mergeTimings(self.__results['Timings'], timings)
+            if self.__costs is not None:
+                self.__addCosts(results)
+
+        self.sigProgress.emit(self.__done, self.__total)
+        self.__feed(driver)
+        self.__checkFinished()
+
+    def __checkFinished(self):
+        """Reports the merged results when all the files are done"""
+        if self.__busy or self.__results is None:
+            return
+        results = self.__results
+        results['StdOut'] = self.__stdout.close()
+        results['StdErr'] = self.__stderr.close()
+        addTiming(results['Timings'], 'Total',
+                  time.monotonic() - self.__startedAt)
+        if self.__costs is not None:
+            results['CheckerCosts'] = [
+                (name,) + tuple(values)
+                for name, values in self.__costs['checkers'].items()]
+            results['ModuleCosts'] = [
+                (name,) + tuple(values)
+                for name, values in self.__costs['modules'].items()]
+            self.__costs = None
+        self.__results = None
+        self.__stdout = None
+        self.__stderr = None
+        self.__idleTimer.start()
+        self.sigFinished.emit(results)
+
+    def __addCosts(self, results):
+        """Sums up the checkers and the modules cost of a file"""
+        for key, costs in (('checkers', results.get('CheckerCosts', ())),
+                           ('modules', results.get('ModuleCosts', ()))):
+            total = self.__costs[key]
+            for cost in costs:
+                values = total.get(cost[0], None)
+                if values is None:
+                    total[cost[0]] = list(cost[1:])
+                else:
+                    for index, value in enumerate(cost[1:]):
+                        values[index] += value
+
+    def __addError(self, fileName, message):
+        """Saves a per file error"""
+        self.__stderr.write(fileName + ': ' + message + '\n')
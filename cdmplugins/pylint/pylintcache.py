@@ -0,0 +1,299 @@
+# -*- coding: utf-8 -*-
+#
+# codimension - graphics python two-way code editor and analyzer
+# Copyright (C) 2019  Sergey Satskiy <sergey.satskiy@gmail.com>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+"""Codimension pylint results cache.
+
+   The analysis results are stored on disk, one JSON file per result. The
+   file name is a hash of everything the results depend on: the analyzed
+   file content, the pylintrc content, the init hook, the python, pylint
+   and pylint plugins versions. The file is identified by its path relative
+   to the repository root, so the checkouts at different paths share the
+   results; a hit of another checkout is relocated to the analyzed file.
+
+   The directory may be shared by many processes and hosts, e.g. on an NFS
+   mount, with no locking: an entry is written to a uniquely named temporary
+   file which is renamed to the entry name, so a reader sees either nothing
+   or a complete entry. Each process collects the garbage on its own going
+   by the entries modification time which is updated on use.
+"""
+
+
+import sys
+import os
+import os.path
+import json
+import time
+import random
+import socket
+import hashlib
+import logging
+from collections import OrderedDict
+from .pylintresultstore import CATEGORIES
+
+
+# Must be changed when the format of the cached results changes
+CACHE_FORMAT = '7'
+
+RESULT_SUFFIX = '.json'
+TEMP_SUFFIX = '.tmp'
+
+# The directory is rescanned for the entries of the other processes after
+# this period, seconds
+RESCAN_INTERVAL = 10 * 60
+
+# Temporary files older than this are left by crashed writers, seconds
+STALE_TEMP_AGE = 60 * 60
+
+
+def relocateResults(results, fileName):
+    """Makes the results of another checkout refer to the file"""
+    oldName = results.get('FileName', None)
+    results['FileName'] = fileName
+    for category in CATEGORIES:
+        results[category] = [
+            message[:4] + [fileName] + message[5:]
+            if message[4] == oldName else message
+            for message in results.get(category, [])]
+
+
+def messagesOf(results):
+    """Provides the messages of the results by category"""
+    return [results.get(category, []) for category in CATEGORIES]
+
+
+class PylintResultCache:
+
+    """On disk content addressed LRU cache of the pylint results.
+
+    The max entries could be None to limit the cache by size only. The
+    verify rate is the share of the hits the caller should re-analyze to
+    detect the stale entries, e.g. when an imported module has changed.
+    """
+
+    def __init__(self, cacheDir, maxEntries=512, maxBytes=64 * 1024 * 1024,
+                 verifyRate=0.0):
+        self.__cacheDir = os.path.abspath(cacheDir) + os.path.sep
+        self.__maxEntries = maxEntries
+        self.__maxBytes = maxBytes
+        self.__verifyRate = verifyRate
+
+        # key -> size in bytes; the least recently used go first.
+        # It is loaded lazily when the cache is used the first time.
+        self.__index = None
+        self.__totalBytes = 0
+        self.__scannedAt = None
+
+        # The verified hits and those found stale
+        self.verifiedHits = 0
+        self.staleHits = 0
+
+    @staticmethod
+    def makeKey(fileName, rcfile, initHook, pylintVersion, content=None,
+                profileArgs=None, rcfileHash=None, rootDir=None,
+                plugins=None):
+        """Provides the cache key or None if the file cannot be read.
+
+        The content, if given, is used instead of the file on disk.
+        The profile args are the options added to the pylintrc ones.
+        The pylintrc content hash, if given, saves reading the pylintrc.
+        The root dir, if given, is the one the paths are taken relative to.
+        The plugins are the pylintrc plugins with their versions.
+        """
+        keyName = fileName
+        if rootDir:
+            keyName = os.path.relpath(fileName, rootDir)
+            if initHook:
+                # The import directories are in the checkout as well
+                initHook = initHook.replace(rootDir, '<root>')
+        digest = hashlib.sha256()
+        digest.update(CACHE_FORMAT.encode('utf-8') + b'\0')
+        digest.update(keyName.encode('utf-8') + b'\0')
+        try:
+            if content is None:
+                with open(fileName, 'rb') as diskFile:
+                    digest.update(diskFile.read())
+            else:
+                digest.update(content.encode('utf-8'))
+            digest.update(b'\0')
+            if rcfileHash:
+                digest.update(rcfileHash.encode('utf-8'))
+            elif rcfile:
+                with open(rcfile, 'rb') as diskFile:
+                    digest.update(diskFile.read())
+        except OSError:
+            return None
+        digest.update(b'\0' + str(initHook).encode('utf-8'))
+        digest.update(b'\0' + str(pylintVersion).encode('utf-8'))
+        digest.update(b'\0' + str(sys.version_info[:2]).encode('utf-8'))
+        if plugins:
+            digest.update(b'\0' + '\0'.join(plugins).encode('utf-8'))
+        if profileArgs:
+            digest.update(b'\0' + '\0'.join(profileArgs).encode('utf-8'))
+        return digest.hexdigest()
+
+    @staticmethod
+    def isSameResults(cached, results):
+        """True if the messages of the results are the cached ones"""
+        # The cached tuples have become lists
+        return json.dumps(messagesOf(cached)) == \
+            json.dumps(messagesOf(results))
+
+    def get(self, key):
+        """Provides the cached results or None"""
+        self.__loadIndex()
+        if key is None:
+            return None
+
+        # The entry may have been written by another process since the
+        # directory was scanned so the file is tried anyway
+        path = self.__getPath(key)
+        try:
+            with open(path, 'r', encoding='utf-8') as diskFile:
+                content = diskFile.read()
+            results = json.loads(content)
+            os.utime(path)
+        except FileNotFoundError:
+            self.__forget(key)
+            return None
+        except (OSError, ValueError) as exc:
+            logging.debug('Dropping broken pylint cache entry ' + path +
+                          ': ' + str(exc))
+            self.__remove(key)
+            return None
+
+        self.__account(key, len(content))
+        return results
+
+    def needsVerification(self):
+        """True if a hit is to be re-analyzed to check it is not stale"""
+        return self.__verifyRate > 0.0 and random.random() < self.__verifyRate
+
+    def recordVerification(self, key, stale):
+        """Saves the outcome of a hit re-analysis"""
+        self.verifiedHits += 1
+        if stale:
+            self.staleHits += 1
+            logging.warning('Stale pylint cache entry ' + self.__getPath(key) +
+                            ' (' + str(self.staleHits) + ' out of ' +
+                            str(self.verifiedHits) + ' verified hits)')
+
+    def put(self, key, results):
+        """Stores the results"""
+        self.__loadIndex()
+        if key is None:
+            return
+
+        path = self.__getPath(key)
+        # The name is unique for all the hosts sharing the directory
+        tempPath = '.'.join((path, socket.gethostname(), str(os.getpid()),
+                             '%08x' % random.getrandbits(32))) + TEMP_SUFFIX
+        try:
+            content = json.dumps(results)
+            with open(tempPath, 'w', encoding='utf-8') as diskFile:
+                diskFile.write(content)
+            os.replace(tempPath, path)
+        except (OSError, TypeError, ValueError) as exc:
+            logging.debug('Cannot store pylint results in cache: ' + str(exc))
+            try:
+                os.unlink(tempPath)
+            except OSError:
+                pass
+            return
+
+        self.__account(key, len(content))
+        if time.monotonic() - self.__scannedAt > RESCAN_INTERVAL:
+            # Takes into account what the other processes have written
+            self.__index = None
+            self.__loadIndex()
+        self.__evict()
+
+    def clear(self):
+        """Removes all the cached results"""
+        self.__loadIndex()
+        for key in list(self.__index.keys()):
+            self.__remove(key)
+
+    def __getPath(self, key):
+        """Provides the result file path"""
+        return self.__cacheDir + key + RESULT_SUFFIX
+
+    def __account(self, key, size):
+        """Makes the entry the most recently used one"""
+        self.__totalBytes += size - self.__index.get(key, 0)
+        self.__index[key] = size
+        self.__index.move_to_end(key)
+
+    def __forget(self, key):
+        """Removes the entry from the index; the file is gone"""
+        self.__totalBytes -= self.__index.pop(key, 0)
+
+    def __loadIndex(self):
+        """Builds the LRU index from the cache directory content"""
+        if self.__index is not None:
+            return
+
+        self.__index = OrderedDict()
+        self.__totalBytes = 0
+        self.__scannedAt = time.monotonic()
+        try:
+            os.makedirs(self.__cacheDir, exist_ok=True)
+            entries = []
+            now = time.time()
+            for entry in os.scandir(self.__cacheDir):
+                if not entry.is_file():
+                    continue
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue    # removed by another process
+                if entry.name.endswith(RESULT_SUFFIX):
+                    entries.append((stat.st_mtime,
+                                    entry.name[:-len(RESULT_SUFFIX)],
+                                    stat.st_size))
+                elif entry.name.endswith(TEMP_SUFFIX) and \
+                     now - stat.st_mtime > STALE_TEMP_AGE:
+                    try:
+                        os.unlink(entry.path)
+                    except OSError:
+                        pass
+        except OSError as exc:
+            logging.debug('Cannot read pylint cache directory ' +
+                          self.__cacheDir + ': ' + str(exc))
+            return
+
+        for _, key, size in sorted(entries):
+            self.__index[key] = size
+            self.__totalBytes += size
+        self.__evict()
+
+    def __evict(self):
+        """Removes the least recently used entries over the limits"""
+        while self.__index and (
+                self.__totalBytes > self.__maxBytes or
+                (self.__maxEntries is not None and
+                 len(self.__index) > self.__maxEntries)):
+            self.__remove(next(iter(self.__index)))
+
+    def __remove(self, key):
+        """Removes one entry"""
+        self.__forget(key)
+        try:
+            os.unlink(self.__getPath(key))
+        except OSError:
+            pass    # e.g. removed by another process
@@ -0,0 +1,312 @@
+# -*- coding: utf-8 -*-
+#
+# codimension - graphics python two-way code editor and analyzer
+# Copyright (C) 2019  Sergey Satskiy <sergey.satskiy@gmail.com>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+
+"""Codimension pylint configuration resolution.
+
+   The pylintrc path, the pylintrc content hash, the pylint plugins, the
+   file root directory and the init hook are asked for every time a menu is
+   shown and for every analyzed file so they are cached. The checked
+   directories and the found pylintrc files are watched and the cache is
+   dropped when they change or when the project changes.
+"""
+
+
+import os
+import os.path
+import hashlib
+import logging
+import configparser
+from ui.qt import QObject, QFileSystemWatcher
+
+
+PYLINTRC_NAMES = ('pylintrc', '.pylintrc')
+VCS_DIRS = ('.git', '.hg', '.svn')
+
+# The watches are a limited system resource; when there are this many
+# watched directories the cache is dropped and it starts over
+MAX_WATCHED_DIRS = 256
+
+# top level module -> distributions; built when a plugin is met first
+_PACKAGE_DISTRIBUTIONS = None
+
+
+def isInside(path, dirPath):
+    """True if the path is the directory or is inside of it"""
+    try:
+        return os.path.commonpath([path, dirPath]) == dirPath
+    except ValueError:
+        return False    # e.g. different drives
+
+
+def getPluginVersion(name):
+    """Provides the plugin module name with its distribution version"""
+    global _PACKAGE_DISTRIBUTIONS
+    try:
+        from importlib import metadata
+        if _PACKAGE_DISTRIBUTIONS is None:
+            _PACKAGE_DISTRIBUTIONS = metadata.packages_distributions()
+        for distribution in _PACKAGE_DISTRIBUTIONS.get(name.split('.')[0],
+                                                       []):
+            return name + '==' + metadata.version(distribution)
+    except Exception as exc:
+        logging.debug('pylint: cannot get the plugin ' + name +
+                      ' version: ' + str(exc))
+    return name
+
+
+class PylintConfigResolver(QObject):
+
+    """Caches the pylintrc and the init hook resolution.
+
+    The pylintrc is searched in the file directory and then up the parent
+    directories till the project directory if the file is in the project
+    or till the top python package directory if it is not. The project
+    directory is checked last.
+    """
+
+    def __init__(self, ide, parent=None):
+        QObject.__init__(self, parent)
+
+        self.__ide = ide
+        self.__resolved = {}        # file dir -> pylintrc path or None
+        self.__dirRCFiles = {}      # dir -> pylintrc path in it or None
+        self.__rcHashes = {}        # pylintrc path -> content hash
+        self.__rcPlugins = {}       # pylintrc path -> plugin versions
+        self.__roots = {}           # file dir -> root dir or None
+        self.__initHook = None
+        self.__initHookKnown = False
+
+        self.__watcher = QFileSystemWatcher(self)
+        self.__watcher.directoryChanged.connect(self.__directoryChanged)
+        self.__watcher.fileChanged.connect(self.__fileChanged)
+        ide.project.sigProjectChanged.connect(self.__projectChanged)
+
+    def getPylintrc(self, fileName):
+        """Provides the pylintrc path for the file or None"""
+        fileDir = os.path.dirname(os.path.abspath(fileName)) \
+                  if fileName else None
+        try:
+            return self.__resolved[fileDir]
+        except KeyError:
+            pass
+
+        if len(self.__watcher.directories()) >= MAX_WATCHED_DIRS:
+            self.invalidate()
+        rcfile = None
+        for dirPath in self.__getSearchDirs(fileDir):
+            rcfile = self.__findInDir(dirPath)
+            if rcfile is not None:
+                break
+        self.__resolved[fileDir] = rcfile
+        return rcfile
+
+    def getPylintrcHash(self, rcfile):
+        """Provides the pylintrc content hash or None if it cannot be read"""
+        try:
+            return self.__rcHashes[rcfile]
+        except KeyError:
+            pass
+        try:
+            with open(rcfile, 'rb') as diskFile:
+                digest = hashlib.sha256(diskFile.read()).hexdigest()
+        except OSError:
+            return None
+        if rcfile not in self.__watcher.files():
+            # An editor may replace the file so it is watched again
+            self.__watcher.addPath(rcfile)
+        self.__rcHashes[rcfile] = digest
+        return digest
+
+    def getPlugins(self, rcfile):
+        """Provides the sorted 'name==version' of the pylintrc plugins"""
+        try:
+            return self.__rcPlugins[rcfile]
+        except KeyError:
+            pass
+        parser = configparser.ConfigParser(interpolation=None, strict=False)
+        names = []
+        try:
+            parser.read(rcfile, encoding='utf-8')
+            for section in parser.sections():
+                value = parser[section].get('load-plugins', '')
+                names.extend(name.strip() for name in value.split(',')
+                             if name.strip())
+        except (OSError, configparser.Error) as exc:
+            logging.debug('pylint: cannot read the plugins of ' + rcfile +
+                          ': ' + str(exc))
+        plugins = sorted(getPluginVersion(name) for name in set(names))
+        self.__rcPlugins[rcfile] = plugins
+        return plugins
+
+    def getRootDir(self, fileName):
+        """Provides the repository or project directory of the file.
+
+        The results of the file could be shared between the checkouts so
+        the paths are taken relative to this directory. None if the file
+        is not in a repository or in the project.
+        """
+        fileDir = os.path.dirname(os.path.abspath(fileName))
+        try:
+            return self.__roots[fileDir]
+        except KeyError:
+            pass
+
+        rootDir = None
+        dirPath = fileDir
+        while True:
+            if any(os.path.exists(os.path.join(dirPath, name))
+                   for name in VCS_DIRS):
+                rootDir = dirPath
+                break
+            parentDir = os.path.dirname(dirPath)
+            if parentDir == dirPath:
+                break
+            dirPath = parentDir
+        if rootDir is None:
+            projectDir = self.__getProjectDir()
+            if projectDir is not None and isInside(fileDir, projectDir):
+                rootDir = projectDir
+        self.__roots[fileDir] = rootDir
+        return rootDir
+
+    def getInitHook(self):
+        """Provides the init hook with the project import directories"""
+        if not self.__initHookKnown:
+            self.__initHook = self.__buildInitHook()
+            self.__initHookKnown = True
+        return self.__initHook
+
+    def invalidate(self):
+        """Drops everything cached, e.g. a pylintrc has just been created"""
+        self.__resolved = {}
+        self.__dirRCFiles = {}
+        self.__rcHashes = {}
+        self.__rcPlugins = {}
+        self.__roots = {}
+        self.__initHook = None
+        self.__initHookKnown = False
+        paths = self.__watcher.directories() + self.__watcher.files()
+        if paths:
+            self.__watcher.removePaths(paths)
+
+    def release(self):
+        """Stops watching and disconnects from the IDE"""
+        self.invalidate()
+        self.__ide.project.sigProjectChanged.disconnect(self.__projectChanged)
+
+    def __getProjectDir(self):
+        """Provides the normalized project directory or None"""
+        if not self.__ide.project.isLoaded():
+            return None
+        return os.path.normpath(self.__ide.project.getProjectDir())
+
+    def __getSearchDirs(self, fileDir):
+        """Provides the directories to search for a pylintrc in"""
+        projectDir = self.__getProjectDir()
+        dirs = []
+        if fileDir is not None:
+            inProject = projectDir is not None and \
+                        isInside(fileDir, projectDir)
+            dirPath = fileDir
+            while True:
+                dirs.append(dirPath)
+                if inProject:
+                    if dirPath == projectDir:
+                        break
+                elif not os.path.isfile(os.path.join(dirPath,
+                                                     '__init__.py')):
+                    break       # the top of the python packages
+                parentDir = os.path.dirname(dirPath)
+                if parentDir == dirPath:
+                    break
+                dirPath = parentDir
+        if projectDir is not None and projectDir not in dirs:
+            dirs.append(projectDir)
+        return dirs
+
+    def __findInDir(self, dirPath):
+        """Provides the pylintrc in the directory; not the parents"""
+        try:
+            return self.__dirRCFiles[dirPath]
+        except KeyError:
+            pass
+
+        rcfile = None
+        for name in PYLINTRC_NAMES:
+            path = os.path.join(dirPath, name)
+            if os.path.exists(path):
+                rcfile = path
+                break
+        if os.path.isdir(dirPath) and \
+           dirPath not in self.__watcher.directories():
+            if not self.__watcher.addPath(dirPath):
+                logging.debug('pylint: cannot watch ' + dirPath)
+        self.__dirRCFiles[dirPath] = rcfile
+        return rcfile
+
+    def __buildInitHook(self):
+        """Builds the init hook with the project import directories"""
+        if not self.__ide.project.isLoaded():
+            return None
+        importDirs = self.__ide.project.getImportDirsAsAbsolutePaths()
+        if not importDirs:
+            return None
+
+        importDirs.reverse()
+        code = 'import sys'
+        for importDir in importDirs:
+            code += ';sys.path.insert(0,"' + importDir + '")'
+        return code
+
+    def __directoryChanged(self, path):
+        """A watched directory entries have changed"""
+        self.__dirRCFiles.pop(path, None)
+        # Any file directory could resolve through the changed one
+        self.__resolved = {}
+
+    def __fileChanged(self, path):
+        """A pylintrc has been changed or removed"""
+        self.__rcHashes.pop(path, None)
+        self.__rcPlugins.pop(path, None)
+
+    def __projectChanged(self, what):
+        """The project or its properties have changed"""
+        del what            # unused argument
+        self.invalidate()
+
+
+_RESOLVER = None
+
+
+def getConfigResolver(ide):
+    """Provides the resolver shared by all the drivers"""
+    global _RESOLVER
+    if _RESOLVER is None:
+        _RESOLVER = PylintConfigResolver(ide)
+    return _RESOLVER
+
+
+def releaseConfigResolver():
+    """Drops the shared resolver, e.g. when the plugin is deactivated"""
+    global _RESOLVER
+    if _RESOLVER is not None:
+        _RESOLVER.release()
+        _RESOLVER.deleteLater()
+        _RESOLVER = None
@@ -22,7 +22,6 @@
    It is rather an 'about' type dialog at the moment.
 """
 
-import pkg_resources
 from ui.qt import (QDialog, QLabel, QVBoxLayout, QHBoxLayout, QSizePolicy,
                    QPixmap, Qt, QDialogButtonBox)
 
@@ -40,6 +39,8 @@ def getPluginVersionAndPath(pluginHomeDir):
 
 def getPylintVersionAndPath():
     """Provides the pylint version"""
+    # pkg_resources is slow to import so it is not imported at start up
+    import pkg_resources
     try:
         return pkg_resources.get_distribution('pylint').version, \
                pkg_resources.get_distribution('pylint').location
@@ -0,0 +1,117 @@
+# -*- coding: utf-8 -*-
+#
+# codimension - graphics python two-way code editor and analyzer
+# Copyright (C) 2019  Sergey Satskiy <sergey.satskiy@gmail.com>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+
+"""Codimension pylint checkers cost viewer"""
+
+
+from ui.qt import (Qt, QWidget, QVBoxLayout, QTabWidget, QTreeWidget,
+                   QTreeWidgetItem)
+
+
+# Column titles and if the column is numeric
+CHECKER_COLUMNS = (('Checker', False), ('Time, ms', True),
+                   ('Share, %', True), ('Messages', True), ('Calls', True))
+MODULE_COLUMNS = (('Module', False), ('Time, ms', True),
+                  ('Share, %', True), ('Messages', True))
+
+
+class CostItem(QTreeWidgetItem):
+
+    """A cost row which sorts the numbers as numbers"""
+
+    def __init__(self, values, columns):
+        QTreeWidgetItem.__init__(self)
+        self.__values = values
+        for column, (value, (_, numeric)) in enumerate(zip(values, columns)):
+            if numeric:
+                text = '%.1f' % value if isinstance(value, float) \
+                                     else str(value)
+                self.setTextAlignment(column, Qt.AlignRight)
+            else:
+                text = value
+            self.setText(column, text)
+
+    def __lt__(self, other):
+        column = self.treeWidget().sortColumn()
+        return self.__values[column] < other.__values[column]
+
+
+class PylintCostViewer(QWidget):
+
+    """Shows the time and the messages of each checker and module"""
+
+    def __init__(self, parent=None):
+        QWidget.__init__(self, parent)
+
+        self.__checkersTree = self.__createTree(CHECKER_COLUMNS)
+        self.__modulesTree = self.__createTree(MODULE_COLUMNS)
+        self.__tabs = QTabWidget(self)
+        self.__tabs.addTab(self.__checkersTree, 'Checkers')
+        self.__tabs.addTab(self.__modulesTree, 'Modules')
+        self.__tabs.setToolTip('pylint checkers cost; the astroid trees '
+                               'building is shown as the astroid checker')
+
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+        layout.addWidget(self.__tabs)
+
+    def __createTree(self, columns):
+        """Creates a sortable costs tree"""
+        tree = QTreeWidget(self)
+        tree.setRootIsDecorated(False)
+        tree.setAlternatingRowColors(True)
+        tree.setUniformRowHeights(True)
+        tree.setHeaderLabels([title for title, _ in columns])
+        tree.setSortingEnabled(True)
+        return tree
+
+    def clear(self):
+        """Removes the costs"""
+        self.__checkersTree.clear()
+        self.__modulesTree.clear()
+
+    def setResults(self, results):
+        """Shows the costs if the results have them. False if not."""
+        self.clear()
+        checkerCosts = results.get('CheckerCosts', None)
+        if not checkerCosts:
+            return False
+
+        self.__populate(self.__checkersTree, CHECKER_COLUMNS,
+                        checkerCosts)
+        self.__populate(self.__modulesTree, MODULE_COLUMNS,
+                        results.get('ModuleCosts', []))
+        return True
+
+    @staticmethod
+    def __populate(tree, columns, costs):
+        """Adds the cost rows with the time share"""
+        total = sum(cost[1] for cost in costs) or 1.0
+        items = []
+        for cost in costs:
+            values = (cost[0] or '<unknown>', cost[1],
+                      cost[1] * 100.0 / total) + tuple(cost[2:])
+            items.append(CostItem(values, columns))
+        tree.setSortingEnabled(False)
+        tree.addTopLevelItems(items)
+        tree.setSortingEnabled(True)
+        tree.sortItems(1, Qt.DescendingOrder)
+        for column in range(len(columns)):
+            tree.resizeColumnToContents(column)
@@ -0,0 +1,527 @@
+# -*- coding: utf-8 -*-
+#
+# codimension - graphics python two-way code editor and analyzer
+# Copyright (C) 2019  Sergey Satskiy <sergey.satskiy@gmail.com>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+"""Codimension pylint shared lint daemon.
+
+   The module is executed as a standalone script in a separate process so it
+   must not import anything from the IDE. The daemon is shared by all the
+   IDE instances of a user. It listens on a UNIX domain socket and serves
+   the warm worker protocol (see pylintworker.py) over it using a few warm
+   workers, so the astroid caches stay warm whichever IDE instance asks.
+
+   Identical requests which are in progress at the same time, e.g. the same
+   file analyzed in two IDE instances, are served by a single analysis: the
+   output and the response are sent to every client which asked. A client
+   which joins a request in progress gets the output produced so far as the
+   first partial message.
+
+   In addition to the worker requests a client may send
+   {"cancel": <id>}
+   to say it is not interested in a request any more. The request in
+   progress is not interrupted so the worker astroid cache is kept.
+   A request which cannot be served is reported as
+   {"id": <int>, "failed": <str>}
+
+   A connected client gets the worker ready message as soon as a worker is
+   ready. The daemon exits when no client has been connected for
+   IDLE_EXIT seconds.
+"""
+
+
+import sys
+import os
+import json
+import time
+import stat
+import errno
+import socket
+import hashlib
+import tempfile
+import selectors
+import subprocess
+from collections import deque
+
+
+WORKER_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                             'pylintworker.py')
+
+# Number of the warm workers
+DEFAULT_WORKERS = 2
+
+# Consecutive crashes after which a worker is not restarted any more
+MAX_CRASHES = 3
+
+# The daemon exits after this period without clients, seconds
+IDLE_EXIT = 30 * 60
+
+READ_SIZE = 65536
+
+
+def getSocketPath():
+    """Provides the per user daemon socket path"""
+    baseDir = os.environ.get('XDG_RUNTIME_DIR', None) or \
+              tempfile.gettempdir()
+    return os.path.join(baseDir, 'codimension-pylint-' + str(os.getuid()),
+                        'daemon.sock')
+
+
+def checkSocketPath(path):
+    """Provides why the socket cannot be trusted or None if it can.
+
+    The socket directory is in a world writable place when there is no
+    XDG_RUNTIME_DIR, so another user could create it first and listen on
+    the socket. The directory must be a real one owned by the user and
+    accessible by nobody else; a missing directory is fine.
+    """
+    dirName = os.path.dirname(path)
+    try:
+        dirStat = os.lstat(dirName)
+    except FileNotFoundError:
+        return None
+    if not stat.S_ISDIR(dirStat.st_mode) or \
+       dirStat.st_uid != os.getuid() or dirStat.st_mode & 0o077:
+        return 'the pylint daemon directory ' + dirName + \
+               ' is not private to the user'
+    try:
+        socketStat = os.lstat(path)
+    except FileNotFoundError:
+        return None
+    if not stat.S_ISSOCK(socketStat.st_mode) or \
+       socketStat.st_uid != os.getuid():
+        return 'the pylint daemon socket ' + path + \
+               ' is not owned by the user'
+    return None
+
+
+def encodeMessage(message):
+    """Provides a single protocol message line"""
+    return (json.dumps(message) + '\n').encode('utf-8')
+
+
+def getRequestKey(request):
+    """Provides the key identical requests share; the id is not a part"""
+    content = dict(request)
+    content.pop('id', None)
+    return hashlib.sha256(json.dumps(content, sort_keys=True)
+                          .encode('utf-8')).hexdigest()
+
+
+def openServerSocket(path):
+    """Provides the listening socket or None if a daemon is running.
+
+    PermissionError is raised if the socket place is not private.
+    """
+    os.makedirs(os.path.dirname(path), mode=0o700, exist_ok=True)
+    problem = checkSocketPath(path)
+    if problem is not None:
+        raise PermissionError(problem)
+
+    if os.path.exists(path):
+        probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            probe.connect(path)
+            return None
+        except OSError:
+            # A stale socket of a daemon which has not finished cleanly
+            os.unlink(path)
+        finally:
+            probe.close()
+
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        server.bind(path)
+    except OSError as exc:
+        server.close()
+        if exc.errno == errno.EADDRINUSE:
+            return None     # another daemon has just started
+        raise
+    server.listen(16)
+    server.setblocking(False)
+    return server
+
+
+class ClientConnection:
+
+    """One connected IDE side client"""
+
+    def __init__(self, sock):
+        self.sock = sock
+        self.inBuffer = bytearray()
+        self.outBuffer = bytearray()
+        self.requests = {}      # client request id -> job
+        self.greeted = False
+
+
+class Job:
+
+    """One analysis shared by the clients which asked for it"""
+
+    def __init__(self, key, request):
+        self.key = key
+        self.request = request
+        self.subscribers = []   # (connection, client request id)
+        self.partials = []
+        self.worker = None
+        self.jobId = None
+
+
+class Worker:
+
+    """One warm worker process"""
+
+    def __init__(self):
+        self.process = subprocess.Popen(
+            [sys.executable, '-u', WORKER_SCRIPT], stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+        os.set_blocking(self.process.stdout.fileno(), False)
+        self.buffer = bytearray()
+        self.ready = False
+        self.job = None
+
+    def kill(self):
+        """Kills the worker process"""
+        try:
+            self.process.kill()
+        except OSError:
+            pass
+        self.process.wait()
+        for stream in (self.process.stdin, self.process.stdout):
+            try:
+                stream.close()
+            except OSError:
+                pass
+
+
+class LintDaemon:
+
+    """Serves the clients with a pool of warm workers"""
+
+    def __init__(self, server, workerCount=DEFAULT_WORKERS):
+        self.__server = server
+        self.__selector = selectors.DefaultSelector()
+        self.__selector.register(server, selectors.EVENT_READ, self.__accept)
+        self.__connections = set()
+        self.__workers = []
+        self.__workerCount = workerCount
+        self.__crashCount = 0
+        self.__queue = deque()
+        self.__jobs = {}            # request key -> job
+        self.__nextJobId = 0
+        self.__readyMessage = None
+        self.__lastClientAt = time.monotonic()
+        self.__stopping = False
+
+        for _ in range(workerCount):
+            self.__startWorker()
+
+    def run(self):
+        """Serves the clients until the daemon is idle for too long"""
+        while not self.__stopping:
+            for key, mask in self.__selector.select(timeout=60):
+                key.data(key.fileobj, mask)
+            if self.__connections:
+                self.__lastClientAt = time.monotonic()
+            elif time.monotonic() - self.__lastClientAt > IDLE_EXIT:
+                break
+        for worker in self.__workers:
+            self.__selector.unregister(worker.process.stdout)
+            worker.kill()
+        self.__workers = []
+
+    def __startWorker(self):
+        """Starts one more worker"""
+        worker = Worker()
+        self.__workers.append(worker)
+        self.__selector.register(
+            worker.process.stdout, selectors.EVENT_READ,
+            lambda stream, mask: self.__readWorker(worker))
+
+    def __accept(self, server, mask):
+        """A new client has connected"""
+        del mask    # unused argument
+        try:
+            sock, _ = server.accept()
+        except OSError:
+            return
+        sock.setblocking(False)
+        connection = ClientConnection(sock)
+        self.__connections.add(connection)
+        self.__selector.register(
+            sock, selectors.EVENT_READ,
+            lambda sock, mask: self.__serveClient(connection, mask))
+        if self.__readyMessage is not None:
+            self.__greet(connection)
+
+    def __greet(self, connection):
+        """Sends the ready message to the client"""
+        connection.greeted = True
+        self.__send(connection, self.__readyMessage)
+
+    def __serveClient(self, connection, mask):
+        """Reads the client requests and writes the pending messages"""
+        if mask & selectors.EVENT_WRITE:
+            self.__flush(connection)
+        if not mask & selectors.EVENT_READ or \
+           connection not in self.__connections:
+            return
+
+        try:
+            data = connection.sock.recv(READ_SIZE)
+        except BlockingIOError:
+            return
+        except OSError:
+            data = b''
+        if not data:
+            self.__closeClient(connection)
+            return
+
+        connection.inBuffer += data
+        eol = connection.inBuffer.rfind(b'\n')
+        if eol == -1:
+            return
+        lines = bytes(connection.inBuffer[:eol]).split(b'\n')
+        del connection.inBuffer[:eol + 1]
+        for line in lines:
+            if line.strip():
+                self.__handleRequest(connection, line)
+
+    def __handleRequest(self, connection, line):
+        """Handles one client message"""
+        try:
+            message = json.loads(line.decode('utf-8'))
+            if 'cancel' in message:
+                self.__unsubscribe(connection, message['cancel'])
+                return
+            clientId = message['id']
+        except (ValueError, KeyError, TypeError) as exc:
+            self.__send(connection, {'id': None, 'exitCode': 1, 'stdout': '',
+                                     'stderr': 'Bad request: ' + str(exc)})
+            return
+
+        key = getRequestKey(message)
+        job = self.__jobs.get(key, None)
+        if job is None:
+            job = Job(key, message)
+            self.__jobs[key] = job
+            self.__queue.append(job)
+        elif job.partials:
+            self.__send(connection, {'id': clientId,
+                                     'partial': ''.join(job.partials)})
+        job.subscribers.append((connection, clientId))
+        connection.requests[clientId] = job
+        self.__dispatch()
+
+    def __unsubscribe(self, connection, clientId):
+        """The client is not interested in the request any more"""
+        job = connection.requests.pop(clientId, None)
+        if job is None:
+            return
+        job.subscribers.remove((connection, clientId))
+        if not job.subscribers and job.worker is None:
+            # Not started yet; the dispatcher skips the job
+            self.__jobs.pop(job.key, None)
+
+    def __closeClient(self, connection):
+        """The client has gone"""
+        for clientId in list(connection.requests.keys()):
+            self.__unsubscribe(connection, clientId)
+        self.__connections.discard(connection)
+        self.__selector.unregister(connection.sock)
+        connection.sock.close()
+
+    def __send(self, connection, message):
+        """Sends a message to the client"""
+        if connection not in self.__connections:
+            return
+        pending = bool(connection.outBuffer)
+        connection.outBuffer += encodeMessage(message)
+        if not pending:
+            self.__flush(connection)
+
+    def __flush(self, connection):
+        """Writes as much of the pending messages as the socket takes"""
+        try:
+            sent = connection.sock.send(connection.outBuffer)
+            del connection.outBuffer[:sent]
+        except BlockingIOError:
+            pass
+        except OSError:
+            self.__closeClient(connection)
+            return
+        # A slow client must not block the others: the rest is written
+        # when the socket is writable again
+        events = selectors.EVENT_READ
+        if connection.outBuffer:
+            events |= selectors.EVENT_WRITE
+        self.__selector.modify(
+            connection.sock, events,
+            lambda sock, mask: self.__serveClient(connection, mask))
+
+    def __dispatch(self):
+        """Gives the queued jobs to the idle workers"""
+        for worker in self.__workers:
+            if not self.__queue:
+                return
+            if not worker.ready or worker.job is not None:
+                continue
+            while self.__queue:
+                job = self.__queue.popleft()
+                if job.subscribers:
+                    self.__startJob(worker, job)
+                    break
+
+    def __startJob(self, worker, job):
+        """Sends the job to the worker"""
+        self.__nextJobId += 1
+        job.jobId = self.__nextJobId
+        job.worker = worker
+        worker.job = job
+        request = dict(job.request)
+        request['id'] = job.jobId
+        try:
+            worker.process.stdin.write(encodeMessage(request))
+            worker.process.stdin.flush()
+        except OSError:
+            pass    # the worker has died; reported when its stdout closes
+
+    def __readWorker(self, worker):
+        """Handles the worker messages"""
+        try:
+            data = os.read(worker.process.stdout.fileno(), READ_SIZE)
+        except BlockingIOError:
+            return
+        except OSError:
+            data = b''
+        if not data:
+            self.__workerFinished(worker)
+            return
+
+        worker.buffer += data
+        eol = worker.buffer.rfind(b'\n')
+        if eol == -1:
+            return
+        lines = bytes(worker.buffer[:eol]).split(b'\n')
+        del worker.buffer[:eol + 1]
+        for line in lines:
+            try:
+                message = json.loads(line.decode('utf-8'))
+            except ValueError:
+                continue
+            self.__handleWorkerMessage(worker, message)
+
+    def __handleWorkerMessage(self, worker, message):
+        """Handles one worker message"""
+        if 'ready' in message:
+            if not message['ready']:
+                # No point to restart: pylint is not importable
+                self.__readyMessage = message
+                for connection in list(self.__connections):
+                    self.__greet(connection)
+                self.__stopping = True
+                return
+            worker.ready = True
+            if self.__readyMessage is None:
+                self.__readyMessage = message
+                for connection in list(self.__connections):
+                    if not connection.greeted:
+                        self.__greet(connection)
+            self.__dispatch()
+            return
+
+        job = worker.job
+        if job is None or message.get('id', None) != job.jobId:
+            return
+        if 'partial' in message:
+            job.partials.append(message['partial'])
+            for connection, clientId in list(job.subscribers):
+                self.__send(connection, {'id': clientId,
+                                         'partial': message['partial']})
+            return
+
+        self.__crashCount = 0
+        self.__finishJob(job)
+        for connection, clientId in list(job.subscribers):
+            response = dict(message)
+            response['id'] = clientId
+            self.__send(connection, response)
+        self.__dispatch()
+
+    def __finishJob(self, job):
+        """Detaches the job from the daemon"""
+        if job.worker is not None:
+            job.worker.job = None
+        if self.__jobs.get(job.key, None) is job:
+            del self.__jobs[job.key]
+        for connection, clientId in list(job.subscribers):
+            connection.requests.pop(clientId, None)
+
+    def __workerFinished(self, worker):
+        """The worker process has finished unexpectedly"""
+        self.__selector.unregister(worker.process.stdout)
+        self.__workers.remove(worker)
+        worker.kill()
+
+        job = worker.job
+        if job is not None:
+            self.__finishJob(job)
+            for connection, clientId in list(job.subscribers):
+                self.__send(connection,
+                            {'id': clientId,
+                             'failed': 'pylint worker finished unexpectedly '
+                                       '(exit code ' +
+                                       str(worker.process.returncode) + ')'})
+
+        self.__crashCount += 1
+        if self.__crashCount < MAX_CRASHES:
+            self.__startWorker()
+        elif not self.__workers:
+            self.__stopping = True
+
+
+def main():
+    """Serves the clients until the daemon is idle"""
+    # The script directory must not shadow anything on the analysis path
+    if sys.path and sys.path[0] == os.path.dirname(os.path.abspath(__file__)):
+        del sys.path[0]
+
+    workerCount = DEFAULT_WORKERS
+    if len(sys.argv) > 1:
+        workerCount = max(int(sys.argv[1]), 1)
+
+    path = getSocketPath()
+    try:
+        server = openServerSocket(path)
+    except OSError as exc:
+        sys.stderr.write('Cannot start the pylint daemon: ' + str(exc) + '\n')
+        return 1
+    if server is None:
+        return 0    # the daemon is running already
+    try:
+        LintDaemon(server, workerCount).run()
+    finally:
+        server.close()
+        try:
+            os.unlink(path)
+        except OSError:
+            pass
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,263 @@
+# -*- coding: utf-8 -*-
+#
+# codimension - graphics python two-way code editor and analyzer
+# Copyright (C) 2019  Sergey Satskiy <sergey.satskiy@gmail.com>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+"""Codimension pylint shared lint daemon client"""
+
+
+import sys
+import os.path
+import json
+import logging
+from ui.qt import QObject, pyqtSignal, QProcess, QTimer, QLocalSocket
+from .pylintlatency import measureStall
+from .pylintdaemon import getSocketPath, checkSocketPath
+
+
+DAEMON_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                             'pylintdaemon.py')
+
+
+class PylintDaemonClient(QObject):
+
+    """Talks to the per user lint daemon over its local socket.
+
+    The interface is the one of the warm worker client. The daemon is
+    started if it is not running. If it cannot be reached the client
+    becomes unavailable and the driver uses its own worker.
+    """
+
+    # request id, a piece of pylint stdout while the request is served
+    sigOutput = pyqtSignal(int, str)
+    # request id, response dictionary
+    sigFinished = pyqtSignal(int, dict)
+    # request id, error message; the request will not be served
+    sigFailed = pyqtSignal(int, str)
+
+    # The daemon start up is waited for this number of connect attempts
+    CONNECT_ATTEMPTS = 50
+    CONNECT_RETRY_MS = 200
+
+    # Lost connections after which the daemon is not used any more
+    MAX_DISCONNECTS = 3
+
+    def __init__(self, parent=None):
+        QObject.__init__(self, parent)
+
+        self.__socket = None
+        self.__isConnected = False
+        self.__buffer = bytearray()
+        self.__pending = []         # the requests written when connected
+        self.__inFlight = set()
+        self.__nextId = 0
+        self.__attempts = 0
+        self.__daemonStarted = False
+        self.__disconnects = 0
+        self.__unavailable = False
+        self.pylintVersion = None
+
+        self.__retryTimer = QTimer(self)
+        self.__retryTimer.setSingleShot(True)
+        self.__retryTimer.setInterval(self.CONNECT_RETRY_MS)
+        self.__retryTimer.timeout.connect(self.__connect)
+
+    def isAvailable(self):
+        """True if the daemon can be used"""
+        return not self.__unavailable
+
+    def isBusy(self):
+        """True if there are requests which have not been served yet"""
+        return bool(self.__inFlight)
+
+    def prestart(self):
+        """Connects to the daemon in advance"""
+        if self.isAvailable():
+            self.__ensureConnected()
+
+    def submit(self, args, cwd, source=None, outputFormat=None,
+               costs=False):
+        """Sends the request to the daemon. Provides the request id"""
+        self.__ensureConnected()
+
+        self.__nextId += 1
+        requestId = self.__nextId
+        request = {'id': requestId, 'cwd': cwd, 'args': args}
+        if source is not None:
+            request['stdin'] = source
+        if outputFormat is not None:
+            request['format'] = outputFormat
+        if costs:
+            request['costs'] = True
+        self.__inFlight.add(requestId)
+        self.__write(request)
+        return requestId
+
+    def cancel(self, requestId):
+        """Cancels the request; the daemon is told to drop it"""
+        if requestId not in self.__inFlight:
+            return
+        self.__inFlight.discard(requestId)
+        self.__write({'cancel': requestId})
+
+    def shutdown(self):
+        """Disconnects from the daemon; the daemon keeps running"""
+        self.__retryTimer.stop()
+        self.__disconnect()
+        self.__failInFlight('pylint daemon connection has been closed')
+
+    def __ensureConnected(self):
+        """Connects to the daemon if it is not connected"""
+        if self.__socket is None and not self.__retryTimer.isActive():
+            self.__attempts = 0
+            self.__connect()
+
+    def __connect(self):
+        """Makes a connection attempt"""
+        # The unsaved buffers go to the daemon so it must be the user's one
+        problem = checkSocketPath(getSocketPath())
+        if problem is not None:
+            self.__giveUp(problem)
+            return
+        self.__attempts += 1
+        self.__isConnected = False
+        self.__buffer = bytearray()
+        self.__socket = QLocalSocket(self)
+        self.__socket.connected.connect(self.__connected)
+        self.__socket.readyRead.connect(self.__read)
+        self.__socket.disconnected.connect(self.__disconnected)
+        self.__socket.error.connect(self.__error)
+        self.__socket.connectToServer(getSocketPath())
+
+    def __disconnect(self):
+        """Closes the connection without treating it as a failure"""
+        if self.__socket is not None:
+            sock = self.__socket
+            self.__socket = None
+            for signal in (sock.connected, sock.readyRead,
+                           sock.disconnected, sock.error):
+                try:
+                    signal.disconnect()
+                except TypeError:
+                    pass    # nothing was connected
+            sock.abort()
+            sock.deleteLater()
+        self.__isConnected = False
+        self.__pending = []
+
+    def __write(self, message):
+        """Sends a message or keeps it till the connection is made"""
+        data = (json.dumps(message) + '\n').encode('utf-8')
+        if self.__isConnected:
+            self.__socket.write(data)
+        else:
+            self.__pending.append(data)
+
+    def __failInFlight(self, message):
+        """Reports all the not served requests as failed"""
+        inFlight = sorted(self.__inFlight)
+        self.__inFlight = set()
+        for requestId in inFlight:
+            self.sigFailed.emit(requestId, message)
+
+    def __connected(self):
+        """The connection has been made; the kept requests are sent"""
+        self.__isConnected = True
+        for data in self.__pending:
+            self.__socket.write(data)
+        self.__pending = []
+
+    def __error(self, error):
+        """The connection attempt has failed or the connection is broken"""
+        if self.__socket is None or self.__isConnected:
+            return  # the broken connection is handled as a disconnect
+        if error not in (QLocalSocket.ServerNotFoundError,
+                         QLocalSocket.ConnectionRefusedError):
+            logging.debug('pylint daemon connection error: ' +
+                          self.__socket.errorString())
+        pending = self.__pending
+        self.__disconnect()
+        self.__pending = pending
+
+        if not self.__daemonStarted:
+            self.__daemonStarted = True
+            if not QProcess.startDetached(sys.executable, [DAEMON_SCRIPT]):
+                self.__giveUp('pylint daemon failed to start')
+                return
+        if self.__attempts >= self.CONNECT_ATTEMPTS:
+            self.__giveUp('pylint daemon is not reachable')
+            return
+        self.__retryTimer.start()
+
+    def __giveUp(self, message):
+        """The daemon cannot be used"""
+        logging.error(message + '; the private pylint worker is used')
+        self.__unavailable = True
+        self.__disconnect()
+        # A request may be being submitted right now; it fails as well
+        QTimer.singleShot(0, lambda: self.__failInFlight(message))
+
+    def __disconnected(self):
+        """The daemon has closed the connection, e.g. it has finished"""
+        self.__disconnect()
+        self.__disconnects += 1
+        self.__daemonStarted = False
+        if self.__disconnects >= self.MAX_DISCONNECTS:
+            self.__unavailable = True
+        self.__failInFlight('pylint daemon connection has been lost')
+
+    @measureStall('daemon socket')
+    def __read(self):
+        """Handles the daemon messages"""
+        if self.__socket is None:
+            return
+        self.__buffer += bytes(self.__socket.readAll())
+        eol = self.__buffer.rfind(b'\n')
+        if eol == -1:
+            return
+        lines = bytes(self.__buffer[:eol]).split(b'\n')
+        del self.__buffer[:eol + 1]
+        for line in lines:
+            self.__handleMessage(line)
+
+    def __handleMessage(self, line):
+        """Handles one protocol message"""
+        try:
+            message = json.loads(line.decode('utf-8'))
+        except ValueError:
+            logging.debug('pylint daemon: unexpected output ' + repr(line))
+            return
+
+        if 'ready' in message:
+            if message['ready']:
+                self.pylintVersion = message.get('version', None)
+                self.__disconnects = 0
+            else:
+                self.__giveUp(message.get('error', 'pylint daemon failed'))
+            return
+
+        requestId = message.get('id', None)
+        if requestId not in self.__inFlight:
+            return
+        if 'partial' in message:
+            self.sigOutput.emit(requestId, message['partial'])
+        elif 'failed' in message:
+            self.__inFlight.discard(requestId)
+            self.sigFailed.emit(requestId, message['failed'])
+        else:
+            self.__inFlight.discard(requestId)
+            self.sigFinished.emit(requestId, message)
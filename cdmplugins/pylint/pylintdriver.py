@@ -21,12 +21,35 @@
 
 
 import sys
-import re
+import time
+import codecs
+import logging
 import os.path
-from ui.qt import QWidget, pyqtSignal, QProcess, QProcessEnvironment, QByteArray
+from ui.qt import (QWidget, pyqtSignal, QProcess, QProcessEnvironment,
+                   QTimer)
 from utils.misc import getLocaleDateTime
-
-MSG_REGEXP = re.compile(r'^[CRWE]+([0-9]{4})?:')
+from .pylintworkerclient import PylintWorkerClient, killProcess
+from .pylintdaemonclient import PylintDaemonClient
+from .pylintcache import PylintResultCache, relocateResults
+from .pylintconfigdialog import getPylintVersionAndPath
+from .pylintsettings import PLUGIN_SETTINGS_DIR
+from .pylintparser import (PylintTextParser, PylintJSONLinesParser,
+                           TEXT_MSG_TEMPLATE)
+from .pylintrawoutput import RawOutputWriter, getRawText
+from .pylintlatency import measureStall
+from .pylintprofiles import PROFILE_FULL, getProfileArgs
+from .pylintmetrics import addTiming
+from .pylintconfig import getConfigResolver
+
+
+def getResultCacheDir(configured=None):
+    """Provides the pylint results cache directory.
+
+    The configured directory, e.g. one shared by a team, is preferred.
+    """
+    if configured:
+        return os.path.expanduser(configured)
+    return PLUGIN_SETTINGS_DIR + 'results'
 
 
 class PylintDriver(QWidget):
@@ -34,202 +57,592 @@ class PylintDriver(QWidget):
     """Pylint driver which runs pylint in the background"""
 
     sigFinished = pyqtSignal(dict)
+    # file name, a batch of the messages parsed so far in the output;
+    # the batches are emitted not more often than REFRESH_INTERVAL_MS
+    sigMessages = pyqtSignal(str, list)
+    # pylintrc path, error message or an empty string if generated
+    sigRCFileGenerated = pyqtSignal(str, str)
+
+    REFRESH_INTERVAL_MS = 100
 
-    def __init__(self, ide):
+    def __init__(self, ide, resultCache=None, useDaemon=False):
         QWidget.__init__(self)
 
         self.__ide = ide
         self.__process = None
         self.__args = None
-
-        self.__stdout = ''
-        self.__stderr = ''
+        self.__pylintArgs = None
+
+        # The output writers; a big output goes to a temporary file
+        self.__stdout = None
+        self.__stderr = None
+        self.__stdoutDecoder = None
+        self.__stderrDecoder = None
+        self.__outputBytes = 0
+        self.__outputStarted = None
+        self.__content = None
+        self.__profile = PROFILE_FULL
+        self.__parser = None
+        self.__astroidCache = None      # the worker astroid cache stats
+        self.__costs = None             # the worker checkers cost
+
+        # The phase timings of the current run
+        self.__timings = {}
+        self.__startedAt = None
+        self.__phaseStarted = None
+
+        # The pylintrc generating process
+        self.__rcProcess = None
+        self.__rcFile = None
+
+        # Parsed messages which have not been emitted yet
+        self.__pendingMessages = []
+        self.__flushTimer = QTimer(self)
+        self.__flushTimer.setSingleShot(True)
+        self.__flushTimer.setInterval(self.REFRESH_INTERVAL_MS)
+        self.__flushTimer.timeout.connect(self.__flushMessages)
+
+        # The shared daemon, if enabled, is preferred, then the own warm
+        # worker; the one-shot process is a fallback
+        self.__workerRequest = None
+        self.__client = None            # the one serving the request
+        self.__request = None           # the submitted request arguments
+        self.__worker = self.__connectClient(PylintWorkerClient(self))
+        self.__daemon = None
+        self.setDaemonMode(useDaemon)
+        if self.__daemon is None:
+            self.__worker.prestart()
+
+        if resultCache is None:
+            resultCache = PylintResultCache(getResultCacheDir())
+        self.__cache = resultCache
+        self.__cacheKey = None
+        self.__fileStat = None
+        self.__cachedResults = None
+        self.__verifiedResults = None   # the cache hit being re-analyzed
+        self.__pylintVersion = None
+
+    def setDaemonMode(self, enabled):
+        """Switches on or off serving the requests by the lint daemon"""
+        if enabled and self.__daemon is None:
+            self.__daemon = self.__connectClient(PylintDaemonClient(self))
+            self.__daemon.prestart()
+        elif not enabled and self.__daemon is not None:
+            # A request in progress falls back to a one-shot run
+            self.__daemon.shutdown()
+            self.__daemon.deleteLater()
+            self.__daemon = None
+
+    def __connectClient(self, client):
+        """Connects the worker or the daemon client signals"""
+        client.sigOutput.connect(self.__workerOutput)
+        client.sigFinished.connect(self.__workerFinished)
+        client.sigFailed.connect(self.__workerFailed)
+        return client
+
+    def __getClient(self):
+        """Provides the daemon client if it can be used or the worker one"""
+        if self.__daemon is not None and self.__daemon.isAvailable():
+            return self.__daemon
+        return self.__worker
 
     def isInProcess(self):
         """True if pylint is still running"""
-        return self.__process is not None
-
-    def start(self, fileName, encoding):
-        """Runs the analysis process"""
-        if self.__process is not None:
+        return self.__process is not None or \
+               self.__workerRequest is not None or \
+               self.__cachedResults is not None
+
+    @measureStall('pylint start')
+    def start(self, fileName, encoding, content=None, refresh=False,
+              profile=PROFILE_FULL, costs=False):
+        """Runs the analysis process.
+
+        If the content is given then it is analyzed instead of the file on
+        disk, e.g. for a modified buffer. The results still refer to the file.
+        If refresh is True then the cached results are not used, e.g. when
+        a module the file imports has changed. The profile tells what
+        options are added to the pylintrc ones. If costs is True then the
+        time and the messages of each checker are measured; the results
+        have 'CheckerCosts' and 'ModuleCosts' then.
+        """
+        if self.isInProcess():
             return 'Another pylint analysis is in progress'
+        if costs and not self.__getClient().isAvailable():
+            return 'pylint profiling needs the pylint worker which ' \
+                   'is not available'
 
+        self.__startedAt = time.monotonic()
+        self.__timings = {}
         self.__fileName = fileName
         self.__encoding = 'utf-8' if encoding is None else encoding
+        self.__content = content
+        self.__profile = profile
+        profileArgs = getProfileArgs(profile)
+
+        resolver = getConfigResolver(self.__ide)
+        rcfile = resolver.getPylintrc(self.__fileName)
+        initHook = resolver.getInitHook()
+
+        self.__fileStat = None
+        if content is None:
+            try:
+                stat = os.stat(self.__fileName)
+                self.__fileStat = (stat.st_mtime_ns, stat.st_size)
+            except OSError:
+                pass
+        self.__cacheKey = PylintResultCache.makeKey(
+            self.__fileName, rcfile, initHook, self.__getPylintVersion(),
+            content, profileArgs,
+            resolver.getPylintrcHash(rcfile) if rcfile else None,
+            resolver.getRootDir(self.__fileName),
+            resolver.getPlugins(rcfile) if rcfile else None)
+        if costs:
+            # The measured results are not comparable with the normal ones
+            self.__cacheKey = None
+        cached = None if refresh or costs else \
+            self.__cache.get(self.__cacheKey)
+        self.__verifiedResults = None
+        if cached is not None and self.__cache.needsVerification():
+            # The hit is analyzed anyway to see if it has become stale
+            self.__verifiedResults = cached
+            cached = None
+        if cached is not None:
+            # The results must be delivered asynchronously like the real run
+            cached['Cached'] = True
+            if cached.get('FileName', None) != self.__fileName:
+                # The results of another checkout, e.g. on another host
+                relocateResults(cached, self.__fileName)
+            self.__cachedResults = cached
+            QTimer.singleShot(0, self.__emitCachedResults)
+            return None
 
+        # The arguments common for the worker and the one-shot process
+        self.__pylintArgs = []
+        if content is not None:
+            # pylint reads the source from stdin and reports it as the file
+            self.__pylintArgs.append('--from-stdin')
+            self.__pylintArgs.append(self.__fileName)
+        else:
+            self.__pylintArgs.append(os.path.basename(self.__fileName))
+        if rcfile:
+            self.__pylintArgs.append("--rcfile")
+            self.__pylintArgs.append(rcfile)
+        if initHook:
+            self.__pylintArgs.append("--init-hook")
+            self.__pylintArgs.append(initHook)
+        self.__pylintArgs.extend(profileArgs)
+
+        client = self.__getClient()
+        if client.isAvailable():
+            # The worker reports in the JSON lines format in-process
+            self.__args = ['-m', 'pylint'] + self.__pylintArgs
+            self.__resetOutput(PylintJSONLinesParser)
+            self.__phaseStarted = time.monotonic()
+            self.__client = client
+            self.__request = (self.__pylintArgs,
+                              os.path.dirname(self.__fileName), content,
+                              'jsonl', costs)
+            self.__workerRequest = client.submit(*self.__request)
+            return None
+        self.__startProcess()
+        return None
+
+    def __startProcess(self):
+        """Runs a one-shot pylint process"""
+        self.__args = ['-m', 'pylint',
+                       '--output-format', 'text',
+                       '--msg-template', TEXT_MSG_TEMPLATE] + \
+                      self.__pylintArgs
+        self.__resetOutput(PylintTextParser)
         self.__process = QProcess(self)
         self.__process.setProcessChannelMode(QProcess.SeparateChannels)
         self.__process.setWorkingDirectory(os.path.dirname(self.__fileName))
         self.__process.readyReadStandardOutput.connect(self.__readStdOutput)
         self.__process.readyReadStandardError.connect(self.__readStdError)
         self.__process.finished.connect(self.__finished)
-
-        self.__stdout = ''
-        self.__stderr = ''
-
-        self.__args = ['-m', 'pylint',
-                       '--output-format', 'text',
-                       '--msg-template',
-                       '{msg_id}:{line:3d},{column}: {obj}: {msg}',
-                       os.path.basename(self.__fileName)]
-        rcfile = PylintDriver.getPylintrc(self.__ide, self.__fileName)
-        if rcfile:
-            self.__args.append("--rcfile")
-            self.__args.append(rcfile)
-        initHook = self.getInitHook()
-        if initHook:
-            self.__args.append("--init-hook")
-            self.__args.append(initHook)
+        self.__process.started.connect(self.__processStarted)
+        self.__process.errorOccurred.connect(self.__processError)
 
         processEnvironment = QProcessEnvironment()
         processEnvironment.insert('PYTHONIOENCODING', self.__encoding)
         self.__process.setProcessEnvironment(processEnvironment)
+
+        # The start is reported by the signals; a failure to start comes
+        # as the results with the ProcessError
+        self.__phaseStarted = time.monotonic()
         self.__process.start(sys.executable, self.__args)
 
-        running = self.__process.waitForStarted()
-        if not running:
-            self.__process = None
-            return 'pylint analysis failed to start'
-        return None
+    @measureStall('pylint process start')
+    def __processStarted(self):
+        """Feeds the content to the started process"""
+        if self.__process is None or self.sender() is not self.__process:
+            return
+        now = time.monotonic()
+        addTiming(self.__timings, 'Spawn', now - self.__phaseStarted)
+        self.__phaseStarted = now
+        if self.__content is not None:
+            self.__process.write(self.__content.encode('utf-8'))
+        self.__process.closeWriteChannel()
+
+    def __processError(self, error):
+        """Reports the failure to start the process"""
+        if error != QProcess.FailedToStart or self.__process is None or \
+           self.sender() is not self.__process:
+            return
+        self.__process.deleteLater()
+        self.__process = None
+        self.__discardOutput()
+        self.__pendingMessages = []
+        self.sigFinished.emit({'FileName': self.__fileName,
+                               'Buffer': self.__content is not None,
+                               'Profile': self.__profile,
+                               'Timestamp': getLocaleDateTime(),
+                               'CommandLine': [sys.executable] + self.__args,
+                               'ProcessError':
+                                   'pylint analysis failed to start'})
+        self.__args = None
 
+    @measureStall('pylint stop')
     def stop(self):
         """Interrupts the analysis"""
+        self.__cachedResults = None
+        self.__verifiedResults = None
+        self.__flushTimer.stop()
+        self.__pendingMessages = []
+        if self.__workerRequest is not None:
+            self.__client.cancel(self.__workerRequest)
+            self.__workerRequest = None
+            self.__client = None
+            self.__args = None
         if self.__process is not None:
-            if self.__process.state() == QProcess.Running:
-                self.__process.kill()
-                self.__process.waitForFinished()
+            # The killed process reports nothing and goes away on its own
+            killProcess(self.__process)
             self.__process = None
             self.__args = None
+        self.__discardOutput()
+
+    def shutdown(self):
+        """Interrupts the analysis and stops the warm worker"""
+        self.stop()
+        self.__worker.shutdown()
+        if self.__daemon is not None:
+            self.__daemon.shutdown()
+
+    def isGeneratingRCFile(self):
+        """True if the pylintrc file is being generated"""
+        return self.__rcProcess is not None
 
     def generateRCFile(self, ide, fileName):
-        """Generates the pylintrc file"""
+        """Starts generating the pylintrc file.
+
+        sigRCFileGenerated is emitted when the file is ready. Provides the
+        pylintrc path or None if another generation is in progress.
+        """
+        if self.__rcProcess is not None:
+            return None
         if ide.project.isLoaded():
             rcfile = ide.project.getProjectDir() + 'pylintrc'
         else:
             rcfile = os.path.dirname(fileName) + os.path.sep + 'pylintrc'
 
-        process = QProcess(self)
-        process.setStandardOutputFile(rcfile)
-        process.start(sys.executable, ['-m', 'pylint', '--generate-rcfile'])
-        process.waitForFinished()
+        self.__rcFile = rcfile
+        self.__rcProcess = QProcess(self)
+        self.__rcProcess.setStandardOutputFile(rcfile)
+        self.__rcProcess.finished.connect(self.__rcFileFinished)
+        self.__rcProcess.errorOccurred.connect(self.__rcFileError)
+        self.__rcProcess.start(sys.executable,
+                               ['-m', 'pylint', '--generate-rcfile'])
         return rcfile
 
+    def __rcFileFinished(self, exitCode, exitStatus):
+        """The pylintrc generating process has finished"""
+        error = ''
+        if exitStatus != QProcess.NormalExit or exitCode != 0:
+            error = 'pylint --generate-rcfile finished with exit code ' + \
+                    str(exitCode)
+        self.__rcFileDone(error)
+
+    def __rcFileError(self, error):
+        """The pylintrc generating process could not be started"""
+        if error == QProcess.FailedToStart:
+            self.__rcFileDone('pylint --generate-rcfile failed to start')
+
+    def __rcFileDone(self, error):
+        """Reports the pylintrc generation result"""
+        if self.__rcProcess is None:
+            return
+        self.__rcProcess.deleteLater()
+        self.__rcProcess = None
+        # The watcher may report the new file later than it is asked for
+        getConfigResolver(self.__ide).invalidate()
+        self.sigRCFileGenerated.emit(self.__rcFile, error)
+
     @staticmethod
     def getPylintrc(ide, fileName):
         """Provides the pylintrc path"""
-        names = ['pylintrc', '.pylintrc']
-        dirs = []
-        if fileName:
-            dirs = [os.path.dirname(fileName) + os.path.sep]
-
-        if ide.project.isLoaded():
-            dirs.append(ide.project.getProjectDir())
-
-        for dirPath in dirs:
-            for name in names:
-                if os.path.exists(dirPath + name):
-                    return dirPath + name
-        return None
+        return getConfigResolver(ide).getPylintrc(fileName)
 
     def getInitHook(self):
         """Provides the init hook with the import directories"""
-        if not self.__ide.project.isLoaded():
-            return None
-        importDirs = self.__ide.project.getImportDirsAsAbsolutePaths()
-        if not importDirs:
-            return None
+        return getConfigResolver(self.__ide).getInitHook()
+
+    def __getPylintVersion(self):
+        """Provides the pylint version for the results cache key"""
+        version = self.__getClient().pylintVersion
+        if version:
+            return version
+        if self.__pylintVersion is None:
+            self.__pylintVersion = getPylintVersionAndPath()[0]
+        return self.__pylintVersion
+
+    @measureStall('cached results')
+    def __emitCachedResults(self):
+        """Delivers the results found in the cache"""
+        results = self.__cachedResults
+        self.__cachedResults = None
+        if results is not None:
+            results['Timings'] = {}
+            addTiming(results['Timings'], 'Total',
+                      time.monotonic() - self.__startedAt)
+            self.sigFinished.emit(results)
 
-        importDirs.reverse()
-        code = 'import sys'
-        for importDir in importDirs:
-            code += ';sys.path.insert(0,"' + importDir + '")'
-        return code
+    def __storeInCache(self, results):
+        """Saves the results if the file has not changed while analyzed"""
+        if self.__cacheKey is None:
+            return
+        if self.__content is None:
+            if self.__fileStat is None:
+                return
+            try:
+                stat = os.stat(self.__fileName)
+            except OSError:
+                return
+            if (stat.st_mtime_ns, stat.st_size) != self.__fileStat:
+                return
+        results['ExitStatus'] = int(results['ExitStatus'])
+        cached = dict(results)
+        # The astroid cache stats are of the run, not of the results
+        cached.pop('AstroidCacheHits', None)
+        cached.pop('AstroidCacheMisses', None)
+        cached.pop('Timings', None)
+        # The raw output may be many megabytes spilled to a file; reading it
+        # here would stall the GUI and bloat the entry for little use
+        cached.pop('StdOut', None)
+        cached.pop('StdErr', None)
+        self.__cache.put(self.__cacheKey, cached)
+
+    def __discardOutput(self):
+        """Drops the output collected so far"""
+        for writer in (self.__stdout, self.__stderr):
+            if writer is not None:
+                writer.discard()
+        self.__stdout = None
+        self.__stderr = None
+
+    def __resetOutput(self, parserClass):
+        """Prepares for a new output of a pylint run"""
+        self.__discardOutput()
+        self.__stdout = RawOutputWriter()
+        self.__stderr = RawOutputWriter()
+        try:
+            decoderClass = codecs.getincrementaldecoder(self.__encoding)
+        except LookupError:
+            decoderClass = codecs.getincrementaldecoder('utf-8')
+        # The incremental decoders keep a multibyte character split between
+        # two chunks till the next chunk comes
+        self.__stdoutDecoder = decoderClass(errors='replace')
+        self.__stderrDecoder = decoderClass(errors='replace')
+        self.__outputBytes = 0
+        self.__outputStarted = time.monotonic()
+        self.__parser = parserClass(self.__fileName)
+        self.__pendingMessages = []
+        self.__astroidCache = None
+        self.__costs = None
+
+    def __addOutput(self, text):
+        """Handles a piece of pylint stdout"""
+        if not text:
+            return
+        self.__stdout.write(text)
+        started = time.monotonic()
+        newMessages = self.__parser.feed(text)
+        addTiming(self.__timings, 'Parse', time.monotonic() - started)
+        if newMessages:
+            self.__pendingMessages.extend(newMessages)
+            if not self.__flushTimer.isActive():
+                self.__flushTimer.start()
+
+    @measureStall('messages flush')
+    def __flushMessages(self):
+        """Emits the messages parsed since the previous flush"""
+        self.__flushTimer.stop()
+        if self.__pendingMessages:
+            messages = self.__pendingMessages
+            self.__pendingMessages = []
+            self.sigMessages.emit(self.__fileName, messages)
+
+    @measureStall('worker output')
+    def __workerOutput(self, requestId, text):
+        """The warm worker has sent a piece of the output"""
+        if self.__isCurrentRequest(requestId):
+            self.__addOutput(text)
+
+    def __isCurrentRequest(self, requestId):
+        """True if the worker or daemon message is for the current run"""
+        # The worker and the daemon clients count the requests separately
+        return requestId == self.__workerRequest and \
+               self.sender() is self.__client
+
+    @measureStall('worker results')
+    def __workerFinished(self, requestId, response):
+        """The warm worker has served a request"""
+        if not self.__isCurrentRequest(requestId):
+            return
+        self.__workerRequest = None
+        self.__client = None
+
+        # What is not spent in the worker is the protocol overhead
+        elapsed = time.monotonic() - self.__phaseStarted
+        workerTimings = response.get('timings', {})
+        for phase in ('spawn', 'import', 'check'):
+            spent = workerTimings.get(phase, None)
+            if spent is not None:
+                addTiming(self.__timings, phase.capitalize(), spent)
+                elapsed -= spent
+        addTiming(self.__timings, 'Transfer', elapsed)
+
+        self.__addOutput(response.get('stdout', ''))
+        self.__stderr.write(response.get('stderr', ''))
+        self.__astroidCache = response.get('astroidCache', None)
+        self.__costs = response.get('costs', None)
+        self.__finished(response.get('exitCode', 0), QProcess.NormalExit)
+
+    @measureStall('worker failure')
+    def __workerFailed(self, requestId, message):
+        """The warm worker could not serve a request"""
+        if not self.__isCurrentRequest(requestId):
+            return
+        client = self.__client
+        self.__workerRequest = None
+        self.__client = None
+        if client is self.__daemon and not client.isAvailable() and \
+           self.__worker.isAvailable():
+            logging.debug(message + '; falling back to the pylint worker')
+            self.__resetOutput(PylintJSONLinesParser)
+            self.__client = self.__worker
+            self.__workerRequest = self.__worker.submit(*self.__request)
+            return
+        logging.debug(message + '; falling back to a one-shot pylint run')
+        # A failure to start is reported by the process error signal
+        self.__startProcess()
 
+    @measureStall('pylint stdout')
     def __readStdOutput(self):
         """Handles reading from stdout"""
-        self.__process.setReadChannel(QProcess.StandardOutput)
-        qba = QByteArray()
-        while self.__process.bytesAvailable():
-            qba += self.__process.readAllStandardOutput()
-        self.__stdout += str(qba.data(), self.__encoding)
+        data = bytes(self.__process.readAllStandardOutput())
+        self.__outputBytes += len(data)
+        self.__addOutput(self.__stdoutDecoder.decode(data))
 
+    @measureStall('pylint stderr')
     def __readStdError(self):
         """Handles reading from stderr"""
-        self.__process.setReadChannel(QProcess.StandardError)
-        qba = QByteArray()
-        while self.__process.bytesAvailable():
-            qba += self.__process.readAllStandardError()
-        self.__stderr += str(qba.data(), self.__encoding)
-
+        data = bytes(self.__process.readAllStandardError())
+        self.__outputBytes += len(data)
+        self.__stderr.write(self.__stderrDecoder.decode(data))
+
+    def __logThroughput(self):
+        """Logs the pylint output transfer rate"""
+        if self.__outputStarted is None or \
+           not logging.getLogger().isEnabledFor(logging.DEBUG):
+            return
+        if self.__outputBytes == 0:
+            # The worker path delivers decoded text
+            self.__outputBytes = self.__stdout.getSize() + \
+                                 self.__stderr.getSize()
+        elapsed = max(time.monotonic() - self.__outputStarted, 1e-6)
+        logging.debug('pylint output for %s: %d bytes in %.3f s '
+                      '(%.1f KiB/s)' % (self.__fileName, self.__outputBytes,
+                                        elapsed,
+                                        self.__outputBytes / elapsed / 1024))
+
+    @measureStall('pylint results')
     def __finished(self, exitCode, exitStatus):
         """Handles the process finish"""
+        if self.__process is not None:
+            # The one-shot process checking includes the pylint import and
+            # the output transfer
+            addTiming(self.__timings, 'Check',
+                      time.monotonic() - self.__phaseStarted)
+            self.__readStdOutput()
+            self.__readStdError()
+            # Flush the decoders: an incomplete trailing character is
+            # replaced rather than lost
+            self.__addOutput(self.__stdoutDecoder.decode(b'', final=True))
+            self.__stderr.write(self.__stderrDecoder.decode(b'', final=True))
         self.__process = None
+        started = time.monotonic()
+        self.__pendingMessages.extend(self.__parser.finish())
+        addTiming(self.__timings, 'Parse', time.monotonic() - started)
+        self.__flushMessages()
+        self.__logThroughput()
+
+        # Small outputs are strings, big ones are RawOutput objects
+        stdout = self.__stdout.close()
+        stderr = self.__stderr.close()
+        self.__stdout = None
+        self.__stderr = None
 
         results = {'ExitCode': exitCode,
                    'ExitStatus': exitStatus,
                    'FileName': self.__fileName,
+                   'Buffer': self.__content is not None,
+                   'Profile': self.__profile,
+                   'OutputFormat': self.__parser.FORMAT,
                    'Timestamp': getLocaleDateTime(),
                    'CommandLine': [sys.executable] + self.__args}
-
-        if not self.__stdout:
-            if self.__stderr:
-                results['ProcessError'] = 'pylint error:\n' + self.__stderr
+        if self.__astroidCache:
+            results['AstroidCacheHits'] = self.__astroidCache.get('hits', 0)
+            results['AstroidCacheMisses'] = self.__astroidCache.get('misses',
+                                                                    0)
+        results['Timings'] = self.__timings
+        if self.__costs:
+            results['CheckerCosts'] = [
+                (name, spent * 1000.0, messages, calls)
+                for name, spent, messages, calls in
+                self.__costs.get('checkers', [])]
+            results['ModuleCosts'] = [
+                (name, spent * 1000.0, messages)
+                for name, spent, messages in self.__costs.get('modules', [])]
+
+        if not stdout:
+            if stderr:
+                results['ProcessError'] = 'pylint error:\n' + \
+                                          getRawText(stderr)
             else:
                 results['ProcessError'] = 'pylint produced no output ' \
                                           '(finished abruptly) for ' + \
                                           self.__fileName
+            addTiming(self.__timings, 'Total',
+                      time.monotonic() - self.__startedAt)
             self.sigFinished.emit(results)
             self.__args = None
             return
 
-        # Convention, Refactor, Warning, Error
-        results.update({'C': [], 'R': [], 'W': [], 'E': [],
-                        'StdOut': self.__stdout,
-                        'StdErr': self.__stderr})
-        modulePattern = '************* Module '
-
-        module = ''
-        for line in self.__stdout.splitlines():
-            if line.startswith(modulePattern):
-                module = line[len(modulePattern):]
-                continue
-            if not re.match(r'^[CRWE]+([0-9]{4})?:', line):
-                continue
-            colonPos1 = line.find(':')
-            if colonPos1 == -1:
-                continue
-            msgId = line[:colonPos1]
-            colonPos2 = line.find(':', colonPos1 + 1)
-            if colonPos2 == -1:
-                continue
-            lineNo = line[colonPos1 + 1:colonPos2].strip()
-            if not lineNo:
-                continue
-            lineNo = int(lineNo.split(',')[0])
-            message = line[colonPos2 + 1:].strip()
-            if message.startswith(':'):
-                message = message[1:].strip()
-            item = (module, lineNo, message, msgId)
-            results[line[0]].append(item)
-
-        # Rate and previous run
-        ratePattern = 'Your code has been rated at '
-        ratePos = self.__stdout.find(ratePattern)
-        if ratePos > 0:
-            rateEndPos = self.__stdout.find('/10', ratePos)
-            if rateEndPos > 0:
-                rate = self.__stdout[ratePos + len(ratePattern):rateEndPos]
-                results['Rate'] = rate
-
-                # Previous run
-                prevRunPattern = 'previous run: '
-                prevRunPos = self.__stdout.find(prevRunPattern, rateEndPos)
-                if prevRunPos > 0:
-                    prevRunEndPos = self.__stdout.find('/10', prevRunPos)
-                    previous = self.__stdout[prevRunPos +
-                                             len(prevRunPattern):prevRunEndPos]
-                    results['PreviousRunRate'] = previous
-
+        results.update({'StdOut': stdout,
+                        'StdErr': stderr})
+        started = time.monotonic()
+        self.__parser.updateResults(results)
+        addTiming(self.__timings, 'Parse', time.monotonic() - started)
+
+        if self.__verifiedResults is not None:
+            stale = not PylintResultCache.isSameResults(
+                self.__verifiedResults, results)
+            self.__cache.recordVerification(self.__cacheKey, stale)
+            results['CacheVerification'] = 'stale' if stale else 'up to date'
+            self.__verifiedResults = None
+        self.__storeInCache(results)
+        addTiming(self.__timings, 'Total',
+                  time.monotonic() - self.__startedAt)
         self.sigFinished.emit(results)
         self.__args = None
 
@@ -0,0 +1,233 @@
+# -*- coding: utf-8 -*-
+#
+# codimension - graphics python two-way code editor and analyzer
+# Copyright (C) 2019  Sergey Satskiy <sergey.satskiy@gmail.com>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+"""Codimension pylint git changes detection.
+
+   The changed files and their changed lines are taken from the local git
+   working tree compared to HEAD or another commit. The untracked files are
+   changed as a whole. git runs asynchronously, step by step.
+"""
+
+
+import re
+import os.path
+from array import array
+from bisect import bisect_right
+from ui.qt import QObject, QProcess, pyqtSignal
+from .pylintworkerclient import killProcess
+
+
+HUNK_REGEXP = re.compile(r'^@@ -[0-9,]+ \+([0-9]+)(?:,([0-9]+))? @@')
+
+# The C style escapes git uses in the quoted paths
+ESCAPES = {'a': 7, 'b': 8, 't': 9, 'n': 10, 'v': 11, 'f': 12, 'r': 13,
+           '"': 34, '\\': 92}
+
+
+def unquotePath(path):
+    """Provides the path of a diff header as it is on disk.
+
+    git adds a tab after a name with spaces and quotes a name with special
+    characters in the C style; non-ASCII bytes are octal escaped unless
+    core.quotePath is false.
+    """
+    if path.endswith('\t'):
+        path = path[:-1]
+    if len(path) < 2 or not path.startswith('"') or not path.endswith('"'):
+        return path
+
+    data = bytearray()
+    index = 1
+    end = len(path) - 1
+    while index < end:
+        char = path[index]
+        if char != '\\' or index + 1 >= end:
+            data += char.encode('utf-8')
+            index += 1
+            continue
+        escaped = path[index + 1]
+        if escaped in ESCAPES:
+            data.append(ESCAPES[escaped])
+            index += 2
+        elif path[index + 1:index + 4].isdigit():
+            data.append(int(path[index + 1:index + 4], 8) & 0xFF)
+            index += 4
+        else:
+            data += char.encode('utf-8')
+            index += 1
+    return data.decode('utf-8', errors='replace')
+
+
+class LineIntervals:
+
+    """Sorted disjoint line intervals with a binary search lookup"""
+
+    def __init__(self, intervals):
+        self.__starts = array('i')
+        self.__ends = array('i')
+        for first, last in sorted(intervals):
+            if self.__ends and first <= self.__ends[-1] + 1:
+                # Overlaps or touches the previous one
+                self.__ends[-1] = max(self.__ends[-1], last)
+            else:
+                self.__starts.append(first)
+                self.__ends.append(last)
+
+    def __len__(self):
+        return len(self.__starts)
+
+    def overlaps(self, first, last):
+        """True if any of the lines [first, last] is in an interval"""
+        position = bisect_right(self.__starts, last) - 1
+        return position >= 0 and self.__ends[position] >= first
+
+
+def parseDiff(text, topDir):
+    """Provides a dictionary of the file name to the changed lines.
+
+    The text is a 'git diff -U0' output. The file names are absolute.
+    A removal of lines marks the line before the removed ones.
+    """
+    hunks = {}
+    current = None
+    for line in text.splitlines():
+        if line.startswith('+++ '):
+            path = unquotePath(line[4:])
+            if path.startswith('b/'):
+                current = hunks.setdefault(os.path.join(topDir, path[2:]), [])
+            else:
+                current = None      # /dev/null: the file is removed
+            continue
+        if current is None or not line.startswith('@@'):
+            continue
+        match = HUNK_REGEXP.match(line)
+        if match is None:
+            continue
+        first = int(match.group(1))
+        count = 1 if match.group(2) is None else int(match.group(2))
+        if count == 0:
+            first = max(first, 1)
+            count = 1
+        current.append((first, first + count - 1))
+    return {fileName: LineIntervals(intervals)
+            for fileName, intervals in hunks.items()}
+
+
+class PylintGitChanges(QObject):
+
+    """Collects the git working tree changes.
+
+    sigFinished provides the top directory of the working tree, a dictionary
+    of the changed file names to their LineIntervals or None if the whole
+    file is new, and an error message which is empty on success.
+    """
+
+    sigFinished = pyqtSignal(str, object, str)
+
+    def __init__(self, parent=None):
+        QObject.__init__(self, parent)
+
+        self.__process = None
+        self.__steps = []
+        self.__topDir = None
+        self.__changes = None
+
+    def isInProcess(self):
+        """True if git is running"""
+        return self.__process is not None
+
+    def start(self, workDir, base='HEAD'):
+        """Starts collecting the changes of the working tree of the dir"""
+        if self.__process is not None:
+            return 'Another git changes collection is in progress'
+        self.__topDir = workDir
+        self.__changes = {}
+        self.__steps = [(['rev-parse', '--show-toplevel'], self.__topDirFound),
+                        (['-c', 'core.quotePath=false', 'diff', '-U0',
+                          '--no-color', '--no-ext-diff', '--diff-filter=d',
+                          base, '--'], self.__diffFound),
+                        (['-c', 'core.quotePath=false', 'ls-files',
+                          '--others', '--exclude-standard'],
+                         self.__untrackedFound)]
+        self.__runNextStep()
+        return None
+
+    def stop(self):
+        """Interrupts the collection"""
+        if self.__process is not None:
+            killProcess(self.__process)
+            self.__process = None
+        self.__steps = []
+
+    def __runNextStep(self):
+        """Runs the next git command"""
+        if not self.__steps:
+            self.sigFinished.emit(self.__topDir, self.__changes, '')
+            return
+        args = self.__steps[0][0]
+        self.__process = QProcess(self)
+        self.__process.setWorkingDirectory(self.__topDir)
+        self.__process.finished.connect(self.__stepFinished)
+        self.__process.errorOccurred.connect(self.__stepError)
+        self.__process.start('git', args)
+
+    def __stepFinished(self, exitCode, exitStatus):
+        """The git command has finished"""
+        process = self.__process
+        self.__process = None
+        process.deleteLater()
+        stdout = bytes(process.readAllStandardOutput()).decode(
+            'utf-8', errors='replace')
+        if exitStatus != QProcess.NormalExit or exitCode != 0:
+            stderr = bytes(process.readAllStandardError()).decode(
+                'utf-8', errors='replace')
+            self.__fail('git ' + ' '.join(self.__steps[0][0]) + ' failed: ' +
+                        stderr.strip())
+            return
+        _, handler = self.__steps.pop(0)
+        handler(stdout)
+        self.__runNextStep()
+
+    def __stepError(self, error):
+        """The git command could not be started"""
+        if error != QProcess.FailedToStart or self.__process is None:
+            return
+        self.__process.deleteLater()
+        self.__process = None
+        self.__fail('git could not be started')
+
+    def __fail(self, message):
+        """Reports an error"""
+        self.__steps = []
+        self.sigFinished.emit(self.__topDir, {}, message)
+
+    def __topDirFound(self, output):
+        """Handles the working tree top directory"""
+        self.__topDir = os.path.normpath(output.strip())
+
+    def __diffFound(self, output):
+        """Handles the changed lines"""
+        self.__changes.update(parseDiff(output, self.__topDir))
+
+    def __untrackedFound(self, output):
+        """Handles the new files"""
+        for path in output.splitlines():
+            if path:
+                self.__changes[os.path.join(self.__topDir,
+                                            unquotePath(path))] = None
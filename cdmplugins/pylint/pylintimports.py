@@ -0,0 +1,250 @@
+# -*- coding: utf-8 -*-
+#
+# codimension - graphics python two-way code editor and analyzer
+# Copyright (C) 2019  Sergey Satskiy <sergey.satskiy@gmail.com>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+"""Codimension pylint project import dependency index.
+
+   A project file imports module names; the names are not resolved to
+   files. A file depends on a saved file if it imports one of the names
+   the saved file is importable as from the project directory or the
+   project import directories, or if it imports such a dependent file.
+"""
+
+
+import ast
+import os.path
+import time
+from collections import deque
+from ui.qt import QObject, QTimer, pyqtSignal
+from .pylintbatch import collectPythonFiles, PYTHON_SUFFIXES
+from .pylintlatency import measureStall
+
+
+def getModuleName(fileName, root):
+    """Provides (module name, is package) of the file under the root.
+
+    The module name is None if the file is not importable from the root.
+    """
+    if not fileName.startswith(root):
+        return None, False
+    parts = os.path.splitext(fileName[len(root):])[0].split(os.path.sep)
+    isPackage = parts[-1] == '__init__'
+    if isPackage:
+        parts.pop()
+    if not parts or not all(part.isidentifier() for part in parts):
+        return None, False
+    return '.'.join(parts), isPackage
+
+
+def getImportBase(moduleName, isPackage, node):
+    """Provides the absolute module name a 'from' import refers to"""
+    if node.level == 0:
+        return node.module
+    parts = moduleName.split('.')
+    drop = node.level if not isPackage else node.level - 1
+    if drop > len(parts):
+        return None
+    parts = parts[:len(parts) - drop]
+    if node.module:
+        parts.append(node.module)
+    return '.'.join(parts) or None
+
+
+def getImportedNames(tree, moduleNames):
+    """Provides the set of module names the parsed module imports.
+
+    The module names are (name, is package) the module is importable as;
+    they are needed to resolve the relative imports.
+    """
+    names = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            names.update(alias.name for alias in node.names)
+        elif isinstance(node, ast.ImportFrom):
+            bases = set()
+            if node.level == 0:
+                bases.add(node.module)
+            else:
+                for moduleName, isPackage in moduleNames:
+                    bases.add(getImportBase(moduleName, isPackage, node))
+            for base in bases:
+                if not base:
+                    continue
+                # The imported name may be a submodule or a module member
+                names.add(base)
+                for alias in node.names:
+                    if alias.name != '*':
+                        names.add(base + '.' + alias.name)
+    return names
+
+
+class PylintImportIndex(QObject):
+
+    """Import dependency index of the project files.
+
+    The index is built when a file is saved for the first time. The project
+    files are scanned in short slices so the GUI stays responsive; the saved
+    file dependents are reported when the scan is complete. After that a
+    saved file is scanned again right away.
+    """
+
+    # saved file name, the files which import it
+    sigDependents = pyqtSignal(str, list)
+
+    # The GUI thread time spent scanning at once
+    SCAN_SLICE_MS = 10
+
+    # The max number of the dependents reported for a saved file
+    MAX_DEPENDENTS = 100
+
+    def __init__(self, ide, parent=None):
+        QObject.__init__(self, parent)
+
+        self.__ide = ide
+        self.__roots = []
+        self.__imports = {}         # file name -> set of imported names
+        self.__importers = {}       # module name -> set of file names
+        self.__pending = deque()    # files to be scanned
+        self.__waiting = []         # saved files to report the dependents of
+        self.__built = False
+
+        self.__scanTimer = QTimer(self)
+        self.__scanTimer.setSingleShot(True)
+        self.__scanTimer.setInterval(0)
+        self.__scanTimer.timeout.connect(self.__scanSlice)
+
+    def clear(self):
+        """Drops the index, e.g. when the project is changed"""
+        self.__scanTimer.stop()
+        self.__roots = []
+        self.__imports = {}
+        self.__importers = {}
+        self.__pending = deque()
+        self.__waiting = []
+        self.__built = False
+
+    def isReady(self):
+        """True if all the project files have been scanned"""
+        return self.__built and not self.__pending
+
+    def fileSaved(self, fileName):
+        """Updates the index for the saved file; sigDependents follows"""
+        if not self.__ide.project.isLoaded():
+            self.sigDependents.emit(fileName, [])
+            return
+        if not self.__built:
+            self.__startBuild()
+
+        self.__scanFile(fileName)
+        if self.__pending:
+            if fileName not in self.__waiting:
+                self.__waiting.append(fileName)
+            return
+        self.sigDependents.emit(fileName, self.getDependents(fileName))
+
+    def getDependents(self, fileName):
+        """Provides a sorted list of the files depending on the file.
+
+        The importers of the importers are followed too, the nearest ones
+        first, till MAX_DEPENDENTS files are collected.
+        """
+        dependents = set()
+        queue = deque([fileName])
+        while queue:
+            for importer in sorted(self.__getImporters(queue.popleft())):
+                if importer != fileName and importer not in dependents:
+                    if len(dependents) >= self.MAX_DEPENDENTS:
+                        return sorted(dependents)
+                    dependents.add(importer)
+                    queue.append(importer)
+        return sorted(dependents)
+
+    def __getImporters(self, fileName):
+        """Provides the set of the files importing the file directly"""
+        importers = set()
+        for root in self.__roots:
+            moduleName, _ = getModuleName(fileName, root)
+            if moduleName is not None:
+                importers.update(self.__importers.get(moduleName, ()))
+        return importers
+
+    def __startBuild(self):
+        """Starts scanning the project files"""
+        project = self.__ide.project
+        projectDir = project.getProjectDir()
+        roots = [projectDir]
+        for importDir in project.getImportDirsAsAbsolutePaths():
+            if not importDir.endswith(os.path.sep):
+                importDir += os.path.sep
+            if importDir not in roots:
+                roots.append(importDir)
+        self.__roots = roots
+        self.__pending = deque(collectPythonFiles(projectDir))
+        self.__built = True
+        self.__scanTimer.start()
+
+    @measureStall('import index scan')
+    def __scanSlice(self):
+        """Scans the project files for a while"""
+        deadline = time.perf_counter() + self.SCAN_SLICE_MS / 1000.0
+        while self.__pending and time.perf_counter() < deadline:
+            self.__scanFile(self.__pending.popleft())
+        if self.__pending:
+            self.__scanTimer.start()
+            return
+
+        waiting = self.__waiting
+        self.__waiting = []
+        for fileName in waiting:
+            self.sigDependents.emit(fileName, self.getDependents(fileName))
+
+    def __scanFile(self, fileName):
+        """Updates the imports of a file"""
+        if not fileName.endswith(PYTHON_SUFFIXES):
+            return
+        try:
+            with open(fileName, 'rb') as diskFile:
+                # The parser takes care of the encoding declaration
+                tree = ast.parse(diskFile.read(), fileName)
+        except OSError:
+            self.__setImports(fileName, set())
+            return
+        except (SyntaxError, ValueError):
+            # Keep what was imported before the file got broken
+            return
+
+        moduleNames = []
+        for root in self.__roots:
+            moduleName, isPackage = getModuleName(fileName, root)
+            if moduleName is not None:
+                moduleNames.append((moduleName, isPackage))
+        self.__setImports(fileName, getImportedNames(tree, moduleNames))
+
+    def __setImports(self, fileName, names):
+        """Replaces the file imported names"""
+        oldNames = self.__imports.pop(fileName, set())
+        for name in oldNames - names:
+            importers = self.__importers.get(name, None)
+            if importers is not None:
+                importers.discard(fileName)
+                if not importers:
+                    del self.__importers[name]
+        for name in names - oldNames:
+            self.__importers.setdefault(name, set()).add(fileName)
+        if names:
+            self.__imports[fileName] = names
@@ -0,0 +1,95 @@
+# -*- coding: utf-8 -*-
+#
+# codimension - graphics python two-way code editor and analyzer
+# Copyright (C) 2019  Sergey Satskiy <sergey.satskiy@gmail.com>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+"""Codimension pylint plugin GUI thread latency probe.
+
+   The plugin code which runs in the GUI thread, i.e. the slots and the
+   entry points called by the IDE, is wrapped with measureStall(). The
+   probe keeps the longest time the event loop was blocked per place.
+"""
+
+
+import time
+import logging
+import functools
+
+
+class PylintLatencyProbe:
+
+    """Keeps the longest GUI thread stalls caused by the plugin"""
+
+    # A stall longer than that is logged when it happens
+    REPORT_THRESHOLD_MS = 100.0
+
+    def __init__(self):
+        self.__longest = {}     # place -> milliseconds
+        self.__calls = {}       # place -> number of calls
+
+    def reset(self):
+        """Forgets the collected stalls"""
+        self.__longest = {}
+        self.__calls = {}
+
+    def record(self, place, spent):
+        """Records a GUI thread work of the given milliseconds"""
+        self.__calls[place] = self.__calls.get(place, 0) + 1
+        if spent > self.__longest.get(place, 0.0):
+            self.__longest[place] = spent
+        if spent > self.REPORT_THRESHOLD_MS:
+            logging.debug('pylint plugin blocked the GUI thread for '
+                          '%.1f ms in %s' % (spent, place))
+
+    def getLongest(self):
+        """Provides (milliseconds, place) of the longest stall.
+
+        The place is None if nothing has been recorded.
+        """
+        if not self.__longest:
+            return 0.0, None
+        place = max(self.__longest, key=self.__longest.get)
+        return self.__longest[place], place
+
+    def getReport(self):
+        """Provides the stalls description, the longest first"""
+        if not self.__longest:
+            return 'pylint plugin GUI thread stalls: nothing recorded'
+        lines = ['pylint plugin GUI thread stalls (longest, calls):']
+        for place in sorted(self.__longest, key=self.__longest.get,
+                            reverse=True):
+            lines.append('    %s: %.1f ms, %d' % (place, self.__longest[place],
+                                                 self.__calls[place]))
+        return '\n'.join(lines)
+
+
+LATENCY_PROBE = PylintLatencyProbe()
+
+
+def measureStall(place):
+    """Decorator which reports the function run time to the probe"""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                LATENCY_PROBE.record(
+                    place, (time.perf_counter() - started) * 1000.0)
+        return wrapper
+    return decorator
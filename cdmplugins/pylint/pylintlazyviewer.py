@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+#
+# codimension - graphics python two-way code editor and analyzer
+# Copyright (C) 2019  Sergey Satskiy <sergey.satskiy@gmail.com>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+
+"""Codimension pylint results viewer placeholder.
+
+   The results viewer and its modules are not needed till there is
+   something to show so the side bar gets this light widget at start up.
+"""
+
+
+import time
+from ui.qt import QWidget, QVBoxLayout
+from .pylintmetrics import STARTUP_TIMINGS
+
+
+class PylintLazyResultViewer(QWidget):
+
+    """Creates the results viewer when it is first shown or needed"""
+
+    def __init__(self, ide, pluginHomeDir, parent=None):
+        QWidget.__init__(self, parent)
+
+        self.__ide = ide
+        self.__pluginHomeDir = pluginHomeDir
+        self.__viewer = None
+
+        self.__layout = QVBoxLayout(self)
+        self.__layout.setContentsMargins(0, 0, 0, 0)
+
+    def isCreated(self):
+        """True if the results viewer has been created"""
+        return self.__viewer is not None
+
+    def getViewer(self):
+        """Provides the results viewer; creates it if needed"""
+        if self.__viewer is None:
+            started = time.perf_counter()
+            from .pylintresultviewer import PylintResultViewer
+            self.__viewer = PylintResultViewer(self.__ide,
+                                               self.__pluginHomeDir, self)
+            self.__layout.addWidget(self.__viewer)
+            # The viewer is in the side bar already so the tab tooltip
+            # is set properly
+            self.__viewer.clear()
+            STARTUP_TIMINGS.record('results viewer creation',
+                                   time.perf_counter() - started)
+        return self.__viewer
+
+    def showEvent(self, event):
+        """The pylint tab is shown"""
+        self.getViewer()
+        QWidget.showEvent(self, event)
@@ -0,0 +1,131 @@
+# -*- coding: utf-8 -*-
+#
+# codimension - graphics python two-way code editor and analyzer
+# Copyright (C) 2019  Sergey Satskiy <sergey.satskiy@gmail.com>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+
+"""Codimension pylint analysis phase timings.
+
+   The timings are kept in the results dictionary as 'Timings': a dictionary
+   of a phase name to the milliseconds spent in it. The phases which do not
+   apply to a run, e.g. the spawn for a warm worker, are not there.
+"""
+
+
+import os
+import json
+import time
+import logging
+
+
+# Phase name, description
+PHASES = (('Spawn', 'process spawn'),
+          ('Import', 'pylint import'),
+          ('Check', 'checking'),
+          ('Transfer', 'output transfer'),
+          ('Parse', 'output parsing'),
+          ('Populate', 'results population'),
+          ('Total', 'total'))
+
+
+def addTiming(timings, phase, seconds):
+    """Adds the seconds spent in a phase"""
+    timings[phase] = timings.get(phase, 0.0) + max(seconds, 0.0) * 1000.0
+
+
+def mergeTimings(total, timings):
+    """Adds one run timings to the others, e.g. for a batch"""
+    for phase, spent in timings.items():
+        total[phase] = total.get(phase, 0.0) + spent
+
+
+def formatTimings(timings):
+    """Provides the short text and the detailed tooltip"""
+    total = timings.get('Total', None)
+    text = '' if total is None else '%.2f s' % (total / 1000.0)
+    lines = ['pylint analysis phase timings:']
+    for phase, description in PHASES:
+        if phase in timings:
+            lines.append('%s: %.1f ms' % (description, timings[phase]))
+    return text, '\n'.join(lines)
+
+
+def appendMetrics(fileName, results):
+    """Appends the analysis timings to a JSON lines log"""
+    timings = results.get('Timings', None)
+    if not timings:
+        return
+    record = {'time': time.time(),
+              'file': results.get('FileName', None),
+              'trigger': results.get('Trigger', None),
+              'profile': results.get('Profile', None),
+              'cached': results.get('Cached', False),
+              'files': len(results.get('Files', ())) or 1,
+              'timings': {phase: round(spent, 3)
+                          for phase, spent in timings.items()}}
+    for key in ('CachedFiles', 'AstroidCacheHits', 'AstroidCacheMisses'):
+        if key in results:
+            record[key[0].lower() + key[1:]] = results[key]
+    try:
+        os.makedirs(os.path.dirname(fileName), exist_ok=True)
+        with open(fileName, 'a', encoding='utf-8') as diskFile:
+            diskFile.write(json.dumps(record) + '\n')
+    except OSError as exc:
+        logging.error('Error writing pylint metrics into ' + fileName +
+                      ': ' + str(exc))
+
+
+class PluginStartupTimings:
+
+    """Measures the plugin share of the IDE start up.
+
+    The activation is measured as well as the work deferred till the IDE
+    is up or till the first use, e.g. the results viewer creation.
+    """
+
+    def __init__(self):
+        self.timings = {}
+
+    def record(self, what, seconds):
+        """Adds the seconds spent in a start up step"""
+        addTiming(self.timings, what, seconds)
+        logging.debug('pylint plugin %s took %.1f ms' %
+                      (what, seconds * 1000.0))
+
+    def getReport(self):
+        """Provides the start up timings as text"""
+        lines = ['pylint plugin start up timings:']
+        for what, spent in self.timings.items():
+            lines.append('%s: %.1f ms' % (what, spent))
+        return '\n'.join(lines)
+
+
+STARTUP_TIMINGS = PluginStartupTimings()
+
+
+def appendStartupMetrics(fileName):
+    """Appends the plugin start up timings to a JSON lines log"""
+    record = {'time': time.time(),
+              'startup': {what: round(spent, 3)
+                          for what, spent in STARTUP_TIMINGS.timings.items()}}
+    try:
+        os.makedirs(os.path.dirname(fileName), exist_ok=True)
+        with open(fileName, 'a', encoding='utf-8') as diskFile:
+            diskFile.write(json.dumps(record) + '\n')
+    except OSError as exc:
+        logging.error('Error writing pylint metrics into ' + fileName +
+                      ': ' + str(exc))
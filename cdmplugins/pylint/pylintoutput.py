@@ -20,9 +20,149 @@
 """Codimension pylint stdout/stderr viewer"""
 
 from ui.qt import (QDialog, QVBoxLayout, QHBoxLayout, Qt, QProcess,
-                   QSizePolicy, QLabel, QDialogButtonBox, QTextEdit)
+                   QSizePolicy, QLabel, QDialogButtonBox, QPlainTextEdit,
+                   QWidget, QPushButton, QLineEdit, QTextCursor)
 from ui.labels import HeaderFitLabel
 from utils.colorfont import getZoomedMonoFont
+from .pylintrawoutput import (RawOutputReader, RawOutputWriter,
+                              iterRawLines)
+from .pylintparser import renderTextReport
+
+
+def renderRawOutput(output):
+    """Provides the worker JSON lines output as the pylint text report.
+
+    The rendering is done when the output is shown only; a big report
+    goes to a temporary file like the output itself.
+    """
+    writer = RawOutputWriter()
+    for piece in renderTextReport(iterRawLines(output)):
+        writer.write(piece)
+    return writer.close()
+
+
+class RawOutputPane(QWidget):
+
+    """Shows a raw output page by page and searches in it"""
+
+    PAGE_LINES = 1000
+
+    def __init__(self, output, parent=None):
+        QWidget.__init__(self, parent)
+        self.__reader = RawOutputReader(output)
+        self.__page = -1
+        self.__foundLine = -1
+        self.__createLayout()
+        self.__showPage(0)
+
+    def __createLayout(self):
+        """Creates the layout"""
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+
+        self.__editor = QPlainTextEdit(self)
+        self.__editor.setReadOnly(True)
+        self.__editor.setFont(getZoomedMonoFont())
+        self.__editor.setLineWrapMode(QPlainTextEdit.NoWrap)
+        layout.addWidget(self.__editor)
+
+        navigationLayout = QHBoxLayout()
+        navigationLayout.setSpacing(4)
+        self.__prevButton = QPushButton('<', self)
+        self.__prevButton.setToolTip('Previous page')
+        self.__prevButton.clicked.connect(self.__prevPage)
+        self.__nextButton = QPushButton('>', self)
+        self.__nextButton.setToolTip('Next page')
+        self.__nextButton.clicked.connect(self.__nextPage)
+        self.__pageLabel = QLabel(self)
+
+        self.__searchEdit = QLineEdit(self)
+        self.__searchEdit.setPlaceholderText('Find in the output')
+        self.__searchEdit.setClearButtonEnabled(True)
+        self.__searchEdit.textChanged.connect(self.__searchChanged)
+        self.__searchEdit.returnPressed.connect(self.__findNext)
+        self.__findButton = QPushButton('Find next', self)
+        self.__findButton.clicked.connect(self.__findNext)
+
+        navigationLayout.addWidget(self.__prevButton)
+        navigationLayout.addWidget(self.__nextButton)
+        navigationLayout.addWidget(self.__pageLabel)
+        navigationLayout.addStretch(1)
+        navigationLayout.addWidget(self.__searchEdit)
+        navigationLayout.addWidget(self.__findButton)
+        layout.addLayout(navigationLayout)
+
+    def release(self):
+        """Releases the output file"""
+        self.__reader.close()
+
+    def __getPageCount(self):
+        """Provides the number of pages"""
+        lineCount = self.__reader.getLineCount()
+        return max(1, (lineCount + self.PAGE_LINES - 1) // self.PAGE_LINES)
+
+    def __showPage(self, page):
+        """Shows the given page"""
+        if page != self.__page:
+            self.__page = page
+            first = page * self.PAGE_LINES
+            self.__editor.setPlainText(self.__reader.getLines(
+                first, self.PAGE_LINES))
+
+        lineCount = self.__reader.getLineCount()
+        pageCount = self.__getPageCount()
+        first = page * self.PAGE_LINES
+        last = min(first + self.PAGE_LINES, lineCount)
+        self.__pageLabel.setText('lines ' + str(min(first + 1, last)) +
+                                 '-' + str(last) + ' of ' + str(lineCount))
+        self.__prevButton.setEnabled(page > 0)
+        self.__nextButton.setEnabled(page + 1 < pageCount)
+        for widget in (self.__prevButton, self.__nextButton,
+                       self.__pageLabel):
+            widget.setVisible(pageCount > 1)
+
+    def __prevPage(self):
+        """Shows the previous page"""
+        if self.__page > 0:
+            self.__showPage(self.__page - 1)
+
+    def __nextPage(self):
+        """Shows the next page"""
+        if self.__page + 1 < self.__getPageCount():
+            self.__showPage(self.__page + 1)
+
+    def __searchChanged(self, text):
+        """The search starts from the current page again"""
+        del text    # unused argument
+        self.__foundLine = -1
+        self.__findButton.setText('Find next')
+
+    def __findNext(self):
+        """Finds the next line with the text"""
+        text = self.__searchEdit.text()
+        if not text:
+            return
+        if self.__foundLine >= 0:
+            start = self.__foundLine + 1
+        else:
+            start = self.__page * self.PAGE_LINES
+        line = self.__reader.find(text, start)
+        if line == -1 and start > 0:
+            # Wrap around
+            line = self.__reader.find(text, 0)
+        if line == -1:
+            self.__findButton.setText('Not found')
+            return
+
+        self.__findButton.setText('Find next')
+        self.__foundLine = line
+        self.__showPage(line // self.PAGE_LINES)
+        block = self.__editor.document().findBlockByNumber(
+            line - self.__page * self.PAGE_LINES)
+        cursor = QTextCursor(block)
+        cursor.movePosition(QTextCursor.EndOfBlock, QTextCursor.KeepAnchor)
+        self.__editor.setTextCursor(cursor)
+        self.__editor.centerCursor()
 
 
 class PylintStdoutStderrViewer(QDialog):
@@ -43,7 +183,15 @@ class PylintStdoutStderrViewer(QDialog):
         else:
             title += ' standard error'
         self.setWindowTitle(title)
+        self.__panes = []
         self.__createLayout(results)
+        self.finished.connect(self.__releaseOutput)
+
+    def __releaseOutput(self):
+        """Releases the output files"""
+        for pane in self.__panes:
+            pane.release()
+        self.__panes = []
 
     def __createLayout(self, results):
         """Creates the layout"""
@@ -90,6 +238,9 @@ class PylintStdoutStderrViewer(QDialog):
         layout.addLayout(headerLayout)
 
         stdout = results.get('StdOut', None)
+        if stdout is not None and results.get('OutputFormat', None) != 'text':
+            # The worker protocol JSON means nothing to a user
+            stdout = renderRawOutput(stdout)
         if stdout is None:
             stdoutLabel = QLabel('Standard output: not available', self)
             layout.addWidget(stdoutLabel)
@@ -97,12 +248,9 @@ class PylintStdoutStderrViewer(QDialog):
             stdoutLabel = QLabel('Standard output:', self)
             layout.addWidget(stdoutLabel)
 
-            stdoutEditor = QTextEdit()
-            stdoutEditor.setReadOnly(True)
-            stdoutEditor.setFont(getZoomedMonoFont())
-            stdoutEditor.setAcceptRichText(False)
-            stdoutEditor.setPlainText(stdout)
-            layout.addWidget(stdoutEditor)
+            stdoutPane = RawOutputPane(stdout, self)
+            self.__panes.append(stdoutPane)
+            layout.addWidget(stdoutPane)
 
         stderr = results.get('StdErr', None)
         if stderr is None:
@@ -112,12 +260,9 @@ class PylintStdoutStderrViewer(QDialog):
             stderrLabel = QLabel('Standard error:', self)
             layout.addWidget(stderrLabel)
 
-            stderrEditor = QTextEdit()
-            stderrEditor.setReadOnly(True)
-            stderrEditor.setFont(getZoomedMonoFont())
-            stderrEditor.setAcceptRichText(False)
-            stderrEditor.setPlainText(stderr)
-            layout.addWidget(stderrEditor)
+            stderrPane = RawOutputPane(stderr, self)
+            self.__panes.append(stderrPane)
+            layout.addWidget(stderrPane)
 
         # Buttons at the bottom
         buttonBox = QDialogButtonBox(self)
@@ -0,0 +1,253 @@
+# -*- coding: utf-8 -*-
+#
+# codimension - graphics python two-way code editor and analyzer
+# Copyright (C) 2019  Sergey Satskiy <sergey.satskiy@gmail.com>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+"""Codimension pylint output parsers.
+
+   A parsed message is a tuple:
+   (module, line, message, msg id, file name,
+    column, end line, symbol, confidence)
+   The last four items are None if the output format does not provide them.
+"""
+
+
+import re
+import json
+
+
+MSG_REGEXP = re.compile(r'^[CRWE]+([0-9]{4})?:')
+
+TEXT_MSG_TEMPLATE = '{msg_id}:{line:3d},{column}: {obj}: {msg}'
+
+# The number of items in a parsed message
+MESSAGE_FIELDS = 9
+
+MODULE_PATTERN = '************* Module '
+RATE_PATTERN = 'Your code has been rated at '
+PREVIOUS_RUN_PATTERN = 'previous run: '
+
+
+def parseRate(text):
+    """Provides the rate and the previous run rate found in the text"""
+    rate = None
+    previousRate = None
+    ratePos = text.find(RATE_PATTERN)
+    if ratePos == -1:
+        return rate, previousRate
+    rateEndPos = text.find('/10', ratePos)
+    if rateEndPos == -1:
+        return rate, previousRate
+    rate = text[ratePos + len(RATE_PATTERN):rateEndPos]
+
+    prevRunPos = text.find(PREVIOUS_RUN_PATTERN, rateEndPos)
+    if prevRunPos != -1:
+        prevRunEndPos = text.find('/10', prevRunPos)
+        if prevRunEndPos != -1:
+            previousRate = text[prevRunPos +
+                                len(PREVIOUS_RUN_PATTERN):prevRunEndPos]
+    return rate, previousRate
+
+
+class PylintOutputParser:
+
+    """Base of the incremental pylint output parsers.
+
+    The output may be fed in arbitrary chunks as it arrives; only complete
+    lines are parsed, an incomplete one is kept till the next chunk.
+    """
+
+    def __init__(self, fileName):
+        self._fileName = fileName
+        self.__tail = ''
+
+        # Convention, Refactor, Warning, Error
+        self.messages = {'C': [], 'R': [], 'W': [], 'E': []}
+        self.rate = None
+        self.previousRate = None
+
+    def feed(self, text):
+        """Parses the complete lines. Provides a list of the new messages"""
+        lines = (self.__tail + text).split('\n')
+        self.__tail = lines.pop()
+        return self.__addMessages(self._parseLines(lines))
+
+    def finish(self):
+        """Parses the rest of the output. Provides a list of new messages"""
+        tail = self.__tail
+        self.__tail = ''
+        if tail:
+            return self.__addMessages(self._parseLines([tail]))
+        return []
+
+    def updateResults(self, results):
+        """Puts the parsed data into the results dictionary"""
+        results.update(self.messages)
+        if self.rate is not None:
+            results['Rate'] = self.rate
+            if self.previousRate is not None:
+                results['PreviousRunRate'] = self.previousRate
+
+    def __addMessages(self, items):
+        """Sorts the parsed messages by category"""
+        newMessages = []
+        for item in items:
+            category = self.messages.get(item[3][0], None)
+            if category is not None:
+                category.append(item)
+                newMessages.append(item)
+        return newMessages
+
+    def _parseLines(self, lines):
+        """Parses the given complete lines. Provides a list of messages"""
+        items = []
+        for line in lines:
+            item = self._parseLine(line.rstrip('\r'))
+            if item is not None:
+                items.append(item)
+        return items
+
+    def _parseLine(self, line):
+        """Parses one line. Provides a message or None"""
+        raise NotImplementedError()
+
+    def _updateRate(self, text):
+        """Picks the rate if the text has it"""
+        rate, previousRate = parseRate(text)
+        if rate is not None:
+            self.rate = rate
+            self.previousRate = previousRate
+
+
+class PylintTextParser(PylintOutputParser):
+
+    """Incremental parser of the pylint text output produced with the
+       '{msg_id}:{line:3d},{column}: {obj}: {msg}' message template"""
+
+    FORMAT = 'text'
+
+    def __init__(self, fileName):
+        PylintOutputParser.__init__(self, fileName)
+        self.__module = ''
+
+    def _parseLine(self, line):
+        """Parses one line. Provides a message or None"""
+        if line.startswith(MODULE_PATTERN):
+            self.__module = line[len(MODULE_PATTERN):]
+            return None
+        if not MSG_REGEXP.match(line):
+            self._updateRate(line)
+            return None
+        colonPos1 = line.find(':')
+        if colonPos1 == -1:
+            return None
+        msgId = line[:colonPos1]
+        colonPos2 = line.find(':', colonPos1 + 1)
+        if colonPos2 == -1:
+            return None
+        position = line[colonPos1 + 1:colonPos2].strip()
+        if not position:
+            return None
+        position = position.split(',')
+        lineNo = int(position[0])
+        column = int(position[1]) if len(position) > 1 else None
+        message = line[colonPos2 + 1:].strip()
+        if message.startswith(':'):
+            message = message[1:].strip()
+        return (self.__module, lineNo, message, msgId, self._fileName,
+                column, None, None, None)
+
+
+class PylintJSONLinesParser(PylintOutputParser):
+
+    """Incremental parser of the JSON lines produced by the warm worker
+       reporter: a message array or a report string per line"""
+
+    FORMAT = 'jsonl'
+
+    def _parseLines(self, lines):
+        """Parses the given complete lines. Provides a list of messages"""
+        # A single decoder call for the whole chunk is a lot cheaper than a
+        # call per line. A broken line makes it fall back to line by line.
+        try:
+            records = json.loads('[' + ','.join([line for line in lines
+                                                 if line]) + ']')
+            items = []
+            append = items.append
+            fileName = self._fileName
+            for record in records:
+                if record.__class__ is list:
+                    if len(record) != MESSAGE_FIELDS or not record[3]:
+                        break
+                    if not record[4]:
+                        # No path, e.g. for a message about the options
+                        record[4] = fileName
+                    append(tuple(record))
+                elif record.__class__ is str:
+                    self._updateRate(record)
+            else:
+                return items
+        except (ValueError, IndexError, TypeError):
+            pass
+        return PylintOutputParser._parseLines(self, lines)
+
+    def _parseLine(self, line):
+        """Parses one line. Provides a message or None"""
+        if not line:
+            return None
+        try:
+            record = json.loads(line)
+        except ValueError:
+            return None
+        if isinstance(record, str):
+            self._updateRate(record)
+            return None
+        if not isinstance(record, list) or len(record) != MESSAGE_FIELDS or \
+           not isinstance(record[3], str) or not record[3]:
+            return None
+        if not record[4]:
+            # The path is not known, e.g. for a message about the options
+            record[4] = self._fileName
+        return tuple(record)
+
+
+def renderTextReport(lines):
+    """Provides the pieces of the pylint text report for the output lines.
+
+    The lines which are not JSON, e.g. of a one-shot text run merged into
+    the batch output, are kept as they are.
+    """
+    module = None
+    for line in lines:
+        if not line.startswith(('[', '"')):
+            yield line + '\n'
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError:
+            yield line + '\n'
+            continue
+        if isinstance(record, str):
+            yield record
+        elif isinstance(record, list) and len(record) == MESSAGE_FIELDS:
+            if record[0] != module:
+                module = record[0]
+                yield MODULE_PATTERN + str(module) + '\n'
+            yield '%s:%3s,%s: %s\n' % (record[3], record[1], record[5],
+                                        record[2])
+        else:
+            yield line + '\n'
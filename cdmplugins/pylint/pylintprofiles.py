@@ -0,0 +1,65 @@
+# -*- coding: utf-8 -*-
+#
+# codimension - graphics python two-way code editor and analyzer
+# Copyright (C) 2019  Sergey Satskiy <sergey.satskiy@gmail.com>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+"""Codimension pylint checker profiles and analysis triggers.
+
+   A profile is a set of pylint command line options added on top of the
+   pylintrc ones. Each trigger, i.e. what an analysis is started by, runs
+   with its own profile.
+"""
+
+
+TRIGGER_RUN = 'run'             # explicit request for the current buffer
+TRIGGER_LIVE = 'live'           # as you type analysis
+TRIGGER_SAVE = 'save'           # a saved file and its dependents
+TRIGGER_PROJECT = 'project'     # a project, a directory or a file
+TRIGGER_CHANGES = 'changes'     # the files changed in git
+TRIGGER_COSTS = 'costs'         # the current buffer with the checkers cost
+
+PROFILE_FAST = 'fast'
+PROFILE_FULL = 'full'
+
+PROFILES = {
+    # No cross module checkers, no costly inference based type checks and
+    # the inference results are limited per a name
+    PROFILE_FAST: ['--disable=similarities,spelling,cyclic-import,'
+                   'no-member,c-extension-no-member',
+                   '--limit-inference-results=10'],
+    # The pylintrc as it is
+    PROFILE_FULL: []}
+
+DEFAULT_TRIGGER_PROFILES = {
+    TRIGGER_RUN: PROFILE_FULL,
+    TRIGGER_LIVE: PROFILE_FAST,
+    TRIGGER_SAVE: PROFILE_FAST,
+    TRIGGER_PROJECT: PROFILE_FULL,
+    TRIGGER_CHANGES: PROFILE_FULL,
+    TRIGGER_COSTS: PROFILE_FULL}
+
+
+def getProfileArgs(profile):
+    """Provides the pylint options of the profile"""
+    return list(PROFILES.get(profile, PROFILES[PROFILE_FULL]))
+
+
+def getTriggerProfile(triggerProfiles, trigger):
+    """Provides the profile for the trigger; the full one if unknown"""
+    profile = triggerProfiles.get(trigger, DEFAULT_TRIGGER_PROFILES.get(
+        trigger, PROFILE_FULL))
+    return profile if profile in PROFILES else PROFILE_FULL
@@ -0,0 +1,348 @@
+# -*- coding: utf-8 -*-
+#
+# codimension - graphics python two-way code editor and analyzer
+# Copyright (C) 2019  Sergey Satskiy <sergey.satskiy@gmail.com>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+"""Codimension pylint raw output storage.
+
+   The raw output is collected in memory while it is small. When it grows
+   over a threshold it is written to a temporary file and only the file
+   name and a sparse index of the line offsets are kept in memory. The
+   temporary file is removed when its RawOutput object goes away.
+"""
+
+
+import os
+import mmap
+import atexit
+import logging
+import tempfile
+from array import array
+from bisect import bisect_right
+
+
+# Every LINE_STEP-th line start offset is indexed
+LINE_STEP = 64
+
+TEMP_PREFIX = 'cdm-pylint-'
+TEMP_SUFFIX = '.out'
+
+# Bytes read at once when the output is copied or searched
+CHUNK_SIZE = 1024 * 1024
+
+# The temporary files which have not been removed yet
+_TEMP_FILES = set()
+
+
+def _removeTempFile(path):
+    """Removes a temporary output file"""
+    _TEMP_FILES.discard(path)
+    try:
+        os.unlink(path)
+    except OSError:
+        pass
+
+
+@atexit.register
+def _removeAllTempFiles():
+    """Removes the temporary files left at the IDE exit"""
+    for path in list(_TEMP_FILES):
+        _removeTempFile(path)
+
+
+def indexLines(data, base, newLines, offsets):
+    """Adds the line start offsets of the data to the sparse index.
+
+    base is the data offset in the output and newLines is the number of
+    the new line characters before it. Provides the updated newLines.
+    """
+    count = data.count(b'\n')
+    if count == 0:
+        return newLines
+    total = newLines + count
+    boundary = (newLines // LINE_STEP + 1) * LINE_STEP
+    position = 0
+    while boundary <= total:
+        # The line number 'boundary' starts after the boundary-th new line
+        while newLines < boundary:
+            position = data.index(b'\n', position) + 1
+            newLines += 1
+        offsets.append(base + position)
+        boundary += LINE_STEP
+    return total
+
+
+def getRawText(output):
+    """Provides the output text whatever way it is stored"""
+    if output is None or isinstance(output, str):
+        return output
+    return output.read()
+
+
+def iterRawLines(output):
+    """Provides the output lines whatever way it is stored"""
+    if isinstance(output, str):
+        yield from output.splitlines()
+        return
+    try:
+        with open(output.path, 'r', encoding='utf-8',
+                  errors='replace') as diskFile:
+            for line in diskFile:
+                yield line.rstrip('\n')
+    except OSError as exc:
+        logging.error('Cannot read pylint output from ' + output.path +
+                      ': ' + str(exc))
+
+
+class RawOutput:
+
+    """Raw output spilled to a temporary file"""
+
+    def __init__(self, path, size, lineCount, offsets):
+        self.path = path
+        self.size = size
+        self.lineCount = lineCount
+        self.offsets = offsets
+
+    def __del__(self):
+        _removeTempFile(self.path)
+
+    def read(self):
+        """Reads the whole output"""
+        try:
+            with open(self.path, 'rb') as diskFile:
+                return diskFile.read().decode('utf-8', errors='replace')
+        except OSError as exc:
+            logging.error('Cannot read pylint output from ' + self.path +
+                          ': ' + str(exc))
+            return ''
+
+    def iterChunks(self):
+        """Provides the output content in chunks of bytes"""
+        try:
+            with open(self.path, 'rb') as diskFile:
+                while True:
+                    chunk = diskFile.read(CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    yield chunk
+        except OSError as exc:
+            logging.error('Cannot read pylint output from ' + self.path +
+                          ': ' + str(exc))
+
+
+class RawOutputWriter:
+
+    """Collects the raw output; spills it to a file when it is big"""
+
+    # Characters kept in memory before the output goes to a file
+    SPILL_THRESHOLD = 256 * 1024
+
+    def __init__(self):
+        self.__parts = []
+        self.__chars = 0
+        self.__file = None
+        self.__canSpill = True
+        self.__size = 0
+        self.__newLines = 0
+        self.__lastByte = b'\n'
+        self.__offsets = array('q', [0])
+
+    def isEmpty(self):
+        """True if nothing has been written"""
+        return self.__chars == 0 and self.__size == 0
+
+    def getSize(self):
+        """Provides the size: characters in memory, bytes in a file"""
+        return self.__size if self.__file is not None else self.__chars
+
+    def write(self, text):
+        """Adds a piece of output"""
+        if not text:
+            return
+        if self.__file is None:
+            self.__parts.append(text)
+            self.__chars += len(text)
+            if self.__chars > self.SPILL_THRESHOLD and self.__canSpill:
+                self.__spill()
+        else:
+            self.__writeBytes(text.encode('utf-8', errors='replace'))
+
+    def writeOutput(self, output):
+        """Adds an output collected by another writer"""
+        if output is None or isinstance(output, str):
+            self.write(output)
+            return
+        if self.__file is None and self.__canSpill:
+            self.__spill()
+        if self.__file is None:
+            self.write(output.read())
+            return
+        for chunk in output.iterChunks():
+            self.__writeBytes(chunk)
+
+    def close(self):
+        """Provides the collected output: a string or a RawOutput"""
+        if self.__file is None:
+            text = ''.join(self.__parts)
+            self.__parts = []
+            return text
+
+        path = self.__file.name
+        try:
+            self.__file.close()
+        except OSError as exc:
+            logging.error('Cannot write pylint output to ' + path + ': ' +
+                          str(exc))
+        self.__file = None
+        lineCount = self.__newLines
+        if self.__lastByte != b'\n':
+            lineCount += 1
+        return RawOutput(path, self.__size, lineCount, self.__offsets)
+
+    def discard(self):
+        """Drops the collected output"""
+        self.__parts = []
+        if self.__file is not None:
+            path = self.__file.name
+            try:
+                self.__file.close()
+            except OSError:
+                pass
+            self.__file = None
+            _removeTempFile(path)
+
+    def __spill(self):
+        """Moves the output from memory to a temporary file"""
+        try:
+            self.__file = tempfile.NamedTemporaryFile(
+                mode='wb', prefix=TEMP_PREFIX, suffix=TEMP_SUFFIX,
+                delete=False)
+        except OSError as exc:
+            logging.error('Cannot create a temporary file for the pylint '
+                          'output; keeping it in memory: ' + str(exc))
+            self.__canSpill = False
+            return
+        _TEMP_FILES.add(self.__file.name)
+        parts = self.__parts
+        self.__parts = []
+        self.__chars = 0
+        for part in parts:
+            self.__writeBytes(part.encode('utf-8', errors='replace'))
+
+    def __writeBytes(self, data):
+        """Writes a piece of encoded output to the file"""
+        self.__newLines = indexLines(data, self.__size, self.__newLines,
+                                     self.__offsets)
+        self.__file.write(data)
+        self.__size += len(data)
+        self.__lastByte = data[-1:]
+
+
+class RawOutputReader:
+
+    """Random access to the output lines; a file is memory mapped"""
+
+    def __init__(self, output):
+        self.__file = None
+        self.__buffer = b''
+        if output is None or isinstance(output, str):
+            self.__buffer = (output or '').encode('utf-8', errors='replace')
+            self.__size = len(self.__buffer)
+            self.__offsets = array('q', [0])
+            newLines = indexLines(self.__buffer, 0, 0, self.__offsets)
+            self.__lineCount = newLines
+            if self.__buffer and not self.__buffer.endswith(b'\n'):
+                self.__lineCount += 1
+            return
+
+        self.__size = output.size
+        self.__offsets = output.offsets
+        self.__lineCount = output.lineCount
+        if self.__size > 0:
+            try:
+                self.__file = open(output.path, 'rb')
+                self.__buffer = mmap.mmap(self.__file.fileno(), 0,
+                                          access=mmap.ACCESS_READ)
+            except (OSError, ValueError) as exc:
+                logging.error('Cannot read pylint output from ' +
+                              output.path + ': ' + str(exc))
+                self.close()
+                self.__size = 0
+                self.__lineCount = 0
+
+    def close(self):
+        """Releases the file"""
+        if isinstance(self.__buffer, mmap.mmap):
+            self.__buffer.close()
+        self.__buffer = b''
+        if self.__file is not None:
+            self.__file.close()
+            self.__file = None
+
+    def getLineCount(self):
+        """Provides the number of lines"""
+        return self.__lineCount
+
+    def getLines(self, first, count):
+        """Provides the text of the lines [first, first + count)"""
+        start = self.__getLineOffset(first)
+        end = self.__getLineOffset(first + count)
+        return self.__buffer[start:end].decode('utf-8', errors='replace')
+
+    def find(self, text, fromLine, caseSensitive=False):
+        """Provides the number of the first line starting from the given
+           one which has the text; -1 if there is none.
+
+        The case insensitive search folds the ASCII letters only.
+        """
+        needle = text.encode('utf-8', errors='replace')
+        if not needle:
+            return -1
+        if not caseSensitive:
+            needle = needle.lower()
+
+        position = self.__getLineOffset(fromLine)
+        while position < self.__size:
+            # The chunks overlap so that the text is not cut
+            end = min(position + CHUNK_SIZE + len(needle) - 1, self.__size)
+            chunk = self.__buffer[position:end]
+            if not caseSensitive:
+                chunk = chunk.lower()
+            index = chunk.find(needle)
+            if index != -1:
+                return self.__getLineNumber(position + index)
+            if end == self.__size:
+                break
+            position += CHUNK_SIZE
+        return -1
+
+    def __getLineOffset(self, line):
+        """Provides the line start offset"""
+        if line >= self.__lineCount:
+            return self.__size
+        block = line // LINE_STEP
+        position = self.__offsets[block]
+        for _ in range(line - block * LINE_STEP):
+            position = self.__buffer.find(b'\n', position) + 1
+        return position
+
+    def __getLineNumber(self, offset):
+        """Provides the number of the line the offset belongs to"""
+        block = bisect_right(self.__offsets, offset) - 1
+        start = self.__offsets[block]
+        return block * LINE_STEP + self.__buffer[start:offset].count(b'\n')
@@ -0,0 +1,199 @@
+# -*- coding: utf-8 -*-
+#
+# codimension - graphics python two-way code editor and analyzer
+# Copyright (C) 2019  Sergey Satskiy <sergey.satskiy@gmail.com>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+"""Codimension pylint results search index.
+
+   A filter is a space separated list of terms; a message must match all
+   of them. A term is one of:
+   id:<msg id or symbol>    e.g. id:W0612, id:W06, id:unused-variable
+   type:<categories>        e.g. type:W, type:we, type:error
+   file:<path words>        e.g. file:foo, file:foo/bar.py, file:pkg.mod
+   <text>                   a message id, a symbol or words of the message
+   A word matches a token if it is the token prefix. The case is ignored.
+"""
+
+
+import re
+from array import array
+from bisect import bisect_left
+from .pylintresultstore import CATEGORIES
+
+
+FIELD_MSGID = 'id'
+FIELD_CATEGORY = 'type'
+FIELD_FILE = 'file'
+FIELD_TEXT = 'text'
+
+FIELD_PREFIXES = {'id:': FIELD_MSGID, 'type:': FIELD_CATEGORY,
+                  'file:': FIELD_FILE}
+
+TOKEN_REGEXP = re.compile(r'\w+')
+
+
+def parseQuery(text):
+    """Provides a list of (field, value) for the filter text"""
+    terms = []
+    for term in text.split():
+        field = FIELD_TEXT
+        for prefix, prefixField in FIELD_PREFIXES.items():
+            if term.lower().startswith(prefix):
+                field = prefixField
+                term = term[len(prefix):]
+                break
+        if term:
+            terms.append((field, term.lower()))
+    return terms
+
+
+def getWords(text):
+    """Provides the lower case words of a text"""
+    return TOKEN_REGEXP.findall(text.lower())
+
+
+class TokenIndex:
+
+    """Maps tokens to the sorted arrays of the store rows"""
+
+    def __init__(self):
+        self.__postings = {}
+        self.__sortedTokens = None
+
+    def add(self, token, row):
+        """Adds a row to the token posting"""
+        posting = self.__postings.get(token, None)
+        if posting is None:
+            posting = self.__postings[token] = array('l')
+            self.__sortedTokens = None
+        if not posting or posting[-1] != row:
+            posting.append(row)
+
+    def getPrefixed(self, prefix):
+        """Provides the set of rows of all the tokens with the prefix"""
+        if self.__sortedTokens is None:
+            self.__sortedTokens = sorted(self.__postings.keys())
+        tokens = self.__sortedTokens
+        rows = set()
+        position = bisect_left(tokens, prefix)
+        while position < len(tokens) and tokens[position].startswith(prefix):
+            rows.update(self.__postings[tokens[position]])
+            position += 1
+        return rows
+
+
+class PylintResultIndex:
+
+    """Inverted indexes over the store messages.
+
+    The messages are indexed when the first search is made; the messages
+    added to the store later are indexed on the next search.
+    """
+
+    def __init__(self, store):
+        self.__store = store
+        self.__indexed = 0
+
+        self.__msgIds = TokenIndex()        # lower case msg ids and symbols
+        self.__categories = {category: array('l') for category in CATEGORIES}
+        self.__files = TokenIndex()         # path and module words
+        self.__words = TokenIndex()         # message words
+        self.__fileWords = {}               # (file, module) -> words
+
+    def search(self, text):
+        """Provides the set of the matching rows; None if no filter"""
+        terms = parseQuery(text)
+        if not terms:
+            return None
+        self.__update()
+
+        matches = []
+        for field, value in terms:
+            if field == FIELD_MSGID:
+                rows = self.__msgIds.getPrefixed(value)
+            elif field == FIELD_CATEGORY:
+                rows = self.__searchCategory(value)
+            elif field == FIELD_FILE:
+                rows = self.__searchWords(self.__files, value)
+            else:
+                rows = self.__msgIds.getPrefixed(value)
+                rows.update(self.__searchWords(self.__words, value))
+            if not rows:
+                return set()
+            matches.append(rows)
+
+        # Intersect starting from the smallest one
+        matches.sort(key=len)
+        result = set(matches[0])
+        for rows in matches[1:]:
+            result.intersection_update(rows)
+            if not result:
+                break
+        return result
+
+    def __searchCategory(self, value):
+        """Provides the rows of the categories"""
+        letters = value.upper()
+        if any(letter not in CATEGORIES for letter in letters):
+            # A word like 'error' or 'warnings'
+            letters = letters[0]
+        rows = set()
+        for letter in letters:
+            rows.update(self.__categories.get(letter, ()))
+        return rows
+
+    @staticmethod
+    def __searchWords(index, value):
+        """Provides the rows which have all the words as token prefixes"""
+        result = None
+        for word in getWords(value):
+            rows = index.getPrefixed(word)
+            if result is None:
+                result = rows
+            else:
+                result.intersection_update(rows)
+            if not result:
+                return set()
+        return result if result is not None else set()
+
+    def __update(self):
+        """Indexes the messages added to the store since the last search"""
+        store = self.__store
+        for row in range(self.__indexed, len(store)):
+            msgId = store.msgIds[row]
+            self.__msgIds.add(msgId.lower(), row)
+            symbol = store.symbols[row]
+            if symbol:
+                self.__msgIds.add(symbol.lower(), row)
+            self.__categories[msgId[0]].append(row)
+
+            for word in self.__getFileWords(store.fileNames[row],
+                                            store.modules[row]):
+                self.__files.add(word, row)
+            for word in getWords(store.texts[row]):
+                self.__words.add(word, row)
+        self.__indexed = len(store)
+
+    def __getFileWords(self, fileName, module):
+        """Provides the words of the file path and the module name"""
+        key = (fileName, module)
+        words = self.__fileWords.get(key, None)
+        if words is None:
+            words = set(getWords(fileName or ''))
+            words.update(getWords(module or ''))
+            words = self.__fileWords[key] = sorted(words)
+        return words
@@ -0,0 +1,503 @@
+# -*- coding: utf-8 -*-
+#
+# codimension - graphics python two-way code editor and analyzer
+# Copyright (C) 2019  Sergey Satskiy <sergey.satskiy@gmail.com>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+"""Codimension pylint results model.
+
+   The tree is: group [-> group] -> message. Only the group nodes are
+   objects; a message is a row number in the results store. The message
+   rows of a group are handed to the view in batches when the group is
+   expanded or scrolled to its end.
+"""
+
+
+import os.path
+from array import array
+from ui.qt import Qt, QAbstractItemModel, QModelIndex
+from .pylintresultstore import (PylintResultStore, CATEGORIES,
+                                getResultStore)
+from .pylintresultindex import PylintResultIndex
+from .pylintresultsort import (PylintSortKeys, sortRows, groupRows,
+                               getGroupOrder, SORT_BY_LINE, SORT_BY_MSGID,
+                               SORT_BY_MESSAGE, GROUP_BY_CATEGORY,
+                               GROUP_BY_MSGID, GROUP_BY_FILE)
+
+
+CATEGORY_TITLES = {'E': 'Errors', 'W': 'Warnings',
+                   'R': 'Refactoring', 'C': 'Cosmetics'}
+
+HEADER_LABELS = ['Message type / line', 'id', 'Message']
+
+
+def getCountText(count):
+    """Provides the number of messages text"""
+    suffix = '' if count == 1 else 's'
+    return '(' + str(count) + ' message' + suffix + ')'
+
+
+class ResultGroupNode:
+
+    """A group node: a file, a category or a message id"""
+
+    __slots__ = ('parent', 'row', 'title', 'level', 'key', 'fileName',
+                 'children', 'rows', 'fetched')
+
+    def __init__(self, parent, row, title, level=None, key=None):
+        self.parent = parent
+        self.row = row                  # the row within the parent
+        self.title = title
+        self.level = level              # what the messages are grouped by
+        self.key = key                  # the group key value
+        self.fileName = key if level == GROUP_BY_FILE else None
+        self.children = []              # group nodes
+        self.rows = array('l')          # store rows of the messages
+        self.fetched = 0                # rows already given to the view
+
+    def getCount(self):
+        """Provides the number of messages in the group"""
+        if self.children:
+            return sum(child.getCount() for child in self.children)
+        return len(self.rows)
+
+
+class PylintResultModel(QAbstractItemModel):
+
+    """Pylint results model over a columnar store"""
+
+    # Number of message rows given to the view at once
+    FETCH_BATCH = 500
+
+    # Number of the sort keys remembered when the sort column changes
+    MAX_SORT_KEYS = 3
+
+    # The sort key of a view column
+    SORT_COLUMNS = (SORT_BY_LINE, SORT_BY_MSGID, SORT_BY_MESSAGE)
+
+    def __init__(self, parent=None):
+        QAbstractItemModel.__init__(self, parent)
+        self.__store = PylintResultStore()
+        self.__sortKeys = PylintSortKeys(self.__store)
+        self.__index = PylintResultIndex(self.__store)
+        self.__root = ResultGroupNode(None, 0, '')
+        self.__multiFile = False
+        self.__rootDir = None
+        self.__headers = list(HEADER_LABELS)
+        self.__totalMessages = 0
+
+        # The filter text and the set of the matching store rows;
+        # None if there is no filter
+        self.__filterText = ''
+        self.__filterRows = None
+
+        # None stands for the default: by file for many files,
+        # by category otherwise
+        self.__grouping = None
+        # [(sort key name, descending)]; the most significant key first
+        self.__sortSpec = []
+
+    def getStore(self):
+        """Provides the results store"""
+        return self.__store
+
+    def isMultiFile(self):
+        """True if the results are for many files"""
+        return self.__multiFile
+
+    def clear(self):
+        """Removes all the messages"""
+        self.beginResetModel()
+        self.__store = PylintResultStore()
+        self.__sortKeys = PylintSortKeys(self.__store)
+        self.__index = PylintResultIndex(self.__store)
+        self.__root = ResultGroupNode(None, 0, '')
+        self.__multiFile = False
+        self.__rootDir = None
+        self.__filterRows = None
+        self.endResetModel()
+
+    def setResults(self, results):
+        """Replaces the messages with the results ones"""
+        self.beginResetModel()
+        self.__store = getResultStore(results)
+        self.__sortKeys = PylintSortKeys(self.__store)
+        self.__index = PylintResultIndex(self.__store)
+        self.__multiFile = 'Files' in results
+        self.__rootDir = results['FileName']
+        self.__filterRows = self.__index.search(self.__filterText)
+        self.__buildTree()
+        self.endResetModel()
+        self.__updateHeader()
+
+    def setFilter(self, text):
+        """Shows only the messages matching the filter text"""
+        self.__filterText = text
+        filterRows = self.__index.search(text)
+        if filterRows is None and self.__filterRows is None:
+            return
+        self.__filterRows = filterRows
+        self.beginResetModel()
+        self.__buildTree()
+        self.endResetModel()
+        self.__updateHeader()
+
+    def getShownCount(self):
+        """Provides the number of messages passed the filter"""
+        if self.__filterRows is None:
+            return len(self.__store)
+        return len(self.__filterRows)
+
+    def getGrouping(self):
+        """Provides what the messages are grouped by"""
+        return self.__getLevels()[0]
+
+    def setGrouping(self, grouping):
+        """Regroups the messages"""
+        if grouping not in (GROUP_BY_CATEGORY, GROUP_BY_MSGID,
+                            GROUP_BY_FILE):
+            raise ValueError('Unknown pylint results grouping: ' +
+                             str(grouping))
+        self.__grouping = grouping
+        self.beginResetModel()
+        self.__buildTree()
+        self.endResetModel()
+
+    def getSortSpec(self):
+        """Provides the [(sort key name, descending)] list"""
+        return list(self.__sortSpec)
+
+    def __getLevels(self):
+        """Provides the group levels from the top"""
+        grouping = self.__grouping
+        if grouping is None:
+            grouping = GROUP_BY_FILE if self.__multiFile \
+                else GROUP_BY_CATEGORY
+        if grouping == GROUP_BY_FILE:
+            if not self.__multiFile:
+                # A single file group makes no sense
+                return [GROUP_BY_CATEGORY]
+            return [GROUP_BY_FILE, GROUP_BY_CATEGORY]
+        return [grouping]
+
+    def __buildTree(self):
+        """Builds the groups for the store messages passed the filter"""
+        self.__root = ResultGroupNode(None, 0, '')
+        if self.__filterRows is None:
+            rows = range(len(self.__store))
+        else:
+            rows = sorted(self.__filterRows)
+        self.__buildGroups(self.__root, rows, self.__getLevels())
+
+    def __buildGroups(self, parentNode, rows, levels):
+        """Creates the group nodes for the given store rows"""
+        level = levels[0]
+        for key, keyRows in groupRows(rows, self.__sortKeys, level):
+            node = ResultGroupNode(parentNode, len(parentNode.children),
+                                   self.__getGroupTitle(level, key, keyRows),
+                                   level, key)
+            if len(levels) > 1:
+                self.__buildGroups(node, keyRows, levels[1:])
+            else:
+                node.rows = keyRows
+                if self.__sortSpec:
+                    sortRows(node.rows, self.__sortKeys, self.__sortSpec)
+            parentNode.children.append(node)
+
+    def __getGroupTitle(self, level, key, rows):
+        """Provides the group node title"""
+        if level == GROUP_BY_CATEGORY:
+            return CATEGORY_TITLES[CATEGORIES[key]]
+        if level == GROUP_BY_FILE:
+            return os.path.relpath(key, self.__rootDir)
+        symbol = self.__store.symbols[rows[0]]
+        if symbol:
+            return key + ' (' + symbol + ')'
+        return key
+
+    def appendMessages(self, messages):
+        """Adds a batch of a single file messages"""
+        newRows = self.__store.append(messages)
+        if self.__filterRows is not None:
+            self.__filterRows = self.__index.search(self.__filterText)
+            newRows = [row for row in newRows if row in self.__filterRows]
+        level = self.__getLevels()[0]
+        changed = []
+        for key, keyRows in groupRows(newRows, self.__sortKeys, level):
+            node = self.__getTopLevelNode(level, key, keyRows)
+            node.rows.extend(keyRows)
+            changed.append(node)
+
+        if self.__sortSpec:
+            self.__sortMessages(changed)
+
+        for node in changed:
+            parentIndex = self.createIndex(node.row, 0, self.__root)
+            target = min(len(node.rows), max(node.fetched, self.FETCH_BATCH))
+            if target > node.fetched:
+                self.beginInsertRows(parentIndex, node.fetched, target - 1)
+                node.fetched = target
+                self.endInsertRows()
+            countIndex = self.createIndex(node.row, 2, self.__root)
+            self.dataChanged.emit(countIndex, countIndex)
+
+    def __getTopLevelNode(self, level, key, rows):
+        """Provides a top level group node; creates it if needed"""
+        children = self.__root.children
+        position = 0
+        for node in children:
+            if node.key == key:
+                return node
+            if getGroupOrder(level, node.key) < getGroupOrder(level, key):
+                position += 1
+
+        self.beginInsertRows(QModelIndex(), position, position)
+        node = ResultGroupNode(self.__root, position,
+                               self.__getGroupTitle(level, key, rows),
+                               level, key)
+        children.insert(position, node)
+        for row in range(position + 1, len(children)):
+            children[row].row = row
+        self.endInsertRows()
+        return node
+
+    def sort(self, column, order=Qt.AscendingOrder):
+        """Sorts the messages within the groups.
+
+        The previous sort keys become the secondary ones. A negative column
+        restores the order the messages came in.
+        """
+        if column < 0 or column >= len(self.SORT_COLUMNS):
+            self.__sortSpec = []
+        else:
+            name = self.SORT_COLUMNS[column]
+            self.__sortSpec = [(name, order == Qt.DescendingOrder)] + \
+                [item for item in self.__sortSpec if item[0] != name]
+            del self.__sortSpec[self.MAX_SORT_KEYS:]
+        self.__sortMessages(self.__getLeafNodes())
+
+    def __getLeafNodes(self):
+        """Provides the groups which have messages"""
+        leaves = []
+        nodes = list(self.__root.children)
+        while nodes:
+            node = nodes.pop()
+            if node.children:
+                nodes.extend(node.children)
+            else:
+                leaves.append(node)
+        return leaves
+
+    def __sortMessages(self, nodes):
+        """Sorts the messages of the given groups"""
+        self.layoutAboutToBeChanged.emit()
+
+        # The persistent message indexes follow their messages
+        persistent = []
+        for index in self.persistentIndexList():
+            parentNode = index.internalPointer()
+            if index.isValid() and not parentNode.children:
+                persistent.append((index, parentNode,
+                                   parentNode.rows[index.row()]))
+
+        for node in nodes:
+            sortRows(node.rows, self.__sortKeys, self.__sortSpec)
+
+        positions = {}
+        for index, node, row in persistent:
+            nodePositions = positions.get(id(node), None)
+            if nodePositions is None:
+                nodePositions = {value: position
+                                 for position, value in enumerate(node.rows)}
+                positions[id(node)] = nodePositions
+            position = nodePositions[row]
+            if position < node.fetched:
+                self.changePersistentIndex(
+                    index, self.createIndex(position, index.column(), node))
+            else:
+                self.changePersistentIndex(index, QModelIndex())
+
+        self.layoutChanged.emit()
+
+    def setTotalMessages(self, count):
+        """Shows the total number of messages in the header"""
+        self.__totalMessages = count
+        self.__updateHeader()
+
+    def __updateHeader(self):
+        """Updates the message column header"""
+        text = 'Message (total messages: ' + str(self.__totalMessages)
+        if self.__filterRows is not None:
+            text += ', shown: ' + str(self.getShownCount())
+        self.__headers[2] = text + ')'
+        self.headerDataChanged.emit(Qt.Horizontal, 2, 2)
+
+    def getRow(self, index):
+        """Provides the store row for a message index or None"""
+        if not index.isValid():
+            return None
+        parentNode = index.internalPointer()
+        if parentNode.children:
+            return None
+        return parentNode.rows[index.row()]
+
+    def getGroup(self, index):
+        """Provides the group node for a group index or None"""
+        if not index.isValid():
+            return None
+        return self.__getNode(index)
+
+    def getSample(self, limit):
+        """Provides (depth, [column texts]) for the groups and
+           up to the limit messages evenly picked from the store"""
+        sample = []
+        groups = list(self.__root.children)
+        while groups:
+            node = groups.pop()
+            depth = 2 if node.parent is not self.__root else 1
+            sample.append((depth, [node.title, '',
+                                   getCountText(node.getCount())]))
+            groups.extend(node.children)
+
+        depth = 3 if self.__multiFile else 2
+        total = len(self.__store)
+        step = max(1, -(-total // limit)) if limit > 0 else total + 1
+        for row in range(0, total, step):
+            sample.append((depth, [str(self.__store.lines[row]),
+                                   self.__store.msgIds[row],
+                                   self.__store.texts[row]]))
+        return sample
+
+    def __getNode(self, index):
+        """Provides the group node for the index; None for a message"""
+        if not index.isValid():
+            return self.__root
+        parentNode = index.internalPointer()
+        if parentNode.children:
+            return parentNode.children[index.row()]
+        return None
+
+    def columnCount(self, parent=QModelIndex()):
+        """Provides the number of columns"""
+        return len(HEADER_LABELS)
+
+    def rowCount(self, parent=QModelIndex()):
+        """Provides the number of rows already given to the view"""
+        if parent.column() > 0:
+            return 0
+        node = self.__getNode(parent)
+        if node is None:
+            return 0
+        if node.children:
+            return len(node.children)
+        return node.fetched
+
+    def hasChildren(self, parent=QModelIndex()):
+        """True if there are rows, including the not fetched ones"""
+        if parent.column() > 0:
+            return False
+        node = self.__getNode(parent)
+        if node is None:
+            return False
+        return bool(node.children) or len(node.rows) > 0
+
+    def canFetchMore(self, parent):
+        """True if there are message rows not given to the view"""
+        node = self.__getNode(parent)
+        if node is None or node.children:
+            return False
+        return node.fetched < len(node.rows)
+
+    def fetchMore(self, parent):
+        """Gives the next batch of the message rows to the view"""
+        node = self.__getNode(parent)
+        if node is None or node.children:
+            return
+        count = min(self.FETCH_BATCH, len(node.rows) - node.fetched)
+        if count > 0:
+            self.beginInsertRows(parent, node.fetched,
+                                 node.fetched + count - 1)
+            node.fetched += count
+            self.endInsertRows()
+
+    def index(self, row, column, parent=QModelIndex()):
+        """Creates an index"""
+        if not self.hasIndex(row, column, parent):
+            return QModelIndex()
+        node = self.__getNode(parent)
+        if node is None:
+            return QModelIndex()
+        return self.createIndex(row, column, node)
+
+    def parent(self, index=None):
+        """Provides the parent index"""
+        if index is None:
+            return QAbstractItemModel.parent(self)
+        if not index.isValid():
+            return QModelIndex()
+        parentNode = index.internalPointer()
+        if parentNode is self.__root:
+            return QModelIndex()
+        return self.createIndex(parentNode.row, 0, parentNode.parent)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        """Provides the header texts"""
+        if orientation == Qt.Horizontal and role == Qt.DisplayRole:
+            return self.__headers[section]
+        return None
+
+    def data(self, index, role=Qt.DisplayRole):
+        """Provides the cell data"""
+        if not index.isValid():
+            return None
+        if role not in (Qt.DisplayRole, Qt.ToolTipRole):
+            return None
+
+        column = index.column()
+        parentNode = index.internalPointer()
+        if parentNode.children:
+            node = parentNode.children[index.row()]
+            if role == Qt.ToolTipRole:
+                return node.fileName
+            if column == 0:
+                return node.title
+            if column == 2:
+                return getCountText(node.getCount())
+            return None
+
+        row = parentNode.rows[index.row()]
+        store = self.__store
+        if role == Qt.DisplayRole:
+            if column == 0:
+                return str(store.lines[row])
+            if column == 1:
+                return store.msgIds[row]
+            return store.texts[row]
+
+        # column, symbol and confidence are optional
+        if column == 0:
+            messageColumn = store.getColumn(row)
+            if messageColumn is not None:
+                return 'line ' + str(store.lines[row]) + \
+                       ', column ' + str(messageColumn)
+        elif column == 1:
+            symbol = store.symbols[row]
+            if symbol is not None:
+                confidence = store.confidences[row]
+                if confidence is not None:
+                    symbol += ' (confidence: ' + confidence + ')'
+                return symbol
+        return None
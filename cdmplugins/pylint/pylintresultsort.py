@@ -0,0 +1,123 @@
+# -*- coding: utf-8 -*-
+#
+# codimension - graphics python two-way code editor and analyzer
+# Copyright (C) 2019  Sergey Satskiy <sergey.satskiy@gmail.com>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+"""Codimension pylint results sorting and grouping.
+
+   The sort keys are typed values computed once per message and kept as
+   columns parallel to the store ones, so a comparison is a plain python
+   value comparison. A sort by several keys is a sequence of stable sorts
+   starting from the least significant key.
+"""
+
+
+from array import array
+from .pylintresultstore import CATEGORIES
+
+
+SORT_BY_CATEGORY = 'category'
+SORT_BY_LINE = 'line'
+SORT_BY_MSGID = 'msgId'
+SORT_BY_SYMBOL = 'symbol'
+SORT_BY_FILE = 'file'
+SORT_BY_MESSAGE = 'message'
+
+GROUP_BY_CATEGORY = SORT_BY_CATEGORY
+GROUP_BY_MSGID = SORT_BY_MSGID
+GROUP_BY_FILE = SORT_BY_FILE
+
+
+def getGroupOrder(grouping, key):
+    """Provides the group sort key; message ids go by category first"""
+    if grouping == GROUP_BY_MSGID:
+        return CATEGORIES.index(key[0]), key
+    return key
+
+
+class PylintSortKeys:
+
+    """Typed sort keys of the store messages"""
+
+    def __init__(self, store):
+        self.__store = store
+        self.__keys = {}
+
+    def get(self, name):
+        """Provides the key column; brings it up to date if needed"""
+        keys = self.__keys.get(name, None)
+        if keys is None:
+            keys = self.__keys[name] = self.__makeColumn(name)
+        first = len(keys)
+        if first < len(self.__store):
+            keys.extend(self.__makeKeys(name, first))
+        return keys
+
+    def __makeColumn(self, name):
+        """Provides an empty key column"""
+        if name in (SORT_BY_CATEGORY, SORT_BY_LINE):
+            return array('i')
+        if name in (SORT_BY_MSGID, SORT_BY_SYMBOL,
+                    SORT_BY_FILE, SORT_BY_MESSAGE):
+            return []
+        raise KeyError('Unknown pylint results sort key: ' + name)
+
+    def __makeKeys(self, name, first):
+        """Provides the keys for the store rows starting from the first"""
+        store = self.__store
+        if name == SORT_BY_CATEGORY:
+            return [CATEGORIES.index(msgId[0])
+                    for msgId in store.msgIds[first:]]
+        if name == SORT_BY_LINE:
+            return store.lines[first:]
+        if name == SORT_BY_MSGID:
+            return store.msgIds[first:]
+        if name == SORT_BY_SYMBOL:
+            return [symbol or '' for symbol in store.symbols[first:]]
+        if name == SORT_BY_FILE:
+            return store.fileNames[first:]
+        return [text.casefold() for text in store.texts[first:]]
+
+
+def sortRows(rows, sortKeys, spec):
+    """Sorts the rows in place.
+
+    The spec is a list of (key name, descending) with the most significant
+    key first. An empty spec means the order the messages came in.
+    """
+    ordered = sorted(rows)
+    for name, descending in reversed(spec):
+        ordered.sort(key=sortKeys.get(name).__getitem__, reverse=descending)
+    rows[:] = array('l', ordered)
+
+
+def groupRows(rows, sortKeys, name):
+    """Splits the rows by the key value.
+
+    Provides a list of (key value, rows) in the order of the groups.
+    """
+    keys = sortKeys.get(name)
+    buckets = {}
+    for row in rows:
+        key = keys[row]
+        bucket = buckets.get(key, None)
+        if bucket is None:
+            bucket = buckets[key] = array('l')
+        bucket.append(row)
+
+    return sorted(buckets.items(),
+                  key=lambda item: getGroupOrder(name, item[0]))
@@ -0,0 +1,215 @@
+# -*- coding: utf-8 -*-
+#
+# codimension - graphics python two-way code editor and analyzer
+# Copyright (C) 2019  Sergey Satskiy <sergey.satskiy@gmail.com>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+"""Codimension pylint results columnar store.
+
+   The messages are kept column by column rather than as a tuple per
+   message. A message is addressed by its row number in the store.
+
+   The string columns hold integer ids of the strings interned in a
+   per-store table. A message text is split into a template and the
+   variable parts, i.e. quoted names and numbers, so e.g. all the
+   'Unused variable' messages share a template.
+"""
+
+
+import re
+from array import array
+
+
+# The categories in the order they are shown
+CATEGORIES = 'EWRC'
+
+# Stands for None in the integer columns
+NO_VALUE = -1
+
+# The message text parts which are usually the template arguments
+ARGUMENT_REGEXP = re.compile(r"('[^']*'|\"[^\"]*\"|[0-9]+(?:\.[0-9]+)?)")
+ARGUMENT_MARK = '\0'
+
+
+def getResultStore(results):
+    """Provides the store for the results dictionary messages"""
+    store = results.get('Messages', None)
+    if store is None:
+        store = PylintResultStore.fromResults(results)
+    return store
+
+
+def getMessageCount(results):
+    """Provides the number of messages in the results dictionary"""
+    store = results.get('Messages', None)
+    if store is not None:
+        return len(store)
+    return sum(len(results.get(category, ())) for category in CATEGORIES)
+
+
+class StringTable:
+
+    """Interned strings; the id 0 stands for None"""
+
+    def __init__(self):
+        self.values = [None]
+        self.__ids = {None: 0}
+
+    def getId(self, value):
+        """Provides the string id; adds the string if needed"""
+        valueId = self.__ids.get(value, None)
+        if valueId is None:
+            valueId = self.__ids[value] = len(self.values)
+            self.values.append(value)
+        return valueId
+
+
+class InternedColumn:
+
+    """Read only sequence of the interned strings of a column"""
+
+    def __init__(self, ids, table):
+        self.__ids = ids
+        self.__values = table.values
+
+    def __len__(self):
+        return len(self.__ids)
+
+    def __getitem__(self, item):
+        if isinstance(item, slice):
+            values = self.__values
+            return [values[valueId] for valueId in self.__ids[item]]
+        return self.__values[self.__ids[item]]
+
+
+class TextColumn:
+
+    """Read only sequence of the message texts"""
+
+    def __init__(self, templateIds, argumentIds, table):
+        self.__templateIds = templateIds
+        self.__argumentIds = argumentIds
+        self.__values = table.values
+
+    def __len__(self):
+        return len(self.__templateIds)
+
+    def __getitem__(self, item):
+        if isinstance(item, slice):
+            return [self.__getText(row)
+                    for row in range(*item.indices(len(self)))]
+        return self.__getText(item)
+
+    def __getText(self, row):
+        """Restores the message text"""
+        template = self.__values[self.__templateIds[row]]
+        arguments = self.__values[self.__argumentIds[row]]
+        if arguments is None:
+            return template
+        parts = template.split(ARGUMENT_MARK)
+        arguments = arguments.split(ARGUMENT_MARK)
+        text = [parts[0]]
+        for index, argument in enumerate(arguments):
+            text.append(argument)
+            text.append(parts[index + 1])
+        return ''.join(text)
+
+
+class PylintResultStore:
+
+    """Compact columnar storage of the pylint messages"""
+
+    def __init__(self):
+        self.__strings = StringTable()
+        self.__moduleIds = array('i')
+        self.__templateIds = array('i')
+        self.__argumentIds = array('i')
+        self.__msgIdIds = array('i')
+        self.__fileIds = array('i')
+        self.__symbolIds = array('i')
+        self.__confidenceIds = array('i')
+
+        self.lines = array('i')
+        self.columns = array('i')
+        self.endLines = array('i')
+
+        strings = self.__strings
+        self.modules = InternedColumn(self.__moduleIds, strings)
+        self.texts = TextColumn(self.__templateIds, self.__argumentIds,
+                                strings)
+        self.msgIds = InternedColumn(self.__msgIdIds, strings)
+        self.fileNames = InternedColumn(self.__fileIds, strings)
+        self.symbols = InternedColumn(self.__symbolIds, strings)
+        self.confidences = InternedColumn(self.__confidenceIds, strings)
+
+    def __len__(self):
+        return len(self.__msgIdIds)
+
+    @classmethod
+    def fromResults(cls, results):
+        """Creates a store for the results dictionary messages"""
+        store = cls()
+        for category in CATEGORIES:
+            store.append(results.get(category, []))
+        return store
+
+    def append(self, messages):
+        """Adds the parsed message tuples. Provides the new rows range"""
+        first = len(self.__msgIdIds)
+        getId = self.__strings.getId
+        for message in messages:
+            self.__moduleIds.append(getId(message[0]))
+            self.lines.append(message[1])
+            # The even parts are the template ones, the odd are arguments
+            parts = ARGUMENT_REGEXP.split(message[2])
+            if len(parts) > 1:
+                self.__templateIds.append(getId(ARGUMENT_MARK.join(
+                    parts[::2])))
+                self.__argumentIds.append(getId(ARGUMENT_MARK.join(
+                    parts[1::2])))
+            else:
+                self.__templateIds.append(getId(message[2]))
+                self.__argumentIds.append(0)
+            self.__msgIdIds.append(getId(message[3]))
+            self.__fileIds.append(getId(message[4]))
+            self.columns.append(NO_VALUE if message[5] is None
+                                else message[5])
+            self.endLines.append(NO_VALUE if message[6] is None
+                                 else message[6])
+            self.__symbolIds.append(getId(message[7]))
+            self.__confidenceIds.append(getId(message[8]))
+        return range(first, len(self.__msgIdIds))
+
+    def getCategory(self, row):
+        """Provides the message category: one of the CATEGORIES"""
+        return self.msgIds[row][0]
+
+    def getColumn(self, row):
+        """Provides the message column or None"""
+        column = self.columns[row]
+        return None if column == NO_VALUE else column
+
+    def getEndLine(self, row):
+        """Provides the message end line or None"""
+        endLine = self.endLines[row]
+        return None if endLine == NO_VALUE else endLine
+
+    def getMessage(self, row):
+        """Provides the message as a parsed message tuple"""
+        return (self.modules[row], self.lines[row], self.texts[row],
+                self.msgIds[row], self.fileNames[row], self.getColumn(row),
+                self.getEndLine(row), self.symbols[row],
+                self.confidences[row])
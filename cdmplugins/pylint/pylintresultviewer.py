@@ -21,39 +21,28 @@
 
 
 import os.path
+import time
 from ui.qt import (QWidget, QLabel, QPalette, QSizePolicy, QAction, Qt,
                    QHBoxLayout, QVBoxLayout, QToolBar, QSize, QIcon,
-                   QTreeWidget, QTreeWidgetItem, QHeaderView, QFrame,
-                   QApplication, QMenu)
+                   QTreeView, QFrame, QApplication, QMenu, QModelIndex,
+                   QLineEdit, QSplitter)
 from ui.itemdelegates import NoOutlineHeightDelegate
 from ui.labels import HeaderFitPathLabel, HeaderLabel
 from ui.spacers import ToolBarExpandingSpacer
 from utils.pixmapcache import getIcon
 from utils.globals import GlobalData
 from .pylintoutput import PylintStdoutStderrViewer
+from .pylintresultmodel import PylintResultModel
+from .pylintcostviewer import PylintCostViewer
+from .pylintresultstore import getMessageCount
+from .pylintresultsort import GROUP_BY_CATEGORY, GROUP_BY_MSGID, GROUP_BY_FILE
+from .pylintprofiles import PROFILE_FAST
+from .pylintmetrics import addTiming, formatTimings
 
 
-class MessageTableItem(QTreeWidgetItem):
-
-    """One message item"""
-
-    def __init__(self, items):
-        QTreeWidgetItem.__init__(self, items)
-
-    def __lt__(self, other):
-        """Custom comparison"""
-        sortColumn = self.treeWidget().sortColumn()
-        if sortColumn == 0:
-            return int(self.text(sortColumn)) < int(other.text(sortColumn))
-        return self.text(sortColumn) < other.text(sortColumn)
-
-
-class MessageTypeTableItem(QTreeWidgetItem):
-
-    """One message type item"""
-
-    def __init__(self, items):
-        QTreeWidgetItem.__init__(self, items)
+# Number of the messages the column widths are calculated for
+COLUMN_SIZE_SAMPLE = 200
+COLUMN_MARGIN = 12
 
 
 class PylintResultViewer(QWidget):
@@ -64,6 +53,10 @@ class PylintResultViewer(QWidget):
         QWidget.__init__(self, parent)
 
         self.__results = None
+        # The file name and the message count while the analysis is in
+        # progress and the results come in batches
+        self.__progressive = None
+        self.__model = PylintResultModel(self)
         self.__ide = ide
         self.__pluginHomeDir = pluginHomeDir
 
@@ -102,15 +95,31 @@ class PylintResultViewer(QWidget):
         self.toolbar.addWidget(ToolBarExpandingSpacer(self.toolbar))
         self.toolbar.addAction(self.clearButton)
 
-        self.__resultsTree = QTreeWidget(self)
+        self.__resultsTree = QTreeView(self)
         self.__resultsTree.setAlternatingRowColors(True)
         self.__resultsTree.setRootIsDecorated(True)
         self.__resultsTree.setItemsExpandable(True)
         self.__resultsTree.setUniformRowHeights(True)
         self.__resultsTree.setItemDelegate(NoOutlineHeightDelegate(4))
-        headerLabels = ['Message type / line', 'id', 'Message']
-        self.__resultsTree.setHeaderLabels(headerLabels)
-        self.__resultsTree.itemActivated.connect(self.__resultActivated)
+        self.__resultsTree.setModel(self.__model)
+        # No sorting till a column header is clicked
+        self.__resultsTree.header().setSortIndicator(-1, Qt.AscendingOrder)
+        self.__resultsTree.setSortingEnabled(True)
+        self.__resultsTree.activated.connect(self.__resultActivated)
+        self.__resultsTree.expanded.connect(self.__groupExpanded)
+        self.__resultsTree.setContextMenuPolicy(Qt.CustomContextMenu)
+        self.__resultsTree.customContextMenuRequested.connect(
+            self.__showTreeContextMenu)
+        self.__model.rowsInserted.connect(self.__rowsInserted)
+
+        # The checkers cost of a profiling run is shown next to the messages
+        self.__costViewer = PylintCostViewer(self)
+        self.__costViewer.setVisible(False)
+        self.__splitter = QSplitter(Qt.Horizontal, self)
+        self.__splitter.addWidget(self.__resultsTree)
+        self.__splitter.addWidget(self.__costViewer)
+        self.__splitter.setStretchFactor(0, 3)
+        self.__splitter.setStretchFactor(1, 1)
 
         self.__fileLabel = HeaderFitPathLabel(None, self)
         self.__fileLabel.setAlignment(Qt.AlignLeft)
@@ -122,21 +131,35 @@ class PylintResultViewer(QWidget):
         self.__fileLabel.customContextMenuRequested.connect(
             self.showPathLabelContextMenu)
 
+        self.__filterEdit = QLineEdit(self)
+        self.__filterEdit.setClearButtonEnabled(True)
+        self.__filterEdit.setPlaceholderText(
+            'Filter, e.g. W0612 file:foo unused')
+        self.__filterEdit.setToolTip(
+            'Show only the messages matching all the words:\n'
+            'id:<msg id or symbol>, type:<E, W, R, C>, file:<path words>\n'
+            'or a message id, a symbol or the message text words')
+        self.__filterEdit.textChanged.connect(self.__filterChanged)
+
         self.__rateLabel = HeaderLabel()
         self.__rateLabel.setToolTip('pylint analysis rate out of 10 '
                                     '(previous run if there was one)')
+        self.__timingLabel = HeaderLabel()
+        self.__timingLabel.setToolTip('pylint analysis phase timings')
         self.__timestampLabel = HeaderLabel()
         self.__timestampLabel.setToolTip('pylint analysis timestamp')
         self.__labelLayout = QHBoxLayout()
         self.__labelLayout.setSpacing(4)
         self.__labelLayout.addWidget(self.__fileLabel)
         self.__labelLayout.addWidget(self.__rateLabel)
+        self.__labelLayout.addWidget(self.__timingLabel)
         self.__labelLayout.addWidget(self.__timestampLabel)
 
         self.__vLayout = QVBoxLayout()
         self.__vLayout.setSpacing(4)
         self.__vLayout.addLayout(self.__labelLayout)
-        self.__vLayout.addWidget(self.__resultsTree)
+        self.__vLayout.addWidget(self.__filterEdit)
+        self.__vLayout.addWidget(self.__splitter)
 
         self.__hLayout = QHBoxLayout()
         self.__hLayout.setContentsMargins(0, 0, 0, 0)
@@ -160,15 +183,61 @@ class PylintResultViewer(QWidget):
         else:
             self.outputButton.setEnabled(False)
 
-    def showResults(self, results):
-        """Populates the analysis results"""
-        self.clear()
+    def appendMessages(self, fileName, messages):
+        """Adds a batch of messages while the analysis is in progress"""
+        if self.__progressive is None or \
+           self.__progressive['FileName'] != fileName:
+            self.clear()
+            self.__showWidgets()
+            self.__rateLabel.setVisible(False)
+            self.__timingLabel.setVisible(False)
+            self.__fileLabel.setPath(fileName)
+            self.__timestampLabel.setText('analysis in progress...')
+            self.__progressive = {'FileName': fileName, 'Count': 0}
+
+        firstBatch = self.__progressive['Count'] == 0
+        self.__model.appendMessages(messages)
+        self.__progressive['Count'] += len(messages)
+        self.__setTotalMessages(self.__progressive['Count'])
+        if firstBatch and messages:
+            self.__resizeColumns()
+
+    def __isProgressiveComplete(self, results):
+        """True if the messages added in batches match the results"""
+        if self.__progressive is None or 'Files' in results:
+            return False
+        if self.__progressive['FileName'] != results['FileName']:
+            return False
+        return getMessageCount(results) == self.__progressive['Count']
+
+    def __showWidgets(self):
+        """Shows the results widgets instead of the 'no results' label"""
         self.__noneLabel.setVisible(False)
         self.__fileLabel.setVisible(True)
         self.__rateLabel.setVisible(True)
+        self.__timingLabel.setVisible(True)
         self.__timestampLabel.setVisible(True)
+        self.__filterEdit.setVisible(True)
         self.__resultsTree.setVisible(True)
 
+    def __setTotalMessages(self, totalMessages):
+        """Updates the header with the total number of messages"""
+        self.__model.setTotalMessages(totalMessages)
+
+    def showResults(self, results):
+        """Populates the analysis results.
+
+        The time spent here is added to the results 'Timings' as 'Populate'.
+        """
+        started = time.monotonic()
+        # If the messages have already been shown as they came then only
+        # the final touches are needed
+        populate = not self.__isProgressiveComplete(results)
+        self.__progressive = None
+        if populate:
+            self.clear()
+        self.__showWidgets()
+
         self.__results = results
         self.__updateButtons()
 
@@ -186,41 +255,97 @@ class PylintResultViewer(QWidget):
             self.__rateLabel.setText(' ' + text + ' ')
         else:
             self.__rateLabel.setVisible(False)
-        self.__timestampLabel.setText(results['Timestamp'])
-
-        totalMessages = 0
-        totalMessages += self.__populateMessages('Errors')
-        totalMessages += self.__populateMessages('Warnings')
-        totalMessages += self.__populateMessages('Refactoring')
-        totalMessages += self.__populateMessages('Cosmetics')
-
-        # Update the header with the total number of matches
-        headerLabels = ['Message type / line', 'id',
-                        'Message (total messages: ' + str(totalMessages) + ')']
-        self.__resultsTree.setHeaderLabels(headerLabels)
-
-        # Resizing
-        self.__resultsTree.header().resizeSections(
-            QHeaderView.ResizeToContents)
-
-    def __populateMessages(self, title):
-        """Populates the analysis messages"""
-        count = len(self.__results[title[0]])
-        if count > 0:
-            suffix = '' if count == 1 else 's'
-            messageTypeItem = MessageTypeTableItem(
-                [title, '', '(' + str(count) + ' message' + suffix + ')'])
-            self.__resultsTree.addTopLevelItem(messageTypeItem)
-            for item in self.__results[title[0]]:
-                columns = [str(item[1]), item[3], item[2]]
-                messageItem = MessageTableItem(columns)
-                messageTypeItem.addChild(messageItem)
-            messageTypeItem.setExpanded(True)
-        return count
+        timestamp = results['Timestamp']
+        tooltip = 'pylint analysis timestamp'
+        if results.get('Buffer', False):
+            timestamp += ' (unsaved buffer)'
+            tooltip += '; the modified buffer content was analyzed'
+        if results.get('Cached', False):
+            timestamp += ' (cached)'
+            tooltip += '; the file has not changed since then'
+        if 'CacheVerification' in results:
+            tooltip += '; the cached results were re-analyzed and found ' + \
+                       results['CacheVerification']
+        profile = results.get('Profile', None)
+        if profile is not None:
+            timestamp += ' (' + profile + ' profile)'
+            tooltip += '; the ' + profile + ' checker profile was used'
+            if profile == PROFILE_FAST:
+                tooltip += ', the costly checks were off'
+        if 'DiffBase' in results:
+            timestamp += ' (changes since ' + results['DiffBase'] + ')'
+            tooltip += '; the files changed since ' + results['DiffBase'] + \
+                       ' were analyzed'
+            if 'FilteredMessages' in results:
+                tooltip += '; ' + str(results['FilteredMessages']) + \
+                           ' message(s) out of the changed lines are hidden'
+        if 'AstroidCacheHits' in results:
+            tooltip += '; imported modules: ' + \
+                       str(results['AstroidCacheHits']) + ' reused, ' + \
+                       str(results['AstroidCacheMisses']) + ' parsed'
+        self.__timestampLabel.setText(timestamp)
+        self.__timestampLabel.setToolTip(tooltip)
+
+        if populate:
+            self.__model.setResults(results)
+            self.__expandTopLevel()
+        self.__setTotalMessages(getMessageCount(results))
+        self.__resizeColumns()
+        self.__costViewer.setVisible(self.__costViewer.setResults(results))
+        self.__showTimings(results, time.monotonic() - started)
+
+    def __showTimings(self, results, populateTime):
+        """Shows the phase timings next to the rate"""
+        timings = results.get('Timings', None)
+        if timings is None:
+            self.__timingLabel.setVisible(False)
+            return
+        addTiming(timings, 'Populate', populateTime)
+        if 'Total' in timings:
+            addTiming(timings, 'Total', populateTime)
+        text, tooltip = formatTimings(timings)
+        self.__timingLabel.setText(' ' + text + ' ')
+        self.__timingLabel.setToolTip(tooltip)
+        self.__timingLabel.setVisible(bool(text))
+
+    def __expandTopLevel(self):
+        """Expands the top level groups if they are message types"""
+        self.__rowsInserted(QModelIndex(), 0, self.__model.rowCount() - 1)
+
+    def __rowsInserted(self, parent, first, last):
+        """Expands the message type groups added at the top level"""
+        if not parent.isValid() and \
+           self.__model.getGrouping() == GROUP_BY_CATEGORY:
+            for row in range(first, last + 1):
+                self.__resultsTree.expand(self.__model.index(row, 0))
+
+    def __groupExpanded(self, index):
+        """Expands the message type groups of an expanded file"""
+        group = self.__model.getGroup(index)
+        if group is not None and group.children:
+            for row in range(len(group.children)):
+                self.__resultsTree.expand(self.__model.index(row, 0, index))
+
+    def __resizeColumns(self):
+        """Sizes the columns for a sample of the messages"""
+        header = self.__resultsTree.header()
+        metrics = self.__resultsTree.fontMetrics()
+        indentation = self.__resultsTree.indentation()
+        widths = [header.sectionSizeHint(column)
+                  for column in range(self.__model.columnCount())]
+        for depth, texts in self.__model.getSample(COLUMN_SIZE_SAMPLE):
+            for column, text in enumerate(texts):
+                width = metrics.width(text) + COLUMN_MARGIN
+                if column == 0:
+                    width += depth * indentation
+                widths[column] = max(widths[column], width)
+        for column, width in enumerate(widths):
+            header.resizeSection(column, width)
 
     def clear(self):
         """Clears the results view"""
         self.__results = None
+        self.__progressive = None
         self.__updateButtons()
 
         tooltip = 'No results available'
@@ -229,18 +354,61 @@ class PylintResultViewer(QWidget):
 
         self.__fileLabel.setVisible(False)
         self.__rateLabel.setVisible(False)
+        self.__timingLabel.setVisible(False)
         self.__timestampLabel.setVisible(False)
+        self.__filterEdit.setVisible(False)
         self.__resultsTree.setVisible(False)
-        self.__resultsTree.clear()
+        self.__costViewer.setVisible(False)
+        self.__costViewer.clear()
+        self.__model.clear()
 
-    def __resultActivated(self, item, column):
+    def __showTreeContextMenu(self, pos):
+        """Shows the grouping and sorting menu"""
+        grouping = self.__model.getGrouping()
+        contextMenu = QMenu(self)
+        for title, value in (('Group by message type', GROUP_BY_CATEGORY),
+                             ('Group by message id', GROUP_BY_MSGID),
+                             ('Group by file', GROUP_BY_FILE)):
+            action = contextMenu.addAction(title)
+            action.setCheckable(True)
+            action.setChecked(value == grouping)
+            action.setData(value)
+            action.triggered.connect(self.__groupingSelected)
+            if value == GROUP_BY_FILE:
+                action.setEnabled(self.__model.isMultiFile())
+        contextMenu.addSeparator()
+        action = contextMenu.addAction('Restore the original order',
+                                       self.__restoreOrder)
+        action.setEnabled(bool(self.__model.getSortSpec()))
+        contextMenu.popup(self.__resultsTree.viewport().mapToGlobal(pos))
+
+    def __groupingSelected(self):
+        """Regroups the messages"""
+        self.__model.setGrouping(self.sender().data())
+        self.__expandTopLevel()
+        self.__resizeColumns()
+
+    def __filterChanged(self, text):
+        """Applies the new filter"""
+        self.__model.setFilter(text)
+        self.__expandTopLevel()
+
+    def __restoreOrder(self):
+        """Shows the messages in the order pylint produced them"""
+        self.__resultsTree.header().setSortIndicator(-1, Qt.AscendingOrder)
+
+    def __resultActivated(self, index):
         """Handles the double click (or Enter) on a message"""
-        del column  # unused argument
         if self.__results:
-            if isinstance(item, MessageTableItem):
-                fileName = self.__results['FileName']
-                lineNumber = int(item.data(0, Qt.DisplayRole))
-                self.__ide.mainWindow.openFile(fileName, lineNumber)
+            row = self.__model.getRow(index)
+            if row is not None:
+                store = self.__model.getStore()
+                self.__ide.mainWindow.openFile(store.fileNames[row],
+                                               store.lines[row])
+                return
+            group = self.__model.getGroup(index)
+            if group is not None and group.fileName:
+                self.__ide.mainWindow.openFile(group.fileName, 0)
 
     def __showOutput(self):
         """Shows the analysis stdout and stderr"""
@@ -0,0 +1,267 @@
+# -*- coding: utf-8 -*-
+#
+# codimension - graphics python two-way code editor and analyzer
+# Copyright (C) 2019  Sergey Satskiy <sergey.satskiy@gmail.com>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+"""Codimension pylint single file analysis queue.
+
+   The requests are served one at a time by a driver. There is at most one
+   request per file: a new request for a queued file is merged into the
+   queued one and a new request for the file being analyzed cancels the
+   analysis if the file content is not the same any more.
+
+   The current buffer file is served first, then the requests go by the
+   trigger priority and then in the order they came.
+"""
+
+
+import os
+from ui.qt import QObject, QTimer, pyqtSignal
+from .pylintlatency import measureStall
+from .pylintprofiles import (TRIGGER_RUN, TRIGGER_LIVE, TRIGGER_COSTS,
+                             DEFAULT_TRIGGER_PROFILES, getTriggerProfile)
+
+
+# The lower the value the earlier the request is served
+TRIGGER_PRIORITIES = {TRIGGER_COSTS: 0,
+                      TRIGGER_RUN: 1,
+                      TRIGGER_LIVE: 2}
+
+
+def getStrongerTrigger(first, second):
+    """Provides the trigger of the higher priority"""
+    if TRIGGER_PRIORITIES[second] < TRIGGER_PRIORITIES[first]:
+        return second
+    return first
+
+
+def getFileStat(fileName):
+    """Provides what tells that a file on disk has changed"""
+    try:
+        stat = os.stat(fileName)
+        return stat.st_mtime_ns, stat.st_size
+    except OSError:
+        return None
+
+
+class PylintRequest:
+
+    """A single file analysis request"""
+
+    __slots__ = ('fileName', 'encoding', 'content', 'trigger', 'sequence',
+                 'fileStat', 'profile')
+
+    def __init__(self, fileName, encoding, content, trigger, sequence):
+        self.fileName = fileName
+        self.encoding = encoding
+        self.content = content          # None: the file on disk
+        self.trigger = trigger
+        self.sequence = sequence        # the order the requests came in
+        self.fileStat = None            # the disk file when it was started
+        self.profile = None             # the profile it was started with
+
+    def isSameInput(self, other):
+        """True if the other request analyzes exactly the same source"""
+        if self.encoding != other.encoding:
+            return False
+        if self.content is not None or other.content is not None:
+            return self.content == other.content
+        return self.fileStat is not None and \
+               self.fileStat == getFileStat(other.fileName)
+
+
+class PylintScheduler(QObject):
+
+    """Queues the single file analysis requests for a driver"""
+
+    # The driver results with the 'Trigger' of the request
+    sigFinished = pyqtSignal(dict)
+    # file name, trigger, a batch of the messages parsed so far
+    sigMessages = pyqtSignal(str, str, list)
+
+    def __init__(self, ide, driver, parent=None):
+        QObject.__init__(self, parent)
+
+        self.__ide = ide
+        self.__driver = driver
+        self.__queue = {}               # file name -> PylintRequest
+        self.__running = None
+        self.__sequence = 0
+        self.__triggerProfiles = DEFAULT_TRIGGER_PROFILES
+
+        # The next request is picked when the control returns to the event
+        # loop so that a burst of requests is ordered as a whole
+        self.__startTimer = QTimer(self)
+        self.__startTimer.setSingleShot(True)
+        self.__startTimer.setInterval(0)
+        self.__startTimer.timeout.connect(self.__startNext)
+
+        driver.sigFinished.connect(self.__finished)
+        driver.sigMessages.connect(self.__messages)
+
+    def isBusy(self):
+        """True if a request is being served or queued"""
+        return self.__running is not None or bool(self.__queue)
+
+    def getQueueLength(self):
+        """Provides the number of the requests waiting to be served"""
+        return len(self.__queue)
+
+    def isQueued(self, fileName):
+        """True if the file is queued or being analyzed"""
+        return fileName in self.__queue or \
+               (self.__running is not None and
+                self.__running.fileName == fileName)
+
+    def setTriggerProfiles(self, triggerProfiles):
+        """Sets the trigger to the checker profile mapping"""
+        self.__triggerProfiles = triggerProfiles
+
+    def submit(self, fileName, encoding, content=None, trigger=TRIGGER_RUN):
+        """Queues the file analysis.
+
+        If the content is given then it is analyzed instead of the file on
+        disk, e.g. for a modified buffer.
+        """
+        request = PylintRequest(fileName, encoding, content, trigger,
+                                self.__sequence + 1)
+
+        running = self.__running
+        if running is not None and running.fileName == fileName:
+            stronger = getStrongerTrigger(running.trigger, trigger)
+            # A run without the checkers cost measured is not a substitute
+            # for the one with it
+            if running.isSameInput(request) and \
+               running.profile == self.__getProfile(stronger) and \
+               (stronger != TRIGGER_COSTS or
+                running.trigger == TRIGGER_COSTS):
+                # The analysis in progress is what is requested
+                running.trigger = stronger
+                return
+            # The analysis in progress is stale; start over
+            self.__cancelRunning()
+            request.trigger = stronger
+            request.sequence = running.sequence
+
+        queued = self.__queue.get(fileName, None)
+        if queued is not None:
+            queued.encoding = encoding
+            queued.content = content
+            queued.trigger = getStrongerTrigger(queued.trigger,
+                                                request.trigger)
+            queued.sequence = min(queued.sequence, request.sequence)
+        else:
+            self.__queue[fileName] = request
+            self.__sequence += 1
+        self.__startTimer.start()
+
+    def fileSaved(self, fileName):
+        """The file has been saved: the analysis of its old content is
+           cancelled and the file is analyzed again
+        """
+        running = self.__running
+        if running is not None and running.fileName == fileName:
+            self.__cancelRunning()
+            running.content = None
+            running.fileStat = None
+            queued = self.__queue.get(fileName, None)
+            if queued is None:
+                self.__queue[fileName] = running
+            else:
+                queued.trigger = getStrongerTrigger(queued.trigger,
+                                                    running.trigger)
+                queued.sequence = min(queued.sequence, running.sequence)
+            self.__startTimer.start()
+
+        queued = self.__queue.get(fileName, None)
+        if queued is not None:
+            queued.content = None
+
+    def cancel(self, fileName=None):
+        """Cancels the requests for the file or all of them if None"""
+        if fileName is None:
+            self.__queue = {}
+        else:
+            self.__queue.pop(fileName, None)
+        if self.__running is not None:
+            if fileName is None or self.__running.fileName == fileName:
+                self.__cancelRunning()
+                self.__startTimer.start()
+
+    def __cancelRunning(self):
+        """Stops the analysis in progress; the driver reports nothing"""
+        self.__running = None
+        self.__driver.stop()
+
+    def __getProfile(self, trigger):
+        """Provides the checker profile for the trigger"""
+        return getTriggerProfile(self.__triggerProfiles, trigger)
+
+    def __getOrder(self, request, currentFileName):
+        """Provides the request sort key"""
+        return (request.fileName != currentFileName,
+                TRIGGER_PRIORITIES[request.trigger],
+                request.sequence)
+
+    def __getCurrentFileName(self):
+        """Provides the current buffer file name"""
+        editorWidget = self.__ide.currentEditorWidget
+        if editorWidget is None:
+            return None
+        return editorWidget.getFileName()
+
+    @measureStall('scheduler start')
+    def __startNext(self):
+        """Starts the most important queued request"""
+        while self.__running is None and self.__queue:
+            currentFileName = self.__getCurrentFileName()
+            request = min(self.__queue.values(),
+                          key=lambda item: self.__getOrder(item,
+                                                           currentFileName))
+            del self.__queue[request.fileName]
+
+            if request.content is None:
+                request.fileStat = getFileStat(request.fileName)
+            request.profile = self.__getProfile(request.trigger)
+            self.__running = request
+            message = self.__driver.start(request.fileName, request.encoding,
+                                          request.content,
+                                          profile=request.profile,
+                                          costs=request.trigger ==
+                                          TRIGGER_COSTS)
+            if message is not None:
+                self.__running = None
+                self.sigFinished.emit({'FileName': request.fileName,
+                                       'Trigger': request.trigger,
+                                       'Profile': request.profile,
+                                       'ProcessError': message})
+
+    def __finished(self, results):
+        """The driver has finished the request"""
+        request = self.__running
+        if request is None:
+            return
+        self.__running = None
+        results['Trigger'] = request.trigger
+        self.sigFinished.emit(results)
+        if self.__queue:
+            self.__startTimer.start()
+
+    def __messages(self, fileName, messages):
+        """The driver has parsed some messages"""
+        if self.__running is not None:
+            self.sigMessages.emit(fileName, self.__running.trigger, messages)
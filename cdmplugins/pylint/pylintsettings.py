@@ -0,0 +1,104 @@
+# -*- coding: utf-8 -*-
+#
+# codimension - graphics python two-way code editor and analyzer
+# Copyright (C) 2019  Sergey Satskiy <sergey.satskiy@gmail.com>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+"""Codimension pylint plugin settings"""
+
+
+import os
+import os.path
+import json
+import logging
+from utils.settings import SETTINGS_DIR
+from .pylintprofiles import DEFAULT_TRIGGER_PROFILES
+
+
+PLUGIN_SETTINGS_DIR = SETTINGS_DIR + 'pylint' + os.path.sep
+METRICS_LOG = PLUGIN_SETTINGS_DIR + 'metrics.jsonl'
+
+DEFAULT_SETTINGS = {
+    # Analyze the current buffer while it is being edited
+    'lintAsYouType': False,
+    # Milliseconds of the editing inactivity before an analysis starts
+    'lintAsYouTypeDelay': 800,
+    # Analyze a saved file and the project files which import it
+    'lintOnSave': False,
+    # The commit the changes are taken against for the changes analysis
+    'diffBase': 'HEAD',
+    # Show the changes analysis messages on the changed lines only
+    'diffChangedLinesOnly': True,
+    # The checker profile of each analysis trigger: 'fast' or 'full'
+    'triggerProfiles': dict(DEFAULT_TRIGGER_PROFILES),
+    # Append the analysis phase timings to the metrics JSON lines log
+    'metricsLog': False,
+    # Serve the analysis by the per user daemon shared by the IDE instances
+    'lintDaemon': False,
+    # The results cache directory, e.g. one shared by a team on NFS;
+    # empty for the private one in the settings directory
+    'resultCacheDir': '',
+    # The results cache size limit, megabytes
+    'resultCacheSizeMB': 64,
+    # The share of the cache hits re-analyzed to detect stale entries
+    'resultCacheVerifyRate': 0.0,
+    # The max number of files analyzed in parallel, i.e. of the resident
+    # warm workers; 0 for one per CPU core
+    'batchPoolSize': 0,
+}
+
+
+class PylintPluginSettings:
+
+    """Plugin settings stored as a JSON file in the IDE settings directory"""
+
+    def __init__(self, fileName=None):
+        if fileName is None:
+            fileName = PLUGIN_SETTINGS_DIR + 'settings.json'
+        self.__fileName = fileName
+        self.__values = dict(DEFAULT_SETTINGS)
+
+        try:
+            with open(self.__fileName, 'r', encoding='utf-8') as diskFile:
+                values = json.load(diskFile)
+            for key, value in values.items():
+                if key in DEFAULT_SETTINGS:
+                    self.__values[key] = value
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError, AttributeError) as exc:
+            logging.error('Error reading pylint plugin settings from ' +
+                          self.__fileName + ': ' + str(exc))
+
+    def __getitem__(self, key):
+        return self.__values[key]
+
+    def __setitem__(self, key, value):
+        if key not in DEFAULT_SETTINGS:
+            raise KeyError('Unknown pylint plugin setting: ' + key)
+        if self.__values[key] != value:
+            self.__values[key] = value
+            self.__save()
+
+    def __save(self):
+        """Saves the settings"""
+        try:
+            os.makedirs(os.path.dirname(self.__fileName), exist_ok=True)
+            with open(self.__fileName, 'w', encoding='utf-8') as diskFile:
+                json.dump(self.__values, diskFile, indent=4, sort_keys=True)
+        except OSError as exc:
+            logging.error('Error saving pylint plugin settings into ' +
+                          self.__fileName + ': ' + str(exc))
@@ -0,0 +1,535 @@
+# -*- coding: utf-8 -*-
+#
+# codimension - graphics python two-way code editor and analyzer
+# Copyright (C) 2019  Sergey Satskiy <sergey.satskiy@gmail.com>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+"""Codimension pylint warm worker.
+
+   The module is executed as a standalone script in a separate process so it
+   must not import anything from the IDE. It imports pylint and astroid once
+   and then serves analysis requests which come one per line on stdin as
+   JSON objects:
+   {"id": <int>, "cwd": <str>, "args": [<pylint command line arguments>],
+    "stdin": <str, optional: the source for the --from-stdin option>,
+    "format": <str, optional: 'jsonl' to get one JSON value per line>,
+    "costs": <bool, optional: measure the checkers cost>}
+
+   In the 'jsonl' format every message is a line with an array in the
+   order of a parsed message (see pylintparser.py):
+   [<module>, <line>, <message>, <msg id>, <absolute path>, <column>,
+    <end line>, <symbol>, <confidence>]
+   where the message has the object in front of it if there is one. The
+   arrays are a lot cheaper to decode than objects. The textual reports,
+   e.g. the evaluation, are lines with a JSON string.
+
+   While a request is served the pylint output is sent as it appears, in
+   pieces of complete lines:
+   {"id": <int>, "partial": <str>}
+
+   When a request is served a response is written as a single JSON line:
+   {"id": <int>, "exitCode": <int>, "stdout": <str>, "stderr": <str>,
+    "astroidCache": {"hits": <int>, "misses": <int>, "dropped": <int>,
+                     "modules": <int>},
+    "timings": {"check": <seconds pylint ran>}}
+   where stdout is the rest of the output not sent as partial messages.
+   If the checkers cost is requested then the response also has
+   "costs": {"checkers": [[<name>, <seconds>, <messages>, <calls>], ...],
+             "modules": [[<name>, <seconds>, <messages>], ...]}
+   The astroid trees building is reported as the 'astroid' checker.
+   The astroid modules are kept between the requests; the hits and misses
+   are the distinct imported modules found in the cache or built.
+
+   When the worker is ready to accept requests it writes:
+   {"ready": true, "version": <pylint version>, "pid": <int>,
+    "warmUp": <seconds spent to import pylint>}
+"""
+
+
+import sys
+import os
+import io
+import json
+import time
+import hashlib
+import functools
+import traceback
+import contextlib
+
+
+# Minimum interval between partial output messages, seconds
+PARTIAL_INTERVAL = 0.05
+
+
+def writeMessage(channel, message):
+    """Writes a single protocol message"""
+    channel.write(json.dumps(message) + '\n')
+    channel.flush()
+
+
+class StreamingOutput(io.TextIOBase):
+
+    """Captures pylint stdout and sends the complete lines as they come"""
+
+    def __init__(self, channel, requestId):
+        io.TextIOBase.__init__(self)
+        self.__channel = channel
+        self.__requestId = requestId
+        self.__parts = []
+        self.__lastSent = time.monotonic()
+
+    def writable(self):
+        return True
+
+    def write(self, text):
+        self.__parts.append(text)
+        if '\n' in text:
+            now = time.monotonic()
+            if now - self.__lastSent >= PARTIAL_INTERVAL:
+                self.__lastSent = now
+                buffered = ''.join(self.__parts)
+                eol = buffered.rfind('\n') + 1
+                self.__parts = [buffered[eol:]]
+                writeMessage(self.__channel, {'id': self.__requestId,
+                                              'partial': buffered[:eol]})
+        return len(text)
+
+    def getvalue(self):
+        """Provides the output which has not been sent yet"""
+        return ''.join(self.__parts)
+
+
+def warmUp():
+    """Imports pylint, astroid and the default checkers"""
+    import pylint
+    from pylint.lint import PyLinter
+    PyLinter().load_default_plugins()
+    getJSONLinesReporterClass()
+    getCacheKeeper()
+    return pylint.__version__
+
+
+_JSON_LINES_REPORTER = None
+
+
+def getJSONLinesReporterClass():
+    """Provides the JSON lines reporter class; pylint must be importable"""
+    global _JSON_LINES_REPORTER
+    if _JSON_LINES_REPORTER is not None:
+        return _JSON_LINES_REPORTER
+
+    from pylint.reporters import BaseReporter
+    from pylint.reporters.ureports.text_writer import TextWriter
+
+    class JSONLinesReporter(BaseReporter):
+
+        """Writes every message as a JSON array on a separate line"""
+
+        name = 'cdm-jsonl'
+        extension = 'jsonl'
+
+        def handle_message(self, msg):
+            """Writes the message as soon as it is produced"""
+            confidence = getattr(msg, 'confidence', None)
+            message = msg.msg
+            if msg.obj:
+                message = msg.obj + ': ' + message
+            self.writeln(json.dumps([
+                msg.module, msg.line, message, msg.msg_id,
+                os.path.abspath(msg.path) if msg.path else None,
+                msg.column, getattr(msg, 'end_line', None), msg.symbol,
+                getattr(confidence, 'name', None)]))
+
+        def display_messages(self, layout):
+            """The messages have already been written"""
+
+        def _display(self, layout):
+            """Writes a report, e.g. the evaluation, as text"""
+            text = io.StringIO()
+            TextWriter().format(layout, text)
+            self.writeln(json.dumps(text.getvalue()))
+
+    _JSON_LINES_REPORTER = JSONLinesReporter
+    return _JSON_LINES_REPORTER
+
+
+def getFileDigest(path):
+    """Provides the file content hash or None if it cannot be read"""
+    try:
+        with open(path, 'rb') as diskFile:
+            return hashlib.blake2b(diskFile.read(), digest_size=16).digest()
+    except OSError:
+        return None
+
+
+def clearInferenceCaches():
+    """Drops the astroid inference caches; False if it is not possible"""
+    try:
+        from astroid.inference_tip import clear_inference_tip_cache
+        from astroid.context import _invalidate_cache
+        clear_inference_tip_cache()
+        _invalidate_cache()
+        return True
+    except Exception:
+        return False
+
+
+class AstroidCacheKeeper:
+
+    """Keeps the astroid modules cache between the requests.
+
+    A module is dropped when its file changes. The mtime and the size are
+    checked first and the content hash only if they differ, so a file saved
+    without changes keeps its module. When a module is dropped the inference
+    caches are dropped too as they may refer to the old module nodes.
+    A module built from a buffer rather than from its file is never kept.
+    """
+
+    def __init__(self):
+        from astroid import MANAGER
+        self.__manager = MANAGER
+        self.__stamps = {}      # module name -> (file, mtime_ns, size, digest)
+        self.__seen = None      # imported module names during a request
+        self.hits = 0
+        self.misses = 0
+        self.dropped = 0
+
+        # Imports are resolved through the manager so it tells what the
+        # import closure of the analyzed file costs. The manager instances
+        # share the state so the class is wrapped, not the MANAGER object.
+        managerClass = type(MANAGER)
+        original = managerClass.ast_from_module_name
+
+        def astFromModuleName(manager, modname, *args, **kwargs):
+            """Counts the distinct imported modules"""
+            seen = self.__seen
+            if seen is not None and modname and modname not in seen:
+                seen.add(modname)
+                if modname in manager.astroid_cache:
+                    self.hits += 1
+                else:
+                    self.misses += 1
+            return original(manager, modname, *args, **kwargs)
+
+        managerClass.ast_from_module_name = astFromModuleName
+
+    def getStats(self):
+        """Provides the last request statistics"""
+        return {'hits': self.hits, 'misses': self.misses,
+                'dropped': self.dropped,
+                'modules': len(self.__manager.astroid_cache)}
+
+    def begin(self):
+        """Drops the changed modules before a request"""
+        self.hits = 0
+        self.misses = 0
+        self.dropped = 0
+        self.__seen = set()
+
+        cache = self.__manager.astroid_cache
+        for modname, module in list(cache.items()):
+            stamp = self.__stamps.get(modname, None)
+            if stamp is None:
+                continue        # no file, e.g. builtins
+            path = getattr(module, 'file', None)
+            if path == stamp[0] and self.__isSame(modname, stamp):
+                continue
+            del cache[modname]
+            del self.__stamps[modname]
+            self.dropped += 1
+
+        if self.dropped and not clearInferenceCaches():
+            self.clear()
+
+    def end(self, bufferFile=None):
+        """Remembers the new modules after a request"""
+        self.__seen = None
+        cache = self.__manager.astroid_cache
+        for modname, module in list(cache.items()):
+            path = getattr(module, 'file', None)
+            if bufferFile and path == bufferFile:
+                # The buffer content differs from the file on disk
+                del cache[modname]
+                self.__stamps.pop(modname, None)
+                continue
+            if modname in self.__stamps or not path:
+                continue
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            self.__stamps[modname] = (path, stat.st_mtime_ns, stat.st_size,
+                                      getFileDigest(path))
+        if bufferFile:
+            clearInferenceCaches()
+
+    def clear(self):
+        """Drops everything"""
+        self.__stamps = {}
+        try:
+            self.__manager.clear_cache()
+        except Exception:
+            pass
+
+    def __isSame(self, modname, stamp):
+        """True if the module file has not changed"""
+        path, mtime, size, digest = stamp
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return False
+        if stat.st_mtime_ns == mtime and stat.st_size == size:
+            return True
+        if stat.st_size != size or digest is None:
+            return False
+        if getFileDigest(path) != digest:
+            return False
+        # Touched but not changed
+        self.__stamps[modname] = (path, stat.st_mtime_ns, size, digest)
+        return True
+
+
+class CheckerCostCollector:
+
+    """Measures the wall time and the messages of each checker.
+
+    The checkers of a run are known when pylint prepares them, so the
+    preparation is intercepted while the collector is installed and the
+    checker callbacks are wrapped on the checker instances.
+    """
+
+    CALLBACK_PREFIXES = ('visit_', 'leave_')
+    CALLBACKS = ('open', 'close', 'process_module', 'process_tokens')
+
+    def __init__(self):
+        self.__checkers = {}        # name -> [seconds, messages, calls]
+        self.__modules = {}         # name -> [seconds, messages]
+        self.__current = None       # the checker being called
+        self.__linter = None
+        self.__restore = None
+
+    def install(self):
+        """Starts intercepting the checkers preparation"""
+        from pylint.lint import PyLinter
+        original = PyLinter.prepare_checkers
+
+        def prepareCheckers(linter):
+            """Instruments the checkers needed for a run"""
+            checkers = original(linter)
+            self.__instrument(linter, checkers)
+            return checkers
+
+        PyLinter.prepare_checkers = prepareCheckers
+
+        def restore():
+            """Stops intercepting"""
+            PyLinter.prepare_checkers = original
+
+        self.__restore = restore
+
+    def uninstall(self):
+        """Stops intercepting the checkers preparation"""
+        if self.__restore is not None:
+            self.__restore()
+            self.__restore = None
+        self.__linter = None
+
+    def getCosts(self):
+        """Provides the costs in the protocol format"""
+        return {'checkers': [[name] + values
+                             for name, values in self.__checkers.items()],
+                'modules': [[name] + values
+                            for name, values in self.__modules.items()]}
+
+    def __instrument(self, linter, checkers):
+        """Wraps the checker callbacks and the message reporting"""
+        self.__linter = linter
+        linter.get_ast = self.__wrap('astroid', linter.get_ast)
+        for checker in checkers:
+            for name in dir(type(checker)):
+                if name.startswith(self.CALLBACK_PREFIXES) or \
+                   name in self.CALLBACKS:
+                    method = getattr(checker, name, None)
+                    if callable(method):
+                        setattr(checker, name,
+                                self.__wrap(checker.name, method))
+
+        reporter = linter.reporter
+        handleMessage = reporter.handle_message
+
+        def countMessage(msg):
+            """Counts a reported message"""
+            self.__getChecker(self.__current or linter.name)[1] += 1
+            self.__getModule(msg.module)[1] += 1
+            return handleMessage(msg)
+
+        reporter.handle_message = countMessage
+
+    def __wrap(self, checkerName, method):
+        """Provides the timed callback"""
+        # The attributes, e.g. checks_msgs, must be kept: pylint does not
+        # call a callback whose messages are all disabled
+        @functools.wraps(method)
+        def timed(*args, **kwargs):
+            """Calls the checker callback and accounts the time"""
+            previous = self.__current
+            self.__current = checkerName
+            started = time.perf_counter()
+            try:
+                return method(*args, **kwargs)
+            finally:
+                spent = time.perf_counter() - started
+                self.__current = previous
+                values = self.__getChecker(checkerName)
+                values[0] += spent
+                values[2] += 1
+                self.__getModule(self.__linter.current_name)[0] += spent
+        return timed
+
+    def __getChecker(self, name):
+        """Provides the checker values"""
+        return self.__checkers.setdefault(name, [0.0, 0, 0])
+
+    def __getModule(self, name):
+        """Provides the module values"""
+        return self.__modules.setdefault(name or '', [0.0, 0])
+
+
+_CACHE_KEEPER = None
+
+
+def getCacheKeeper():
+    """Provides the astroid cache keeper; pylint must be importable"""
+    global _CACHE_KEEPER
+    if _CACHE_KEEPER is None:
+        _CACHE_KEEPER = AstroidCacheKeeper()
+    return _CACHE_KEEPER
+
+
+def getBufferFile(request):
+    """Provides the absolute path of the file analyzed from stdin"""
+    if request.get('stdin', None) is None:
+        return None
+    args = request.get('args', [])
+    try:
+        path = args[args.index('--from-stdin') + 1]
+    except (ValueError, IndexError):
+        return None
+    return os.path.abspath(os.path.join(request.get('cwd', None) or '',
+                                        path))
+
+
+def runPylint(channel, request):
+    """Runs pylint in-process for a single request"""
+    from pylint.lint import Run
+
+    savedPath = list(sys.path)
+    savedCwd = os.getcwd()
+    savedStdin = sys.stdin
+    stdout = StreamingOutput(channel, request.get('id', None))
+    stderr = io.StringIO()
+    exitCode = 0
+    checkTime = 0.0
+    cacheKeeper = getCacheKeeper()
+    cacheKeeper.begin()
+    costCollector = None
+    if request.get('costs', False):
+        costCollector = CheckerCostCollector()
+        costCollector.install()
+    try:
+        cwd = request.get('cwd', None)
+        if cwd:
+            # Mimic 'python -m pylint' started in the given directory
+            os.chdir(cwd)
+            sys.path.insert(0, cwd)
+        source = request.get('stdin', None)
+        if source is not None:
+            # pylint detaches sys.stdin so it must be a real text wrapper
+            sys.stdin = io.TextIOWrapper(io.BytesIO(source.encode('utf-8')),
+                                         encoding='utf-8')
+        with contextlib.redirect_stdout(stdout), \
+             contextlib.redirect_stderr(stderr):
+            started = time.monotonic()
+            try:
+                reporter = None
+                if request.get('format', None) == 'jsonl':
+                    reporter = getJSONLinesReporterClass()(stdout)
+                run = Run(request['args'], reporter=reporter, exit=False)
+                exitCode = run.linter.msg_status
+            except SystemExit as exc:
+                exitCode = exc.code if isinstance(exc.code, int) else 1
+            except Exception:
+                traceback.print_exc()
+                exitCode = 1
+            checkTime = time.monotonic() - started
+    finally:
+        sys.path[:] = savedPath
+        sys.stdin = savedStdin
+        os.chdir(savedCwd)
+        cacheKeeper.end(getBufferFile(request))
+        if costCollector is not None:
+            costCollector.uninstall()
+
+    response = {'id': request.get('id', None),
+                'exitCode': exitCode,
+                'stdout': stdout.getvalue(),
+                'stderr': stderr.getvalue(),
+                'astroidCache': cacheKeeper.getStats(),
+                'timings': {'check': checkTime}}
+    if costCollector is not None:
+        response['costs'] = costCollector.getCosts()
+    return response
+
+
+def main():
+    """Serves the requests until stdin is closed"""
+    # The protocol channel is a private copy of the original stdout. The
+    # file descriptor 1 itself is redirected to stderr so that a stray print
+    # from a pylint plugin or an init hook cannot break the protocol.
+    channel = os.fdopen(os.dup(1), 'w', encoding='utf-8')
+    os.dup2(2, 1)
+
+    # The script directory must not shadow anything on the analysis path
+    if sys.path and sys.path[0] == os.path.dirname(os.path.abspath(__file__)):
+        del sys.path[0]
+
+    started = time.monotonic()
+    try:
+        version = warmUp()
+    except Exception as exc:
+        writeMessage(channel, {'ready': False,
+                               'error': 'Cannot import pylint: ' + str(exc)})
+        return 1
+    writeMessage(channel, {'ready': True, 'version': version,
+                           'pid': os.getpid(),
+                           'warmUp': time.monotonic() - started})
+
+    for line in sys.stdin:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            request = json.loads(line)
+        except ValueError as exc:
+            writeMessage(channel, {'id': None, 'exitCode': 1, 'stdout': '',
+                                   'stderr': 'Bad request: ' + str(exc)})
+            continue
+        writeMessage(channel, runPylint(channel, request))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,281 @@
+# -*- coding: utf-8 -*-
+#
+# codimension - graphics python two-way code editor and analyzer
+# Copyright (C) 2019  Sergey Satskiy <sergey.satskiy@gmail.com>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+"""Codimension pylint warm worker client"""
+
+
+import sys
+import os.path
+import json
+import time
+import logging
+from collections import deque
+from ui.qt import QObject, pyqtSignal, QProcess
+from .pylintlatency import measureStall
+
+
+WORKER_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                             'pylintworker.py')
+
+
+def killProcess(process):
+    """Kills the process without waiting for it to finish.
+
+    The process signals are disconnected. The object is deleted when the
+    process has finished: deleting a running QProcess would wait for it.
+    """
+    for signal in (process.readyReadStandardOutput,
+                   process.readyReadStandardError,
+                   process.started, process.finished, process.errorOccurred):
+        try:
+            signal.disconnect()
+        except TypeError:
+            pass    # nothing was connected
+    if process.state() == QProcess.NotRunning:
+        process.deleteLater()
+        return
+    process.finished.connect(process.deleteLater)
+    process.kill()
+
+
+class PylintWorkerClient(QObject):
+
+    """Talks to a long living pylint worker process over its stdin/stdout.
+
+    The worker keeps pylint and astroid imported so a request does not pay
+    the interpreter and pylint start up price. The requests are sent to the
+    worker one at a time so a cancelled request which has not been sent
+    yet costs nothing.
+    """
+
+    # request id, a piece of pylint stdout while the request is served
+    sigOutput = pyqtSignal(int, str)
+    # request id, response dictionary
+    sigFinished = pyqtSignal(int, dict)
+    # request id, error message; the request will not be served
+    sigFailed = pyqtSignal(int, str)
+
+    # Consecutive crashes after which the worker is not restarted any more
+    MAX_CRASHES = 3
+
+    def __init__(self, parent=None):
+        QObject.__init__(self, parent)
+
+        self.__process = None
+        self.__buffer = bytearray()
+        self.__inFlight = set()
+        self.__pending = deque()    # (request id, request line) not sent
+        self.__serving = None       # the request id the worker is busy with
+        self.__nextId = 0
+        self.__crashCount = 0
+        self.pylintVersion = None
+
+        # The requests which waited for the worker to start up and the
+        # start up timings added to their responses
+        self.__startedAt = None
+        self.__ready = False
+        self.__coldRequests = set()
+        self.__startupTimings = {}
+
+    def isAvailable(self):
+        """True if the worker can be used"""
+        return self.__crashCount < self.MAX_CRASHES
+
+    def isBusy(self):
+        """True if there are requests which have not been served yet"""
+        return bool(self.__inFlight)
+
+    def prestart(self):
+        """Starts the worker in advance so the first request is served warm"""
+        if self.isAvailable():
+            self.__ensureStarted()
+
+    def submit(self, args, cwd, source=None, outputFormat=None,
+               costs=False):
+        """Sends the request to the worker. Provides the request id.
+
+        The source, if given, is served to pylint as its standard input.
+        The output format could be None (as configured) or 'jsonl'.
+        If costs is True then the checkers cost is measured.
+        """
+        self.__ensureStarted()
+
+        self.__nextId += 1
+        requestId = self.__nextId
+        request = {'id': requestId, 'cwd': cwd, 'args': args}
+        if source is not None:
+            request['stdin'] = source
+        if outputFormat is not None:
+            request['format'] = outputFormat
+        if costs:
+            request['costs'] = True
+        self.__pending.append((requestId,
+                               (json.dumps(request) + '\n').encode('utf-8')))
+        self.__inFlight.add(requestId)
+        if not self.__ready:
+            self.__coldRequests.add(requestId)
+        self.__sendNext()
+        return requestId
+
+    def cancel(self, requestId):
+        """Cancels the request; nothing is reported for it.
+
+        pylint cannot be interrupted inside the worker. Killing the worker
+        would lose its warm imports and astroid cache so the request being
+        served is let finish and its response is dropped.
+        """
+        if requestId not in self.__inFlight:
+            return
+        self.__inFlight.discard(requestId)
+        self.__coldRequests.discard(requestId)
+        self.__pending = deque(item for item in self.__pending
+                               if item[0] != requestId)
+
+    def shutdown(self):
+        """Stops the worker"""
+        self.__kill()
+        self.__failInFlight('pylint worker has been shut down')
+
+    def __sendNext(self):
+        """Sends the next request if the worker is not busy"""
+        if self.__process is None or self.__serving is not None or \
+           not self.__pending:
+            return
+        self.__serving, line = self.__pending.popleft()
+        self.__process.write(line)
+
+    def __ensureStarted(self):
+        """Starts the worker process if it is not running"""
+        if self.__process is not None:
+            return
+
+        self.__buffer = bytearray()
+        self.__serving = None
+        self.__startedAt = time.monotonic()
+        self.__ready = False
+        self.__coldRequests = set()
+        self.__process = QProcess(self)
+        self.__process.setProcessChannelMode(QProcess.SeparateChannels)
+        self.__process.readyReadStandardOutput.connect(self.__readStdOutput)
+        self.__process.readyReadStandardError.connect(self.__readStdError)
+        self.__process.finished.connect(self.__finished)
+        self.__process.errorOccurred.connect(self.__errorOccurred)
+        self.__process.start(sys.executable, ['-u', WORKER_SCRIPT])
+
+    def __kill(self):
+        """Kills the worker process without treating it as a crash"""
+        if self.__process is not None:
+            process = self.__process
+            self.__process = None
+            killProcess(process)
+
+    def __failInFlight(self, message):
+        """Reports all the not served requests as failed"""
+        inFlight = sorted(self.__inFlight)
+        self.__inFlight = set()
+        self.__pending = deque()
+        self.__serving = None
+        for requestId in inFlight:
+            self.sigFailed.emit(requestId, message)
+
+    @measureStall('worker stdout')
+    def __readStdOutput(self):
+        """Handles the worker responses"""
+        if self.__process is None:
+            return
+        self.__buffer += bytes(self.__process.readAllStandardOutput())
+        eol = self.__buffer.rfind(b'\n')
+        if eol == -1:
+            return
+        # All the complete lines are taken at once so the buffer is cut once
+        # per read rather than once per message
+        lines = bytes(self.__buffer[:eol]).split(b'\n')
+        del self.__buffer[:eol + 1]
+        for line in lines:
+            self.__handleMessage(line)
+
+    def __readStdError(self):
+        """The worker stderr is not a part of the protocol"""
+        if self.__process is None:
+            return
+        text = bytes(self.__process.readAllStandardError())
+        logging.debug('pylint worker: ' + text.decode('utf-8', 'replace'))
+
+    def __handleMessage(self, line):
+        """Handles one protocol message"""
+        try:
+            message = json.loads(line.decode('utf-8'))
+        except ValueError:
+            logging.debug('pylint worker: unexpected output ' + repr(line))
+            return
+
+        if 'ready' in message:
+            if message['ready']:
+                self.pylintVersion = message.get('version', None)
+                self.__ready = True
+                warmUp = message.get('warmUp', 0.0)
+                self.__startupTimings = {
+                    'spawn': max(time.monotonic() - self.__startedAt -
+                                 warmUp, 0.0),
+                    'import': warmUp}
+            else:
+                # No point to restart: pylint is not importable
+                self.__crashCount = self.MAX_CRASHES
+                logging.error(message.get('error', 'pylint worker failed'))
+            return
+
+        requestId = message.get('id', None)
+        if 'partial' not in message and requestId == self.__serving:
+            self.__serving = None
+            self.__crashCount = 0
+            self.__sendNext()
+        if requestId not in self.__inFlight:
+            return      # e.g. cancelled while served
+        if 'partial' in message:
+            self.sigOutput.emit(requestId, message['partial'])
+        else:
+            self.__inFlight.discard(requestId)
+            if requestId in self.__coldRequests:
+                self.__coldRequests.discard(requestId)
+                message.setdefault('timings', {}).update(
+                    self.__startupTimings)
+            self.sigFinished.emit(requestId, message)
+
+    def __finished(self, exitCode, exitStatus):
+        """The worker process has finished unexpectedly"""
+        del exitStatus      # unused argument
+
+        self.__process.deleteLater()
+        self.__process = None
+        self.__crashCount += 1
+        self.__failInFlight('pylint worker finished unexpectedly '
+                            '(exit code ' + str(exitCode) + ')')
+        if self.isAvailable():
+            # Keep the worker warm for the next request
+            self.__ensureStarted()
+
+    def __errorOccurred(self, error):
+        """The worker process could not be started"""
+        if error != QProcess.FailedToStart or self.__process is None:
+            return
+
+        self.__process.deleteLater()
+        self.__process = None
+        self.__crashCount = self.MAX_CRASHES
+        self.__failInFlight('pylint worker failed to start')
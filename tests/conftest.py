@@ -0,0 +1,49 @@
+# -*- coding: utf-8 -*-
+#
+# codimension - graphics python two-way code editor and analyzer
+# Copyright (C) 2019  Sergey Satskiy <sergey.satskiy@gmail.com>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+"""Makes the plugin modules importable without the IDE.
+
+The package __init__ is the IDE plugin entry point which needs a running
+IDE, so the package is registered without executing it. The modules which
+import the IDE or Qt themselves still need them.
+"""
+
+import os
+import sys
+import types
+
+
+PLUGIN_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                          os.path.pardir, 'cdmplugins', 'pylint')
+
+
+def registerPackage():
+    """Registers the cdmplugins.pylint package path"""
+    if 'cdmplugins.pylint' in sys.modules:
+        return
+    root = types.ModuleType('cdmplugins')
+    root.__path__ = [os.path.dirname(PLUGIN_DIR)]
+    package = types.ModuleType('cdmplugins.pylint')
+    package.__path__ = [PLUGIN_DIR]
+    root.pylint = package
+    sys.modules.setdefault('cdmplugins', root)
+    sys.modules['cdmplugins.pylint'] = package
+
+
+registerPackage()
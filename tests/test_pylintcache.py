@@ -0,0 +1,185 @@
+# -*- coding: utf-8 -*-
+#
+# codimension - graphics python two-way code editor and analyzer
+# Copyright (C) 2019  Sergey Satskiy <sergey.satskiy@gmail.com>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+"""Pylint results cache tests"""
+
+import os
+import time
+from cdmplugins.pylint.pylintcache import (PylintResultCache,
+                                           relocateResults, RESULT_SUFFIX,
+                                           TEMP_SUFFIX, STALE_TEMP_AGE)
+
+
+def makeResults(fileName, count=1):
+    """Provides a results dictionary as the driver stores it"""
+    return {'FileName': fileName,
+            'E': [], 'R': [], 'C': [],
+            'W': [['mod', line, 'Unused variable', 'W0612', fileName,
+                   0, line, 'unused-variable', 'HIGH']
+                  for line in range(1, count + 1)]}
+
+
+def getEntries(cacheDir, suffix):
+    """Provides the sorted names of the cache files with the suffix"""
+    return sorted(name for name in os.listdir(cacheDir)
+                  if name.endswith(suffix))
+
+
+def test_key_is_shared_by_checkouts(tmp_path):
+    """The same file content in another checkout has the same key"""
+    keys = []
+    for checkout in ('one', 'two'):
+        fileName = tmp_path / checkout / 'pkg' / 'mod.py'
+        fileName.parent.mkdir(parents=True)
+        fileName.write_text('x = 1\n')
+        rootDir = str(tmp_path / checkout)
+        keys.append(PylintResultCache.makeKey(
+            str(fileName), None, 'sys.path.insert(0, "' + rootDir + '")',
+            '3.0', rootDir=rootDir))
+    assert keys[0] is not None
+    assert keys[0] == keys[1]
+
+
+def test_key_depends_on_content_and_options(tmp_path):
+    """The content, the profile and the plugins change the key"""
+    fileName = tmp_path / 'mod.py'
+    fileName.write_text('x = 1\n')
+    base = PylintResultCache.makeKey(str(fileName), None, None, '3.0')
+    assert base == PylintResultCache.makeKey(str(fileName), None, None,
+                                             '3.0', content='x = 1\n')
+    others = [
+        PylintResultCache.makeKey(str(fileName), None, None, '3.0',
+                                  content='x = 2\n'),
+        PylintResultCache.makeKey(str(fileName), None, None, '3.1'),
+        PylintResultCache.makeKey(str(fileName), None, None, '3.0',
+                                  profileArgs=['--disable=R']),
+        PylintResultCache.makeKey(str(fileName), None, None, '3.0',
+                                  plugins=['pylint_django 2.5'])]
+    assert base not in others
+    assert len(set(others)) == len(others)
+
+
+def test_key_of_missing_file(tmp_path):
+    """A file which cannot be read has no key"""
+    assert PylintResultCache.makeKey(str(tmp_path / 'none.py'),
+                                     None, None, '3.0') is None
+
+
+def test_put_and_get(tmp_path):
+    """The stored results come back"""
+    cache = PylintResultCache(str(tmp_path))
+    results = makeResults('/a/mod.py', 3)
+    cache.put('key', results)
+    assert cache.get('key') == results
+    assert cache.get('other') is None
+    assert cache.get(None) is None
+
+
+def test_put_leaves_no_temporary_file(tmp_path):
+    """An entry is written under a temporary name and renamed"""
+    cache = PylintResultCache(str(tmp_path))
+    cache.put('key', makeResults('/a/mod.py'))
+    cache.put('key', makeResults('/a/mod.py', 2))
+    assert getEntries(str(tmp_path), RESULT_SUFFIX) == ['key' + RESULT_SUFFIX]
+    assert getEntries(str(tmp_path), TEMP_SUFFIX) == []
+    assert len(cache.get('key')['W']) == 2
+
+
+def test_failed_put_keeps_the_old_entry(tmp_path):
+    """Results which cannot be stored do not break the previous entry"""
+    cache = PylintResultCache(str(tmp_path))
+    cache.put('key', makeResults('/a/mod.py'))
+    cache.put('key', {'FileName': object()})
+    assert getEntries(str(tmp_path), TEMP_SUFFIX) == []
+    assert cache.get('key') == makeResults('/a/mod.py')
+
+
+def test_least_recently_used_is_evicted(tmp_path):
+    """The entries over the limit go in the least recently used order"""
+    cache = PylintResultCache(str(tmp_path), maxEntries=2)
+    cache.put('a', makeResults('/a.py'))
+    cache.put('b', makeResults('/b.py'))
+    assert cache.get('a') is not None
+    cache.put('c', makeResults('/c.py'))
+    assert cache.get('b') is None
+    assert cache.get('a') is not None
+    assert cache.get('c') is not None
+    assert getEntries(str(tmp_path), RESULT_SUFFIX) == \
+        ['a' + RESULT_SUFFIX, 'c' + RESULT_SUFFIX]
+
+
+def test_size_limit(tmp_path):
+    """The cache is kept within the size limit"""
+    size = 1000
+    cache = PylintResultCache(str(tmp_path), maxEntries=None, maxBytes=size)
+    for index in range(20):
+        cache.put(str(index), makeResults('/mod.py', 5))
+    total = sum(os.path.getsize(os.path.join(str(tmp_path), name))
+                for name in getEntries(str(tmp_path), RESULT_SUFFIX))
+    assert 0 < total <= size
+    assert cache.get('19') is not None
+    assert cache.get('0') is None
+
+
+def test_index_is_built_from_directory(tmp_path):
+    """Another process sees the entries; old temporary files are removed"""
+    PylintResultCache(str(tmp_path)).put('key', makeResults('/mod.py'))
+    staleTemp = tmp_path / ('key' + RESULT_SUFFIX + '.host.1.0' +
+                            TEMP_SUFFIX)
+    staleTemp.write_text('{')
+    old = time.time() - STALE_TEMP_AGE - 60
+    os.utime(str(staleTemp), (old, old))
+    freshTemp = tmp_path / ('key' + RESULT_SUFFIX + '.host.2.0' +
+                            TEMP_SUFFIX)
+    freshTemp.write_text('{')
+
+    cache = PylintResultCache(str(tmp_path))
+    assert cache.get('key') == makeResults('/mod.py')
+    assert not staleTemp.exists()
+    assert freshTemp.exists()
+
+
+def test_broken_entry_is_dropped(tmp_path):
+    """A partially written or corrupted entry is a miss"""
+    cache = PylintResultCache(str(tmp_path))
+    (tmp_path / ('key' + RESULT_SUFFIX)).write_text('{"FileName": ')
+    assert cache.get('key') is None
+    assert getEntries(str(tmp_path), RESULT_SUFFIX) == []
+
+
+def test_relocate_results():
+    """The hit of another checkout refers to the analyzed file"""
+    results = makeResults('/one/mod.py', 2)
+    results['E'] = [['mod', 1, 'Import error', 'E0401', '/one/other.py',
+                     0, 1, 'import-error', 'HIGH']]
+    relocateResults(results, '/two/mod.py')
+    assert results['FileName'] == '/two/mod.py'
+    assert all(message[4] == '/two/mod.py' for message in results['W'])
+    # A message of another file is kept as it is
+    assert results['E'][0][4] == '/one/other.py'
+
+
+def test_same_results_ignore_tuples():
+    """The cached lists are the same as the parsed tuples"""
+    cached = makeResults('/mod.py', 2)
+    results = dict(cached)
+    results['W'] = [tuple(message) for message in cached['W']]
+    assert PylintResultCache.isSameResults(cached, results)
+    results['W'] = results['W'][:1]
+    assert not PylintResultCache.isSameResults(cached, results)
@@ -0,0 +1,115 @@
+# -*- coding: utf-8 -*-
+#
+# codimension - graphics python two-way code editor and analyzer
+# Copyright (C) 2019  Sergey Satskiy <sergey.satskiy@gmail.com>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+"""Pylint git changes parsing tests"""
+
+import os.path
+import pytest
+
+pytest.importorskip('ui.qt')
+
+# pylint: disable=wrong-import-position
+from cdmplugins.pylint.pylintgitdiff import (LineIntervals, parseDiff,
+                                             unquotePath)
+
+
+TOP_DIR = '/work/tree'
+
+
+def test_intervals_are_merged():
+    """The overlapping and touching intervals become one"""
+    intervals = LineIntervals([(10, 12), (1, 3), (4, 5), (11, 20), (30, 30)])
+    assert len(intervals) == 3
+    assert intervals.overlaps(5, 5)
+    assert intervals.overlaps(20, 25)
+    assert intervals.overlaps(25, 35)
+    assert not intervals.overlaps(6, 9)
+    assert not intervals.overlaps(21, 29)
+    assert not intervals.overlaps(31, 40)
+
+
+def test_empty_intervals():
+    """Nothing overlaps no intervals"""
+    intervals = LineIntervals([])
+    assert len(intervals) == 0
+    assert not intervals.overlaps(1, 100)
+
+
+DIFF = '''diff --git a/pkg/mod.py b/pkg/mod.py
+index 1111111..2222222 100644
+--- a/pkg/mod.py
++++ b/pkg/mod.py
+@@ -3 +3 @@ def f():
+-    return 1
++    return 2
+@@ -10,0 +11,3 @@ def g():
++    a = 1
++    b = 2
++    c = 3
+@@ -20,2 +22,0 @@ def h():
+-    x = 1
+-    y = 2
+diff --git "a/my dir/caf\\303\\251.py" "b/my dir/caf\\303\\251.py"
+--- "a/my dir/caf\\303\\251.py"
++++ "b/my dir/caf\\303\\251.py"
+@@ -0,0 +1 @@
++import os
+diff --git a/gone.py b/gone.py
+--- a/gone.py
++++ /dev/null
+@@ -1,2 +0,0 @@
+-x = 1
+-y = 2
+'''
+
+
+def test_parse_diff():
+    """The changed lines of each file are collected"""
+    changes = parseDiff(DIFF, TOP_DIR)
+    modName = os.path.join(TOP_DIR, 'pkg/mod.py')
+    quotedName = os.path.join(TOP_DIR, 'my dir/café.py')
+    assert sorted(changes.keys()) == sorted([modName, quotedName])
+
+    lines = changes[modName]
+    assert lines.overlaps(3, 3)
+    assert lines.overlaps(11, 11) and lines.overlaps(13, 13)
+    assert not lines.overlaps(14, 20)
+    # A removal marks the line before the removed ones
+    assert lines.overlaps(22, 22)
+    assert not lines.overlaps(4, 10)
+
+    assert changes[quotedName].overlaps(1, 1)
+
+
+def test_unquote_plain_path():
+    """A path without special characters is as it is"""
+    assert unquotePath('b/pkg/mod.py') == 'b/pkg/mod.py'
+    assert unquotePath('b/with space.py\t') == 'b/with space.py'
+    assert unquotePath('"') == '"'
+
+
+def test_unquote_escapes():
+    """The C style escapes and the octal UTF-8 bytes are decoded"""
+    assert unquotePath('"b/tab\\there.py"') == 'b/tab\there.py'
+    assert unquotePath('"b/quote\\".py"') == 'b/quote".py'
+    assert unquotePath('"b/back\\\\slash.py"') == 'b/back\\slash.py'
+    assert unquotePath('"b/caf\\303\\251.py"') == 'b/café.py'
+    assert unquotePath('"b/é.py"') == 'b/é.py'
+    # An unknown escape is kept
+    assert unquotePath('"b/x\\qy.py"') == 'b/x\\qy.py'
@@ -0,0 +1,189 @@
+# -*- coding: utf-8 -*-
+#
+# codimension - graphics python two-way code editor and analyzer
+# Copyright (C) 2019  Sergey Satskiy <sergey.satskiy@gmail.com>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+"""Pylint output parsers tests"""
+
+import json
+import pytest
+from cdmplugins.pylint.pylintparser import (PylintTextParser,
+                                            PylintJSONLinesParser,
+                                            TEXT_MSG_TEMPLATE, MODULE_PATTERN,
+                                            renderTextReport, parseRate)
+
+
+FILE_NAME = '/project/pkg/mod.py'
+
+RATE_TEXT = '\nYour code has been rated at 7.50/10 (previous run: 5.00/10)\n'
+
+# module, line, message, msg id, column, obj
+MESSAGES = [('pkg.mod', 1, 'Missing module docstring', 'C0114', 0, ''),
+            ('pkg.mod', 12, 'Unused variable \'x\'', 'W0612', 4, 'f'),
+            ('pkg.mod', 30, 'Bad option value: \'a: b\'', 'E0012', 0, ''),
+            ('pkg.other', 7, 'Too many arguments (9/5)', 'R0913', 0,
+             'Cls.method')]
+
+
+def getTextOutput():
+    """Provides the output of the text format run"""
+    lines = []
+    module = None
+    for name, line, msg, msgId, column, obj in MESSAGES:
+        if name != module:
+            module = name
+            lines.append(MODULE_PATTERN + name)
+        lines.append(TEXT_MSG_TEMPLATE.format(msg_id=msgId, line=line,
+                                              column=column, obj=obj,
+                                              msg=msg))
+    return '\n'.join(lines) + '\n' + RATE_TEXT
+
+
+def getJSONLinesOutput():
+    """Provides the output of the warm worker JSON lines reporter"""
+    lines = []
+    for name, line, msg, msgId, column, obj in MESSAGES:
+        lines.append(json.dumps([name, line, obj + ': ' + msg if obj else msg,
+                                 msgId, FILE_NAME, column, line, 'symbol',
+                                 'HIGH']))
+    lines.append(json.dumps(RATE_TEXT))
+    return '\n'.join(lines) + '\n'
+
+
+def parse(parserClass, output, chunkSize):
+    """Feeds the output in chunks; provides the parser"""
+    parser = parserClass(FILE_NAME)
+    for pos in range(0, len(output), chunkSize):
+        parser.feed(output[pos:pos + chunkSize])
+    parser.finish()
+    return parser
+
+
+def getMessages(parser):
+    """Provides (module, line, message, msg id, column) of the messages"""
+    return sorted((item[0], item[1], item[2], item[3], item[5])
+                  for items in parser.messages.values() for item in items)
+
+
+def getExpected():
+    """Provides the messages both parsers must find"""
+    return sorted((name, line, obj + ': ' + msg if obj else msg, msgId,
+                   column)
+                  for name, line, msg, msgId, column, obj in MESSAGES)
+
+
+@pytest.mark.parametrize('parserClass, getOutput',
+                         [(PylintTextParser, getTextOutput),
+                          (PylintJSONLinesParser, getJSONLinesOutput)])
+@pytest.mark.parametrize('chunkSize', [1, 7, 64, 65536])
+def test_chunk_boundaries(parserClass, getOutput, chunkSize):
+    """The messages do not depend on how the output is split"""
+    parser = parse(parserClass, getOutput(), chunkSize)
+    assert getMessages(parser) == getExpected()
+    assert parser.rate == '7.50'
+    assert parser.previousRate == '5.00'
+
+
+def test_feed_provides_complete_lines_only():
+    """A message is provided when its line is complete"""
+    parser = PylintTextParser(FILE_NAME)
+    assert parser.feed('C0114:  1,0: : Missing module') == []
+    newMessages = parser.feed(' docstring\nW0612')
+    assert [item[2] for item in newMessages] == ['Missing module docstring']
+    assert parser.finish() == []
+
+
+def test_text_colons():
+    """The colons of the object and the message are kept"""
+    parser = parse(PylintTextParser,
+                   'W0612: 12,4: f: Unused variable \'x\'\n'
+                   'E0012: 30,0: : Bad option value: \'a: b\'\n'
+                   'C0301:  5,0: Line too long (120/100)\n', 65536)
+    assert [item[2] for item in parser.messages['W']] == \
+        ['f: Unused variable \'x\'']
+    assert [item[2] for item in parser.messages['E']] == \
+        ['Bad option value: \'a: b\'']
+    assert [(item[1], item[5], item[2]) for item in parser.messages['C']] == \
+        [(5, 0, 'Line too long (120/100)')]
+
+
+def test_text_windows_line_ends():
+    """The carriage returns are not a part of the messages"""
+    parser = parse(PylintTextParser,
+                   'C0114:  1,0: : Missing module docstring\r\n', 3)
+    assert parser.messages['C'][0][2] == 'Missing module docstring'
+
+
+def test_json_lines_path():
+    """The record path is used; the file name is for the records without"""
+    output = json.dumps(['pkg.mod', 3, 'Unused import os', 'W0611',
+                         '/project/pkg/other.py', 0, 3, 'unused-import',
+                         'HIGH']) + '\n' + \
+             json.dumps(['pkg.mod', 1, 'Bad option', 'E0015', None, 0,
+                         None, 'unrecognized-option', 'UNDEFINED']) + '\n'
+    parser = parse(PylintJSONLinesParser, output, 65536)
+    assert parser.messages['W'][0][4] == '/project/pkg/other.py'
+    assert parser.messages['E'][0][4] == FILE_NAME
+    assert parser.messages['W'][0] == (
+        'pkg.mod', 3, 'Unused import os', 'W0611', '/project/pkg/other.py',
+        0, 3, 'unused-import', 'HIGH')
+
+
+def test_json_lines_broken_line():
+    """A broken line is skipped; the rest of the chunk is parsed"""
+    output = getJSONLinesOutput()
+    lines = output.split('\n')
+    lines.insert(1, '["pkg.mod", 1, "truncated')
+    lines.insert(2, '[1, 2]')
+    parser = parse(PylintJSONLinesParser, '\n'.join(lines), 65536)
+    assert getMessages(parser) == getExpected()
+    assert parser.rate == '7.50'
+
+
+def test_update_results():
+    """The messages and the rate go to the results dictionary"""
+    results = {}
+    parse(PylintJSONLinesParser, getJSONLinesOutput(), 65536). \
+        updateResults(results)
+    assert sorted(results.keys()) == ['C', 'E', 'PreviousRunRate', 'R',
+                                      'Rate', 'W']
+    assert len(results['C']) == 1
+
+
+def test_parse_rate():
+    """The rate and the previous one are optional"""
+    assert parseRate(RATE_TEXT) == ('7.50', '5.00')
+    assert parseRate('Your code has been rated at 10.00/10\n') == \
+        ('10.00', None)
+    assert parseRate('no rate here') == (None, None)
+
+
+def test_render_text_report():
+    """The JSON lines render as the text report"""
+    rendered = ''.join(renderTextReport(
+        getJSONLinesOutput().splitlines() + ['plain text line']))
+    lines = rendered.splitlines()
+    assert lines[0] == MODULE_PATTERN + 'pkg.mod'
+    assert lines[1] == 'C0114:  1,0: Missing module docstring'
+    assert lines[2] == 'W0612: 12,4: f: Unused variable \'x\''
+    assert MODULE_PATTERN + 'pkg.other' in lines
+    assert 'Your code has been rated at 7.50/10' in rendered
+    assert lines[-1] == 'plain text line'
+
+    # The rendered report parses back to the same messages
+    parser = parse(PylintTextParser, rendered, 65536)
+    assert getMessages(parser) == getExpected()
@@ -0,0 +1,103 @@
+# -*- coding: utf-8 -*-
+#
+# codimension - graphics python two-way code editor and analyzer
+# Copyright (C) 2019  Sergey Satskiy <sergey.satskiy@gmail.com>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+"""Pylint results search index tests"""
+
+from cdmplugins.pylint.pylintresultstore import PylintResultStore
+from cdmplugins.pylint.pylintresultindex import (TokenIndex,
+                                                 PylintResultIndex,
+                                                 parseQuery, FIELD_TEXT,
+                                                 FIELD_MSGID, FIELD_FILE,
+                                                 FIELD_CATEGORY)
+
+
+def test_token_prefix_search():
+    """A prefix matches all the tokens starting with it"""
+    index = TokenIndex()
+    for row, token in enumerate(['unused', 'undefined', 'unused', 'use',
+                                 'abc', 'unusedx']):
+        index.add(token, row)
+    assert index.getPrefixed('unused') == {0, 2, 5}
+    assert index.getPrefixed('un') == {0, 1, 2, 5}
+    assert index.getPrefixed('use') == {3}
+    assert index.getPrefixed('z') == set()
+    assert index.getPrefixed('') == {0, 1, 2, 3, 4, 5}
+
+    # The tokens added after a search are found
+    index.add('unit', 6)
+    assert index.getPrefixed('uni') == {6}
+
+
+def test_token_rows_are_not_repeated():
+    """A token met twice in a row is recorded once"""
+    index = TokenIndex()
+    index.add('name', 1)
+    index.add('name', 1)
+    index.add('name', 3)
+    assert sorted(index.getPrefixed('name')) == [1, 3]
+
+
+def test_parse_query():
+    """The terms are lower case and the prefixes select the field"""
+    assert parseQuery('  W0612 ID:w06 type:we file:Foo/bar.py in:x ') == \
+        [(FIELD_TEXT, 'w0612'), (FIELD_MSGID, 'w06'),
+         (FIELD_CATEGORY, 'we'), (FIELD_FILE, 'foo/bar.py'),
+         (FIELD_TEXT, 'in:x')]
+    assert parseQuery('file: ') == []
+
+
+def makeIndex():
+    """Provides a store and an index over it"""
+    store = PylintResultStore()
+    store.append([
+        ('pkg.mod', 3, 'Unused variable \'x\'', 'W0612', '/p/pkg/mod.py',
+         0, 3, 'unused-variable', 'HIGH'),
+        ('pkg.mod', 1, 'Missing module docstring', 'C0114', '/p/pkg/mod.py',
+         0, 1, 'missing-module-docstring', 'HIGH'),
+        ('pkg.other', 5, 'Unused import os', 'W0611', '/p/pkg/other.py',
+         0, 5, 'unused-import', 'HIGH'),
+        ('pkg.other', 9, 'Undefined variable \'y\'', 'E0602',
+         '/p/pkg/other.py', 0, 9, 'undefined-variable', 'HIGH')])
+    return store, PylintResultIndex(store)
+
+
+def test_search():
+    """All the terms must match"""
+    _, index = makeIndex()
+    assert index.search('') is None
+    assert index.search('unused') == {0, 2}
+    assert index.search('unused file:other') == {2}
+    assert index.search('file:pkg.mod') == {0, 1}
+    assert index.search('file:other.py') == {2, 3}
+    assert index.search('id:w06') == {0, 2}
+    assert index.search('unused-var') == {0}
+    assert index.search('type:we') == {0, 2, 3}
+    assert index.search('type:error') == {3}
+    assert index.search('variable type:e') == {3}
+    assert index.search('nothing') == set()
+
+
+def test_search_finds_added_messages():
+    """The messages added after a search are indexed on the next one"""
+    store, index = makeIndex()
+    assert index.search('unused') == {0, 2}
+    store.append([('pkg.third', 2, 'Unused argument \'a\'', 'W0613',
+                   '/p/pkg/third.py', 0, 2, 'unused-argument', 'HIGH')])
+    assert index.search('unused') == {0, 2, 4}
+    assert index.search('file:third') == {4}
@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+#
+# codimension - graphics python two-way code editor and analyzer
+# Copyright (C) 2019  Sergey Satskiy <sergey.satskiy@gmail.com>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+"""Pylint results sort keys tests"""
+
+import pytest
+from cdmplugins.pylint.pylintresultstore import PylintResultStore
+from cdmplugins.pylint.pylintresultsort import (PylintSortKeys, sortRows,
+                                                groupRows, SORT_BY_LINE,
+                                                SORT_BY_MSGID,
+                                                SORT_BY_CATEGORY,
+                                                SORT_BY_MESSAGE,
+                                                SORT_BY_SYMBOL,
+                                                GROUP_BY_MSGID)
+
+
+def makeMessage(line, msgId, text, symbol=None, fileName='/p/mod.py'):
+    """Provides a parsed message tuple"""
+    return ('mod', line, text, msgId, fileName, 0, line, symbol, 'HIGH')
+
+
+def makeStore():
+    """Provides a store with a few messages"""
+    store = PylintResultStore()
+    store.append([makeMessage(10, 'W0612', 'unused b', 'unused-variable'),
+                  makeMessage(2, 'C0103', 'Bad name'),
+                  makeMessage(7, 'W0611', 'Unused a', 'unused-import'),
+                  makeMessage(2, 'E1101', 'no member'),
+                  makeMessage(5, 'W0612', 'Unused c', 'unused-variable')])
+    return store
+
+
+def test_keys_follow_the_store():
+    """The keys are extended for the messages added later"""
+    store = makeStore()
+    keys = PylintSortKeys(store)
+    assert list(keys.get(SORT_BY_LINE)) == [10, 2, 7, 2, 5]
+    store.append([makeMessage(1, 'R0913', 'Too many')])
+    assert list(keys.get(SORT_BY_LINE)) == [10, 2, 7, 2, 5, 1]
+    assert list(keys.get(SORT_BY_CATEGORY)) == [1, 3, 1, 0, 1, 2]
+    assert keys.get(SORT_BY_SYMBOL)[1] == ''
+    with pytest.raises(KeyError):
+        keys.get('unknown')
+
+
+def test_sort_by_many_keys():
+    """The first key is the most significant; the ties keep the order"""
+    keys = PylintSortKeys(makeStore())
+    rows = [0, 1, 2, 3, 4]
+    sortRows(rows, keys, [(SORT_BY_LINE, False)])
+    assert list(rows) == [1, 3, 4, 2, 0]
+    sortRows(rows, keys, [(SORT_BY_MSGID, True), (SORT_BY_LINE, False)])
+    assert list(rows) == [4, 0, 2, 3, 1]
+    sortRows(rows, keys, [])
+    assert list(rows) == [0, 1, 2, 3, 4]
+
+
+def test_message_sort_ignores_case():
+    """The messages are sorted case insensitively"""
+    keys = PylintSortKeys(makeStore())
+    rows = [0, 2, 4]
+    sortRows(rows, keys, [(SORT_BY_MESSAGE, False)])
+    assert list(rows) == [2, 0, 4]
+
+
+def test_group_rows():
+    """The groups are ordered; the message ids go by category first"""
+    keys = PylintSortKeys(makeStore())
+    groups = groupRows(range(5), keys, GROUP_BY_MSGID)
+    assert [(key, list(rows)) for key, rows in groups] == \
+        [('E1101', [3]), ('W0611', [2]), ('W0612', [0, 4]), ('C0103', [1])]
@@ -0,0 +1,95 @@
+# -*- coding: utf-8 -*-
+#
+# codimension - graphics python two-way code editor and analyzer
+# Copyright (C) 2019  Sergey Satskiy <sergey.satskiy@gmail.com>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+"""Pylint results columnar store tests"""
+
+from cdmplugins.pylint.pylintresultstore import (PylintResultStore,
+                                                 getResultStore,
+                                                 getMessageCount)
+
+
+MESSAGES = [
+    ('pkg.mod', 3, 'Unused variable \'x\'', 'W0612', '/p/pkg/mod.py',
+     4, 3, 'unused-variable', 'HIGH'),
+    ('pkg.mod', 9, 'Unused variable \'long_name\'', 'W0612', '/p/pkg/mod.py',
+     8, 9, 'unused-variable', 'HIGH'),
+    ('pkg.mod', 1, 'Missing module docstring', 'C0114', '/p/pkg/mod.py',
+     0, None, 'missing-module-docstring', 'HIGH'),
+    ('pkg.mod', 20, 'Too many arguments (9/5)', 'R0913', '/p/pkg/mod.py',
+     0, 25, 'too-many-arguments', 'UNDEFINED'),
+    ('pkg.mod', 7, 'Instance of "A" has no "b" member; maybe \'c\'?',
+     'E1101', '/p/pkg/mod.py', 12, 7, 'no-member', 'INFERENCE'),
+    ('', 0, 'Bad option value 1.5', 'E0012', None, None, None, None, None),
+    ('pkg.mod', 4, '\'\' 12 "" 3.25 trailing', 'W0105', '/p/pkg/mod.py',
+     0, 4, 'pointless-string-statement', 'HIGH'),
+]
+
+
+def test_round_trip():
+    """The stored messages come back as they were"""
+    store = PylintResultStore()
+    rows = store.append(MESSAGES)
+    assert rows == range(len(MESSAGES))
+    assert len(store) == len(MESSAGES)
+    assert [store.getMessage(row) for row in rows] == MESSAGES
+    assert store.texts[:] == [message[2] for message in MESSAGES]
+    assert store.msgIds[1:3] == ['W0612', 'C0114']
+
+
+def test_appended_rows():
+    """Each append provides the range of the new rows"""
+    store = PylintResultStore()
+    assert store.append(MESSAGES[:2]) == range(0, 2)
+    assert store.append([]) == range(2, 2)
+    assert store.append(MESSAGES[2:]) == range(2, len(MESSAGES))
+    assert store.getMessage(2) == MESSAGES[2]
+
+
+def test_template_sharing():
+    """The messages which differ in the names only share a template"""
+    store = PylintResultStore()
+    store.append(MESSAGES[:2])
+    templates = [value for value in store._PylintResultStore__strings.values
+                 if value and value.startswith('Unused variable')]
+    assert templates == ['Unused variable \0']
+
+
+def test_optional_values():
+    """The missing values are None"""
+    store = PylintResultStore()
+    store.append(MESSAGES)
+    assert store.getColumn(5) is None
+    assert store.getEndLine(2) is None
+    assert store.getColumn(0) == 4
+    assert store.fileNames[5] is None
+    assert store.symbols[5] is None
+    assert store.getCategory(4) == 'E'
+
+
+def test_from_results():
+    """A results dictionary gives a store in the category order"""
+    results = {'W': [MESSAGES[0]], 'C': [MESSAGES[2]], 'E': [MESSAGES[4]],
+               'R': []}
+    assert getMessageCount(results) == 3
+    store = getResultStore(results)
+    assert [store.getCategory(row) for row in range(len(store))] == \
+        ['E', 'W', 'C']
+    results['Messages'] = store
+    assert getResultStore(results) is store
+    assert getMessageCount(results) == 3